@@ -0,0 +1,157 @@
+"""
+End-to-end NarrativeGraph benchmark against an offline LLM backend.
+
+    python bench/bench_graph.py --runs 20 --concurrency 4 --backend fake --latency-ms 0
+
+Reports turns/sec, per-node latency, traced allocations per turn and peak RSS,
+plus micro-benchmarks for StoryStateManager updates and prompt building.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List
+
+from common import load_scenario, summarize, peak_rss_mb, write_results
+
+from src.config import StoryConfig
+from src.engine.sessions import SessionEngine
+from src.story_state import StoryStateManager
+from src.agents.director_agent import DirectorAgent
+from src.prompts.character_prompts import get_character_prompt
+
+NODES = ["director_decide", "character_respond", "execute_action", "check_conclusion"]
+
+
+async def run_session(engine: SessionEngine, scenario, node_times: Dict[str, List[float]]) -> int:
+    session = engine.create_session(scenario.seed_story, scenario.characters, signals=scenario.signals)
+    last = time.perf_counter()
+    # Nodes run one after another, so the gap between updates is the node's latency
+    async for step in engine.stream(session):
+        now = time.perf_counter()
+        for node_name in step:
+            node_times[node_name].append(now - last)
+        last = now
+    return session.narrative.dialogue_turn_counter + session.narrative.action_counter
+
+
+async def bench_graph(config: StoryConfig, runs: int, concurrency: int) -> Dict:
+    scenario = load_scenario()
+    engine = SessionEngine(config)
+    node_times: Dict[str, List[float]] = defaultdict(list)
+    queue = list(range(runs))
+    turns: List[int] = []
+
+    async def worker():
+        while queue:
+            queue.pop()
+            turns.append(await run_session(engine, scenario, node_times))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "total_turns": sum(turns),
+        "turns_per_sec": sum(turns) / elapsed if elapsed else 0.0,
+        "runs_per_sec": runs / elapsed if elapsed else 0.0,
+        "node_latency": {node: summarize(node_times.get(node, [])) for node in NODES}
+    }
+
+
+async def bench_allocations(config: StoryConfig) -> Dict:
+    """One traced run: bytes allocated and retained per turn."""
+    scenario = load_scenario()
+    engine = SessionEngine(config)
+    tracemalloc.start()
+    try:
+        node_times: Dict[str, List[float]] = defaultdict(list)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        turns = await run_session(engine, scenario, node_times)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "turns": turns,
+        "retained_bytes_per_turn": (current - before) / max(turns, 1),
+        "peak_traced_bytes_per_turn": (peak - before) / max(turns, 1),
+        "peak_traced_kb": (peak - before) / 1024
+    }
+
+
+def bench_micro(config: StoryConfig, iterations: int) -> Dict:
+    """Hot paths that run every turn, outside the graph."""
+    scenario = load_scenario()
+    manager = StoryStateManager(scenario.seed_story, scenario.characters, config, signals=scenario.signals)
+    director = DirectorAgent(config, manager)
+    names = [c["name"] for c in scenario.characters]
+    line = "Bhai please, let us settle this quietly, I have a family to feed and you threaten me?"
+    results = {}
+
+    def timed(label, fn):
+        samples = []
+        for i in range(iterations):
+            t = time.perf_counter()
+            fn(i)
+            samples.append(time.perf_counter() - t)
+        results[label] = summarize(samples)
+
+    timed("classify_dialogue", lambda i: manager.signals.dialogue.classify(line))
+    timed("update_memory_from_dialogue",
+          lambda i: manager.update_memory_from_dialogue(names[i % len(names)], line, i))
+    timed("get_memory_snapshot", lambda i: manager.get_memory_snapshot(names[i % len(names)]))
+    timed("get_entity_context", lambda i: manager.get_entity_context())
+    timed("get_context_for_character", lambda i: manager.get_context_for_character(names[i % len(names)]))
+    timed("get_character_prompt", lambda i: get_character_prompt(
+        character_name=names[i % len(names)],
+        character_profile=manager.state.character_profiles[names[i % len(names)]],
+        context=manager.get_context_for_character(names[i % len(names)]),
+        memory_snapshot=manager.get_memory_snapshot(names[i % len(names)]),
+        config=config,
+        speaker_goal=director.get_speaker_mandate(names[i % len(names)]),
+        entity_context=manager.get_entity_context()
+    ))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--backend", default="fake", choices=["fake", "replay"])
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected LLM latency per call")
+    parser.add_argument("--micro-iterations", type=int, default=2000)
+    parser.add_argument("--output", help="Results path (default: bench/results/graph_<timestamp>.json)")
+    args = parser.parse_args()
+
+    config = StoryConfig(
+        llm_backend=args.backend,
+        injected_latency_ms=args.latency_ms,
+        max_concurrent_sessions=args.concurrency
+    )
+
+    results = {
+        "config": {"backend": args.backend, "latency_ms": args.latency_ms},
+        "graph": asyncio.run(bench_graph(config, args.runs, args.concurrency)),
+        "allocations": asyncio.run(bench_allocations(config)),
+        "micro": bench_micro(config, args.micro_iterations),
+    }
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    path = write_results("graph", results, args.output)
+    graph = results["graph"]
+    print(f"turns/sec: {graph['turns_per_sec']:.1f}  runs: {graph['runs']}  "
+          f"peak RSS: {results['peak_rss_mb']:.1f} MB")
+    for node, stats in graph["node_latency"].items():
+        if stats["count"]:
+            print(f"  {node:<18} p50={stats['p50_ms']:.3f}ms  p95={stats['p95_ms']:.3f}ms")
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
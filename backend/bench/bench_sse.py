@@ -0,0 +1,118 @@
+"""
+SSE throughput of server.py with N concurrent clients.
+
+    python bench/bench_sse.py --clients 8 --backend fake
+
+Starts the server in a subprocess on an offline backend, opens N concurrent
+/stream-story streams and reports time-to-first-event, stream duration,
+events/sec and bytes/sec across all clients.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict
+
+import httpx
+
+from common import PROJECT_ROOT, summarize, write_results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            try:
+                await client.get(f"{base_url}/sessions")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start in time")
+
+
+async def stream_once(client: httpx.AsyncClient, url: str) -> Dict:
+    start = time.perf_counter()
+    first_event = None
+    events = 0
+    received = 0
+    async with client.stream("GET", url) as response:
+        async for line in response.aiter_lines():
+            received += len(line) + 1
+            if line.startswith("data:"):
+                events += 1
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+    return {"ttfe": first_event or 0.0, "duration": time.perf_counter() - start,
+            "events": events, "bytes": received, "status": response.status_code}
+
+
+async def bench_sse(base_url: str, clients: int, rounds: int) -> Dict:
+    url = f"{base_url}/stream-story"
+    results = []
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=None) as client:
+        for _ in range(rounds):
+            results.extend(await asyncio.gather(*[stream_once(client, url) for _ in range(clients)]))
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if r["status"] == 200]
+    total_events = sum(r["events"] for r in ok)
+    total_bytes = sum(r["bytes"] for r in ok)
+    return {
+        "clients": clients,
+        "rounds": rounds,
+        "streams": len(results),
+        "failed_streams": len(results) - len(ok),
+        "elapsed_s": elapsed,
+        "events_per_sec": total_events / elapsed if elapsed else 0.0,
+        "bytes_per_sec": total_bytes / elapsed if elapsed else 0.0,
+        "bytes_per_stream": total_bytes / max(len(ok), 1),
+        "time_to_first_event": summarize([r["ttfe"] for r in ok]),
+        "stream_duration": summarize([r["duration"] for r in ok])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--backend", default="fake", choices=["fake", "replay"])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="Results path (default: bench/results/sse_<timestamp>.json)")
+    args = parser.parse_args()
+
+    port = free_port()
+    env = {**os.environ, "LLM_BACKEND": args.backend, "LLM_LATENCY_MS": str(args.latency_ms)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        results = asyncio.run(bench_sse(base_url, args.clients, args.rounds))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    path = write_results("sse", {
+        "config": {"backend": args.backend, "latency_ms": args.latency_ms},
+        "sse": results
+    }, args.output)
+    print(f"streams: {results['streams']}  events/sec: {results['events_per_sec']:.1f}  "
+          f"KB/sec: {results['bytes_per_sec'] / 1024:.1f}  "
+          f"TTFE p50: {results['time_to_first_event'].get('p50_ms', 0):.1f}ms")
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
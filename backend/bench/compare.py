@@ -0,0 +1,65 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python bench/compare.py bench/results/graph_old.json bench/results/graph_new.json --threshold 10
+
+Exits with status 1 if any tracked metric got worse by more than the threshold (%).
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Any
+
+# Metric name suffixes and whether a higher value is better
+HIGHER_IS_BETTER = ("per_sec",)
+LOWER_IS_BETTER = ("_ms", "_mb", "_kb", "bytes_per_turn", "bytes_per_stream", "elapsed_s")
+
+
+def flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if untracked."""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    baseline = flatten(json.loads(open(args.baseline).read()))
+    current = flatten(json.loads(open(args.current).read()))
+
+    regressions = 0
+    for metric in sorted(set(baseline) & set(current)):
+        sign = direction(metric)
+        old, new = baseline[metric], current[metric]
+        if sign == 0 or old == 0:
+            continue
+        change = (new - old) / abs(old) * 100
+        worse = -change * sign
+        flag = "REGRESSION" if worse > args.threshold else ""
+        regressions += bool(flag)
+        print(f"{metric:<55} {old:>12.3f} → {new:>12.3f}  {change:+7.1f}%  {flag}")
+
+    print(f"\n{regressions} regression(s) above {args.threshold:.0f}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
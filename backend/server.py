@@ -1,18 +1,47 @@
-import json
 import asyncio
-from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pathlib import Path
 
 # Importing your logic from the /src folder
 from src.config import StoryConfig
-from src.agents.character_agent import CharacterAgent
-from src.agents.director_agent import DirectorAgent
-from src.graph.narrative_graph import NarrativeGraph
-from src.story_state import StoryStateManager
+from src.engine.event_log import parse_event_id
+from src.engine.sessions import SessionEngine
+from src.llm.pool import get_llm_pool, shutdown_llm_pool
+from src.log_sink import get_log_sink, shutdown_log_sink
+from src.metrics import REGISTRY, Gauge
+from src.scenarios import ScenarioError, get_scenario_registry
 
-app = FastAPI()
+SESSIONS_GAUGE = REGISTRY.register(Gauge(
+    "narrative_sessions", "Session engine state", ("state",)))
+
+config = StoryConfig()
+
+# One engine per worker: admission control + shared graph and LLM clients
+engine = SessionEngine(config)
+
+# Seed stories and character configs, validated at startup and hot-reloaded
+scenarios = get_scenario_registry(config)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the shared client so the first request skips client setup
+    if config.llm_backend == "gemini":
+        get_llm_pool(config).client_for(config)
+    watcher = asyncio.create_task(scenarios.watch())
+    # Runs a previous worker was in the middle of (CHECKPOINT_PATH)
+    resumed = engine.resume_checkpointed(scenarios)
+    if resumed:
+        print(f"Resumed {len(resumed)} checkpointed session(s)")
+    yield
+    watcher.cancel()
+    await engine.shutdown()
+    await shutdown_llm_pool()
+    shutdown_log_sink()
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for Next.js (port 3000)
 app.add_middleware(
@@ -23,66 +52,91 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.get("/sessions")
+async def session_stats():
+    sink = get_log_sink(config)
+    return {
+        **engine.stats(),
+        "llm_pool": get_llm_pool(config).stats(),
+        "prompt_log": sink.stats() if sink else None
+    }
+
+@app.get("/scenarios")
+async def list_scenarios():
+    return {
+        "default": config.default_scenario,
+        "scenarios": {
+            name: {"title": s.seed_story["title"], "characters": [c["name"] for c in s.characters]}
+            for name, s in scenarios.scenarios.items()
+        },
+        "errors": scenarios.errors
+    }
+
+@app.get("/metrics")
+async def metrics():
+    for state, value in engine.stats().items():
+        SESSIONS_GAUGE.set(state, value=value)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+PACING_MODES = ("none", "fixed", "typewriter")
+
 @app.get("/stream-story")
-async def stream_story(request: Request):
+async def stream_story(request: Request, pacing: Optional[str] = None, session: Optional[str] = None,
+                       scenario: Optional[str] = None, seed: Optional[int] = None):
+    """
+    Start a simulation of ?scenario=<name> (default config.default_scenario),
+    optionally with ?seed=<int> to reproduce a run, or attach to one that is
+    already running:
+    - EventSource reconnects send Last-Event-ID ("<session_id>[:<epoch>]:<seq>") and resume after it;
+      after a worker restart, viewers that saw frames past the checkpoint replay from it
+    - ?session=<id> (from the X-Session-ID header) attaches another viewer from the start
+    """
+    resume = parse_event_id(request.headers.get("last-event-id"))
+    if resume is None and session:
+        resume = (session, None, 0)
+
+    if resume is not None:
+        session_id, epoch, after = resume
+        log = engine.get_event_log(session_id)
+        if log is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired session")
+        if epoch is not None:
+            after = log.resume_after(epoch, after)
+    else:
+        pacing = pacing or config.sse_pacing
+        if pacing not in PACING_MODES:
+            raise HTTPException(status_code=400, detail=f"pacing must be one of {', '.join(PACING_MODES)}")
+        if engine.is_saturated():
+            raise HTTPException(status_code=503, detail="Too many simulations running, try again shortly")
+
+        # 1. Pick the scenario (parsed once, reloaded when its files change)
+        try:
+            story = scenarios.get(scenario or config.default_scenario)
+        except ScenarioError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+        # 2. Create an isolated session and run it in the background (waits for a free slot first)
+        new_session = engine.create_session(story.seed_story, story.characters, seed, story.signals, story.name)
+        engine.start(new_session, pacing)
+        session_id, after, log = new_session.session_id, 0, new_session.event_log
+
     async def event_generator():
+        # 3. Replay what this viewer missed, then follow the live run.
+        # Each wake-up sends everything new in one write.
+        engine.attach(session_id)
         try:
-            # 1. Setup Paths and Load Configs
-            project_root = Path(__file__).parent
-            examples_dir = project_root / "examples" / "rickshaw_accident"
-            
-            seed_story = json.loads((examples_dir / "seed_story.json").read_text())
-            char_configs = json.loads((examples_dir / "character_configs.json").read_text())
-            
-            config = StoryConfig()
-            story_manager = StoryStateManager(seed_story, char_configs["characters"], config)
-            
-            characters = [
-                CharacterAgent(name=char["name"], config=config)
-                for char in char_configs["characters"]
-            ]
-            director = DirectorAgent(config, story_manager)
-            
-            # 2. Initialize the Narrative Graph
-            story_graph = NarrativeGraph(config, characters, director, story_manager)
-            
-            initial_state = {
-                "seed_story": seed_story,
-                "current_turn": 0,
-                "dialogue_history": [],
-                "story_narration": [],
-                "character_profiles": story_manager.state.character_profiles,
-                "events": [],
-                "next_move_type": "dialogue",
-            }
-
-            # 3. Stream the Graph Execution
-            async for event in story_graph.graph.astream(initial_state):
-                for node_name, output in event.items():
-                    if "events" in output and output["events"]:
-                        # Get the latest narrative event
-                        latest_event = output["events"][-1]
-                        
-                        # ATTACH CURRENT WORLD STATE (Entity Registry)
-                        # This extracts the live item status from the manager
-                        latest_event["entity_updates"] = {
-                            "items": story_manager.state.entity_registry.items
-                        }
-                        
-                        # ATTACH TURN DATA
-                        latest_event["turn"] = output.get("current_turn", 0)
-
-                        yield f"data: {json.dumps(latest_event)}\n\n"
-                        
-                await asyncio.sleep(0.1)
-                
-            yield "data: {\"type\": \"end\", \"message\": \"Simulation Complete\"}\n\n"
-
-        except Exception as e:
-            print(f"Error in stream: {e}")
-            yield f"data: {{\"type\": \"error\", \"message\": \"{str(e)}\"}}\n\n"
-
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+            async for frames in log.follow(after):
+                if await request.is_disconnected():
+                    return
+                yield frames
+        finally:
+            engine.detach(session_id)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"X-Session-ID": session_id}
+    )
 
 if __name__ == "__main__":
     import uvicorn
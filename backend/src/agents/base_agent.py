@@ -1,41 +1,95 @@
 import json
+import time
+from collections import deque
 from datetime import datetime
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Callable, Dict, Any, Optional
 from ..config import StoryConfig
+from ..llm.backends import get_backend
+from ..log_sink import get_log_sink
+from ..prompts.context_window import ESTIMATOR
+from ..metrics import RunMetrics, observe_first_token, observe_llm_call, observe_llm_error, observe_parse
 
 class BaseAgent(ABC):
     def __init__(self, name: str, config: StoryConfig):
         self.name = name
         self.config = config
-        self.logs = [] # Store logs in memory
-        self.llm = ChatGoogleGenerativeAI(
-            model=config.model_name,
-            temperature=config.temperature,
-            max_output_tokens=config.max_tokens_per_prompt
-        )
+        # Newest entries in memory (bounded); the full log goes to the JSONL sink if configured
+        self.logs = deque(maxlen=config.agent_log_buffer)
+        self.log_sink = get_log_sink(config)
+        self.session_id: Optional[str] = None
+        # Live Gemini (pooled clients), offline fake or replay, per config.llm_backend
+        self.backend = get_backend(config)
+        # Set by NarrativeGraph so calls are also summarized per session
+        self.run_metrics: Optional[RunMetrics] = None
+        self.last_usage: Dict[str, Optional[int]] = {}
     
     async def generate_response(self, prompt: str) -> str:
         """Generate a response using the LLM."""
         try:
-            # Merging system prompt concept into single message if needed, 
-            # but here we just take the prompt as is, assuming it contains everything.
-            messages = [
-                ("human", prompt)
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # Log the prompt and response
-            self._log_interaction(prompt, response.content)
-            
+            started = time.perf_counter()
+            response = await self.backend.generate(prompt, self.config)
+            elapsed = time.perf_counter() - started
+            self._record_call(
+                prompt, response.content, response.queue_seconds, elapsed,
+                response.prompt_tokens, response.completion_tokens
+            )
             return response.content
         except Exception as e:
             print(f"Error generating response for {self.name}: {e}")
+            observe_llm_error(self.name, self.run_metrics)
+            return ""
+
+    async def stream_response(self, prompt: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Same as generate_response, but consumes the completion as it streams.
+        `on_chunk` sees each raw text delta; the full text is returned at the end.
+        """
+        parts = []
+        queue_seconds = 0.0
+        prompt_tokens = completion_tokens = None
+        try:
+            started = time.perf_counter()
+            async for chunk in self.backend.astream(prompt, self.config):
+                if not parts:
+                    queue_seconds = chunk.queue_seconds
+                    observe_first_token(self.name, time.perf_counter() - started, self.run_metrics)
+                prompt_tokens = chunk.prompt_tokens or prompt_tokens
+                completion_tokens = chunk.completion_tokens or completion_tokens
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                parts.append(text)
+                if text and on_chunk is not None:
+                    on_chunk(text)
+            elapsed = time.perf_counter() - started
+            content = "".join(parts)
+            self._record_call(prompt, content, queue_seconds, elapsed, prompt_tokens, completion_tokens)
+            return content
+        except Exception as e:
+            print(f"Error streaming response for {self.name}: {e}")
+            observe_llm_error(self.name, self.run_metrics)
             return ""
 
-    def _log_interaction(self, prompt: str, response: str):
+    def _record_call(self, prompt: str, content: str, queue_seconds: float, elapsed: float,
+                     prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+        observe_llm_call(
+            self.name, queue_seconds, elapsed - queue_seconds,
+            prompt_tokens, completion_tokens, self.run_metrics
+        )
+        if prompt_tokens:
+            ESTIMATOR.calibrate(prompt, prompt_tokens)
+        self.last_usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens
+        }
+
+        # Log the prompt and response
+        self._log_interaction(prompt, content, elapsed)
+
+    def _record_parse(self, started: float, ok: bool) -> None:
+        """Record parse time (from `started`, a perf_counter value) and whether the JSON was valid."""
+        observe_parse(self.name, started, ok, self.run_metrics)
+
+    def _log_interaction(self, prompt: str, response: str, latency: Optional[float] = None):
         """Log interaction to memory."""
         entry = {
             "timestamp": datetime.now().isoformat(),
@@ -43,7 +97,14 @@ class BaseAgent(ABC):
             "prompt": prompt,
             "response": response
         }
+        if latency is not None:
+            entry["latency_s"] = round(latency, 4)
+        self._append_log(entry)
+
+    def _append_log(self, entry: Dict[str, Any]) -> None:
         self.logs.append(entry)
+        if self.log_sink is not None:
+            self.log_sink.write({**entry, "session": self.session_id} if self.session_id else entry)
 
     def _clean_json_response(self, response: str) -> str:
         """Clean markdown formatting from JSON response."""
@@ -1,10 +1,12 @@
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime
 import json
+import time
 from .base_agent import BaseAgent
 from ..config import StoryConfig
 from ..schemas import StoryState
 from ..prompts.character_prompts import get_character_prompt
+from ..llm.streaming import JsonFieldStreamer
 
 
 class CharacterAgent(BaseAgent):
@@ -24,13 +26,15 @@ class CharacterAgent(BaseAgent):
         memory_snapshot: Dict,
         speaker_goal: str = "",
         action_constraint: str = "",
-        entity_context: str = ""  # NEW parameter
+        entity_context: str = "",  # NEW parameter
+        on_dialogue_delta: Optional[Callable[[str], None]] = None
     ) -> Tuple[str, str, str]:
         """
         Returns: (dialogue, thought, action_decision)
         dialogue       → shown in CLI
         thought        → logged as agentic reasoning (Issue 2)
         action_decision → logged and shown in CLI as minor gesture
+        on_dialogue_delta → if given, receives the dialogue text as it streams in
         """
         character_profile = story_state.character_profiles.get(self.name)
 
@@ -46,7 +50,10 @@ class CharacterAgent(BaseAgent):
         )
 
         try:
-            raw = await self.generate_response(prompt)
+            if on_dialogue_delta is None:
+                raw = await self.generate_response(prompt)
+            else:
+                raw = await self.stream_response(prompt, self._dialogue_forwarder(on_dialogue_delta))
             dialogue, thought, action_decision = self._parse_cot_response(raw)
         except Exception as e:
             print(f"Error generating response for {self.name}: {e}")
@@ -56,11 +63,24 @@ class CharacterAgent(BaseAgent):
 
         return dialogue, thought, action_decision
 
+    @staticmethod
+    def _dialogue_forwarder(on_dialogue_delta: Callable[[str], None]) -> Callable[[str], None]:
+        """Wrap a dialogue callback so it can be fed raw CoT JSON chunks."""
+        streamer = JsonFieldStreamer("dialogue")
+
+        def forward(chunk: str) -> None:
+            delta = streamer.feed(chunk)
+            if delta:
+                on_dialogue_delta(delta)
+        return forward
+
     def _parse_cot_response(self, raw: str) -> Tuple[str, str, str]:
         """Parse JSON CoT response. Graceful fallback if malformed."""
+        started = time.perf_counter()
         try:
             cleaned = self._clean_json_response(raw)
             data = json.loads(cleaned)
+            self._record_parse(started, ok=True)
             dialogue = data.get("dialogue", "").strip()
             thought = data.get("thought", "").strip()
             action_decision = data.get("action_decision", "none").strip()
@@ -71,6 +91,7 @@ class CharacterAgent(BaseAgent):
 
             return dialogue, thought, action_decision
         except (json.JSONDecodeError, AttributeError):
+            self._record_parse(started, ok=False)
             # If JSON parsing fails entirely, treat raw as plain dialogue
             return raw.strip(), "", "none"
 
@@ -95,6 +116,7 @@ class CharacterAgent(BaseAgent):
                 "action_decision": action_decision,
                 "dialogue": dialogue
             },
-            "estimated_tokens": estimated_tokens
+            "estimated_tokens": estimated_tokens,
+            "tokens": self.last_usage
         }
-        self.logs.append(entry)
\ No newline at end of file
+        self._append_log(entry)
\ No newline at end of file
@@ -1,11 +1,15 @@
 import json
-import random
+import time
 from datetime import datetime
+import numpy as np
 from typing import List, Tuple, Optional, Dict
 from .base_agent import BaseAgent
 from ..config import StoryConfig
+from ..metrics import observe_speaker_selection
 from ..schemas import StoryState
-from ..prompts.director_prompts import DIRECTOR_SELECT_SPEAKER_PROMPT
+from ..speaker_model import load_speaker_model
+from ..prompts.director_prompts import DIRECTOR_SELECT_SPEAKER_TEMPLATE
+from ..prompts.context_window import ContextBlock
 
 # ─── Issue 1: Plot Clock ───────────────────────────────────────────────────────
 # 3 strict phases. Director knows exactly where it is at all times.
@@ -112,10 +116,39 @@ TURNING_POINT_EVENTS = [
 ]
 
 
+# ─── Heuristic Director Narration ──────────────────────────────────────────────
+# Beat lines for config.heuristic_director, per phase. {speaker} is about to talk,
+# {last} spoke before them.
+
+NARRATION_TEMPLATES = {
+    "escalation": [
+        "Horns blare behind the stalled rickshaw as {speaker} pushes forward to answer {last}.",
+        "The crowd edges closer; {speaker} will not let {last} have the last word.",
+        "Exhaust and dust hang in the air while {speaker} turns on {last}.",
+        "A bus crawls past the wreck, passengers craning, as {speaker} cuts in."
+    ],
+    "complexity": [
+        "Sides are hardening. {speaker} weighs what {last} just gave away.",
+        "Murmurs ripple through the onlookers as {speaker} fixes {last} with a hard look.",
+        "The heat presses down; {speaker} sees an opening in {last}'s words.",
+        "Someone in the crowd whistles. {speaker} steps in before {last} can continue."
+    ],
+    "resolution": [
+        "Everyone senses the moment tipping. {speaker} faces {last} one last time.",
+        "The crowd falls quiet, waiting, as {speaker} answers {last}.",
+        "There is no more room to stall; {speaker} forces the issue with {last}.",
+        "Traffic is backed up to the signal now, and {speaker} knows it has to end here."
+    ]
+}
+
+
 class DirectorAgent(BaseAgent):
     """
     All major decisions are Python/deterministic.
-    LLM used only for: speaker selection narration + speaker goal.
+    LLM used only for: speaker selection narration + speaker goal, and with
+    config.heuristic_director only on phase changes, interventions and turning points.
+    A learned speaker model (config.speaker_model_path) also stands in for the
+    LLM whenever it is confident.
     """
 
     ACTION_TEMPLATES = {
@@ -153,18 +186,54 @@ class DirectorAgent(BaseAgent):
         ]
     }
 
-    def __init__(self, config: StoryConfig, story_manager):
+    def __init__(self, config: StoryConfig, story_manager, turning_point_id: Optional[str] = None):
         super().__init__("Director", config)
         self.story_manager = story_manager
-        self.turning_point_event = random.choice(TURNING_POINT_EVENTS)
+        # The session's seeded RNG, owned by the story manager
+        self.rng = story_manager.rng
+        # Batch runs pin the turning point to cover every event
+        if turning_point_id is None:
+            self.turning_point_event = self.rng.choice(TURNING_POINT_EVENTS)
+        else:
+            matches = [e for e in TURNING_POINT_EVENTS if e["id"] == turning_point_id]
+            if not matches:
+                raise ValueError(f"Unknown turning point '{turning_point_id}'")
+            self.turning_point_event = matches[0]
         self.turning_point_fired = False
         self.intervention_fired = False
         self.last_speaker = None
         self.second_last_speaker = None
+        self.last_phase: Optional[str] = None  # phase of the previous speaker selection
+        self.last_narration_template: Optional[str] = None
         
         # NEW: Track used actions to prevent repetition
         self.used_actions = set()
 
+        # Learned speaker model, shared process-wide
+        self.speaker_model = load_speaker_model(config.speaker_model_path) if config.speaker_model_path else None
+
+        # Speaker prompt with the static scene description pre-rendered
+        self._speaker_prompt = DIRECTOR_SELECT_SPEAKER_TEMPLATE.partial(
+            description=story_manager.state.seed_story.get("description", "")
+        )
+
+    # ── Checkpointing ─────────────────────────────────────────────────────────
+
+    _CHECKPOINT_FIELDS = (
+        "turning_point_fired", "intervention_fired", "last_speaker", "second_last_speaker", "used_actions",
+        "last_phase", "last_narration_template"
+    )
+
+    def checkpoint_state(self) -> Dict:
+        data = {name: getattr(self, name) for name in self._CHECKPOINT_FIELDS}
+        data["turning_point"] = self.turning_point_event["id"]
+        return data
+
+    def restore_state(self, data: Dict) -> None:
+        for name in self._CHECKPOINT_FIELDS:
+            setattr(self, name, data[name])
+        self.turning_point_event = next(e for e in TURNING_POINT_EVENTS if e["id"] == data["turning_point"])
+
     # ── Issue 1: Plot Clock ────────────────────────────────────────────────────
 
     def get_current_phase(self) -> Dict:
@@ -186,11 +255,10 @@ class DirectorAgent(BaseAgent):
         Fires at turn 15 if we're still in complexity phase (no resolution motion).
         """
         turn = self.story_manager.state.current_turn
-        phase = self.get_current_phase()
 
-        if turn >= 15 and not self.intervention_fired and phase["name"] != "resolution":
+        if self._intervention_due():
             self.intervention_fired = True
-            intervention = random.choice(HARD_INTERVENTIONS)
+            intervention = self.rng.choice(HARD_INTERVENTIONS)
             # Apply knowledge to affected characters
             for char_name, knowledge_item in intervention.get("knowledge", {}).items():
                 profile = self.story_manager.state.character_profiles.get(char_name)
@@ -204,9 +272,20 @@ class DirectorAgent(BaseAgent):
             return intervention
         return None
 
-    def _fire_turning_point_if_needed(self) -> Optional[Dict]:
+    def _intervention_due(self) -> bool:
+        turn = self.story_manager.state.current_turn
         phase = self.get_current_phase()
-        if phase["name"] == "resolution" and not self.turning_point_fired:
+        return turn >= 15 and not self.intervention_fired and phase["name"] != "resolution"
+
+    def _turning_point_due(self) -> bool:
+        return self.get_current_phase()["name"] == "resolution" and not self.turning_point_fired
+
+    def has_pending_event(self) -> bool:
+        """True if the next speaker selection will fire an intervention or turning point."""
+        return self._intervention_due() or self._turning_point_due()
+
+    def _fire_turning_point_if_needed(self) -> Optional[Dict]:
+        if self._turning_point_due():
             self.turning_point_fired = True
             for char_name, knowledge_item in self.turning_point_event["character_impacts"].items():
                 profile = self.story_manager.state.character_profiles.get(char_name)
@@ -218,7 +297,7 @@ class DirectorAgent(BaseAgent):
     # ── Decision Logic ────────────────────────────────────────────────────────
 
     def _log_director_reasoning(self, decision_type: str, reason: str, metadata: Dict = None) -> None:
-        self.logs.append({
+        self._append_log({
             "timestamp": datetime.now().isoformat(),
             "agent": "Director",
             "decision_type": decision_type,
@@ -238,10 +317,10 @@ class DirectorAgent(BaseAgent):
             return self._select_action()
 
         if self.story_manager.should_escalate_tension():
-            if random.random() > 0.5:
+            if self.rng.random() > 0.5:
                 return self._select_action()
 
-        if current_turn > 5 and random.random() < 0.3:
+        if current_turn > 5 and self.rng.random() < 0.3:
             return self._select_action()
 
         return "dialogue", None, None
@@ -250,16 +329,11 @@ class DirectorAgent(BaseAgent):
         available_chars = list(self.story_manager.state.character_profiles.keys())
         phase = self.get_current_phase()
 
-        char_scores = []
-        for char_name in available_chars:
-            profile = self.story_manager.state.character_profiles[char_name]
-            avg_suspicion = sum(profile.suspicion.values()) / max(len(profile.suspicion), 1)
-            avg_trust = sum(profile.trust.values()) / max(len(profile.trust), 1)
-            score = avg_suspicion - avg_trust + random.random() * 0.3
-            char_scores.append((char_name, score))
-
-        char_scores.sort(key=lambda x: x[1], reverse=True)
-        selected_char = char_scores[0][0]
+        # Mean suspicion minus mean trust per character, plus a little noise
+        relationships = self.story_manager.relationships
+        tension = relationships.row_means("suspicion") - relationships.row_means("trust")
+        noise = np.array([self.rng.random() * 0.3 for _ in available_chars])
+        selected_char = relationships.names[int(np.argmax(tension + noise))]
 
         all_actions = self.ACTION_TEMPLATES.get(selected_char, ["performs an action"])
         
@@ -278,13 +352,13 @@ class DirectorAgent(BaseAgent):
             recent_keywords.update(line.lower().split())
         preferred = [a for a in available_actions if not any(kw in a.lower() for kw in recent_keywords)]
         
-        action_text = random.choice(preferred if preferred else available_actions)
+        action_text = self.rng.choice(preferred if preferred else available_actions)
         
         # NEW: Mark this action as used
         self.used_actions.add(action_text)
 
         other_chars = [c for c in available_chars if c != selected_char]
-        targets = random.sample(other_chars, min(2, len(other_chars)))
+        targets = self.rng.sample(other_chars, min(2, len(other_chars)))
 
         action_dict = {
             "character": selected_char,
@@ -304,24 +378,126 @@ class DirectorAgent(BaseAgent):
 
     # ── Speaker Selection ─────────────────────────────────────────────────────
 
+    def rank_likely_speakers(self, story_state: StoryState, available_characters: List[str]) -> List[str]:
+        """
+        Cheap local guess at who the LLM will pick next, most likely first.
+        Used to start speculative character drafts alongside the director call.
+        """
+        candidates = [c for c in available_characters if c != self.last_speaker] or available_characters[:]
+        last_line = self._last_line(story_state)
+
+        def score(name: str) -> float:
+            value = 0.0
+            # Someone addressed by name in the last line usually answers
+            if self._is_addressed(name, last_line):
+                value += 2.0
+            if name == self.second_last_speaker:
+                value -= 1.0
+            return value
+
+        return sorted(candidates, key=score, reverse=True)
+
+    @staticmethod
+    def _last_line(story_state: StoryState) -> str:
+        return story_state.dialogue_history[-1].dialogue.lower() if story_state.dialogue_history else ""
+
+    @staticmethod
+    def _is_addressed(name: str, last_line: str) -> bool:
+        return any(part.lower() in last_line for part in name.split() if len(part) > 3)
+
+    def selection_needs_llm(self) -> bool:
+        """False if the next speaker selection will be made locally (config.heuristic_director)."""
+        return (not self.config.heuristic_director or self.has_pending_event()
+                or self.get_current_phase()["name"] != self.last_phase)
+
+    def score_speakers(self, story_state: StoryState, candidates: List[str]) -> Dict[str, float]:
+        """
+        Local stand-in for the LLM's speaker choice: whoever was just addressed,
+        whoever is most at odds with the last speaker, and whoever has not
+        played their phase mandate this round. Repeats are penalised.
+        """
+        last_line = self._last_line(story_state)
+        relationships = self.story_manager.relationships
+        suspicion, trust = relationships.matrix("suspicion"), relationships.matrix("trust")
+        last = relationships.index.get(self.last_speaker)
+        # Speakers of the last round (everyone else gets a turn before anyone repeats)
+        recent = {t.speaker for t in story_state.dialogue_history[-(len(relationships.names) - 1):]}
+
+        scores = {}
+        for name in candidates:
+            score = 0.0
+            if self._is_addressed(name, last_line):
+                score += 2.0
+            i = relationships.index[name]
+            if last is not None and i != last:
+                score += float(suspicion[i, last] - trust[i, last])
+            if name not in recent:
+                score += 1.0
+            if name == self.last_speaker:
+                score -= 3.0
+            if name == self.second_last_speaker:
+                score -= 1.0
+            scores[name] = score
+        return scores
+
+    def selection_context(self, story_state: StoryState, candidates: List[str], event: bool) -> Dict:
+        """What the learned speaker model sees; logged with every LLM selection as training data."""
+        recent = story_state.dialogue_history[-self.config.context_history_turns:]
+        relationships = self.story_manager.relationships
+        last = relationships.index.get(self.last_speaker)
+        tension = None
+        if last is not None:
+            suspicion, trust = relationships.matrix("suspicion"), relationships.matrix("trust")
+            tension = {}
+            for name in candidates:
+                i = relationships.index[name]
+                if i != last:
+                    tension[name] = round(float(suspicion[i, last] - trust[i, last]), 3)
+        return {
+            "phase": self.get_current_phase()["name"],
+            "candidates": candidates,
+            "recent_speakers": [t.speaker for t in recent],
+            "last_line": recent[-1].dialogue if recent else "",
+            "event": event,
+            "tension": tension
+        }
+
+    def _select_speaker_locally(
+        self, next_speaker: str, phase: Dict, selector: str, details: Dict
+    ) -> Tuple[str, str, str, None, None]:
+        last = self.last_speaker if self.last_speaker not in (None, next_speaker) else None
+
+        templates = [t for t in NARRATION_TEMPLATES[phase["name"]] if t != self.last_narration_template]
+        self.last_narration_template = self.rng.choice(templates)
+        narration = self.last_narration_template.format(speaker=next_speaker, last=last or "the crowd")
+        speaker_goal = self.get_speaker_mandate(next_speaker)
+        if last:
+            speaker_goal = f"Answer {last}'s last line directly. {speaker_goal}"
+
+        self.second_last_speaker = self.last_speaker
+        self.last_speaker = next_speaker
+        observe_speaker_selection(selector, self.run_metrics)
+
+        self._log_director_reasoning(
+            "speaker_selection",
+            f"Phase={phase['name']} | Speaker={next_speaker} | Goal={speaker_goal}",
+            {"speaker": next_speaker, "narration": narration, "goal": speaker_goal,
+             "selector": selector, **details}
+        )
+        return next_speaker, narration, speaker_goal, None, None
+
     async def select_next_speaker(
         self, story_state: StoryState, available_characters: List[str]
     ) -> Tuple[str, Optional[str], Optional[str], Optional[Dict], Optional[Dict]]:
         """
         Returns: (next_speaker, narration, speaker_goal, turning_point_event, intervention_event)
         """
+        use_llm = self.selection_needs_llm()
         intervention = self._check_hard_intervention()
         tp_event = self._fire_turning_point_if_needed()
 
         phase = self.get_current_phase()
-
-        if story_state.dialogue_history:
-            recent_dialogue = "\n".join(
-                f"{t.speaker}: {t.dialogue}"
-                for t in story_state.dialogue_history[-4:]
-            )
-        else:
-            recent_dialogue = "No dialogue yet. The story is just starting."
+        self.last_phase = phase["name"]
 
         # Filter out speaker who spoke twice in a row
         filtered = available_characters[:]
@@ -329,6 +505,21 @@ class DirectorAgent(BaseAgent):
             if self.last_speaker in filtered and len(filtered) > 1:
                 filtered = [c for c in filtered if c != self.last_speaker]
 
+        if not use_llm:
+            scores = self.score_speakers(story_state, filtered)
+            return self._select_speaker_locally(
+                max(filtered, key=scores.__getitem__), phase, "heuristic",
+                {"scores": {name: round(s, 3) for name, s in scores.items()}}
+            )
+
+        # Confident model predictions replace the call (events still need the LLM's goal)
+        context = self.selection_context(story_state, filtered, bool(intervention or tp_event))
+        if self.speaker_model is not None and not context["event"]:
+            speaker, confidence = self.speaker_model.predict(context)
+            if confidence >= self.config.speaker_model_min_confidence:
+                return self._select_speaker_locally(speaker, phase, "model", {"confidence": round(confidence, 3)})
+        observe_speaker_selection("llm", self.run_metrics)
+
         # Active clue context
         clue_context = ""
         if story_state.current_turn in (5, 10, 15):
@@ -346,9 +537,22 @@ class DirectorAgent(BaseAgent):
         # NEW: Get entity context for Director
         entity_context = self.story_manager.get_entity_context()
 
-        from ..prompts.director_prompts import DIRECTOR_SELECT_SPEAKER_PROMPT
-        prompt = DIRECTOR_SELECT_SPEAKER_PROMPT.format(
-            description=story_state.seed_story.get("description", ""),
+        # Pack clue, registry and newest-first history into the token budget
+        recent_turns = story_state.dialogue_history[-self.config.context_history_turns:]
+        window = self.story_manager.context_assembler.pack([
+            ContextBlock("clue", 0, [clue_context] if clue_context else []),
+            ContextBlock("entity_registry", 0, entity_context.split("\n")),
+            ContextBlock("history", 1, [f"{t.speaker}: {t.dialogue}" for t in reversed(recent_turns)]),
+        ])
+        clue_context = "".join(window.blocks["clue"])
+        entity_context = "\n".join(window.blocks["entity_registry"])
+        history = window.blocks["history"][::-1]
+        if history:
+            recent_dialogue = "\n".join(history)
+        else:
+            recent_dialogue = "No dialogue yet. The story is just starting."
+
+        prompt = self._speaker_prompt.render(
             narrative_phase=phase["name"].upper(),
             phase_goal=phase["goal"],
             phase_turns=f"{phase['turns'][0]}–{phase['turns'][1]}",
@@ -359,14 +563,19 @@ class DirectorAgent(BaseAgent):
             available_characters=", ".join(filtered)
         )
 
-        response = await self.generate_response(prompt)
+        if self.config.stream_responses:
+            response = await self.stream_response(prompt)
+        else:
+            response = await self.generate_response(prompt)
 
+        parse_started = time.perf_counter()
         try:
             cleaned = self._clean_json_response(response)
             data = json.loads(cleaned)
             next_speaker = data.get("next_speaker", filtered[0])
             narration = data.get("narration", "")
             speaker_goal = data.get("speaker_goal", "")
+            self._record_parse(parse_started, ok=True)
 
             if override_narration:
                 narration = override_narration
@@ -384,12 +593,14 @@ class DirectorAgent(BaseAgent):
             self._log_director_reasoning(
                 "speaker_selection",
                 f"Phase={phase['name']} | Speaker={next_speaker} | Goal={speaker_goal}",
-                {"speaker": next_speaker, "narration": narration, "goal": speaker_goal}
+                {"speaker": next_speaker, "narration": narration, "goal": speaker_goal,
+                 "selector": "llm", "context": context, "context_window": window.report()}
             )
 
             return next_speaker, narration, speaker_goal, tp_event, intervention
 
         except Exception as e:
+            self._record_parse(parse_started, ok=False)
             print(f"Director parse error: {e}")
             fallback = filtered[0]
             self.second_last_speaker = self.last_speaker
@@ -412,7 +623,7 @@ class DirectorAgent(BaseAgent):
             )
             return True, f"Story concluded at turn {current_turn}", narration
 
-        if current_turn >= 18 and random.random() < 0.2:
+        if current_turn >= 18 and self.rng.random() < 0.2:
             narration = self._generate_mystery_reveal()
             self._log_director_reasoning(
                 "conclusion", f"Natural resolution at turn {current_turn}", {}
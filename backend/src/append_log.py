@@ -0,0 +1,98 @@
+from collections.abc import Sequence
+from typing import Any, Iterable, List, Optional, Tuple
+from pydantic_core import core_schema
+
+
+class AppendLog(Sequence):
+    """
+    Immutable list that grows by chaining chunks. `appended()` returns a new log
+    sharing every earlier chunk, so adding a step's items costs O(new items)
+    however long the story is, and older versions stay valid (graph channels
+    hand the same value to several readers). Recent items (`log[-1]`,
+    `log[-k:]`) are read from the newest chunks; a full read flattens once and
+    caches the result.
+    """
+
+    __slots__ = ("_prev", "_chunk", "_len", "_flat")
+
+    def __init__(self, items: Iterable = ()):
+        self._prev: Optional["AppendLog"] = None
+        self._chunk: Tuple = tuple(items)
+        self._len = len(self._chunk)
+        self._flat: Optional[Tuple] = None
+
+    def appended(self, items: Iterable) -> "AppendLog":
+        chunk = tuple(items)
+        if not chunk:
+            return self
+        if not self._len:
+            return AppendLog(chunk)
+        log = AppendLog.__new__(AppendLog)
+        log._prev, log._chunk, log._len, log._flat = self, chunk, self._len + len(chunk), None
+        return log
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1 and stop == self._len:
+                return self._tail(stop - start)
+            return list(self._flatten()[index])
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("AppendLog index out of range")
+        node = self
+        while index < node._len - len(node._chunk):
+            node = node._prev
+        return node._chunk[index - (node._len - len(node._chunk))]
+
+    def __iter__(self):
+        return iter(self._flatten())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (AppendLog, list, tuple)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __reduce__(self):
+        # Pickle flat: a long chunk chain would otherwise recurse once per chunk
+        return (AppendLog, (self._flatten(),))
+
+    def __repr__(self) -> str:
+        return f"AppendLog({list(self)!r})"
+
+    def _tail(self, count: int) -> List:
+        chunks, collected, node = [], 0, self
+        while node is not None and collected < count:
+            chunks.append(node._chunk)
+            collected += len(node._chunk)
+            node = node._prev
+        items = [item for chunk in reversed(chunks) for item in chunk]
+        return items[len(items) - count:]
+
+    def _flatten(self) -> Tuple:
+        if self._flat is None:
+            self._flat = tuple(self._tail(self._len))
+        return self._flat
+
+    # Accepted as-is by pydantic (no per-step revalidation of the history); dumps as a list
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._coerce,
+            serialization=core_schema.plain_serializer_function_ser_schema(list)
+        )
+
+    @classmethod
+    def _coerce(cls, value: Any) -> "AppendLog":
+        return value if isinstance(value, AppendLog) else cls(value)
+
+
+def append_items(current: Optional[AppendLog], new: Iterable) -> AppendLog:
+    """LangGraph reducer: nodes return only their new items, which are appended."""
+    if current is None or (not len(current) and isinstance(new, AppendLog)):
+        return AppendLog._coerce(new)
+    return current.appended(new)
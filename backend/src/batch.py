@@ -0,0 +1,246 @@
+"""
+Headless batch runner: many simulations across all cores.
+
+Each worker process runs its share of the plan with asyncio (up to
+--concurrency sessions at once) and streams one JSON line per finished run
+to its own shard, <output-dir>/shard-<worker>.jsonl. Aggregate stats are
+printed at the end.
+
+    python src/batch.py --runs 200 --workers 4 --backend fake
+    python src/batch.py --quota saleem_innocent=50 --quota raza_corrupt=50 --seed 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.config import StoryConfig
+from src.agents.director_agent import TURNING_POINT_EVENTS
+from src.engine.sessions import StorySession
+from src.fast_state import to_story_state
+from src.llm.pool import shutdown_llm_pool
+from src.log_sink import shutdown_log_sink
+from src.scenarios import get_scenario_registry
+from src.story_state import StoryStateManager
+
+
+@dataclass
+class BatchJob:
+    run_id: int
+    seed: int
+    hidden_truth: str
+    turning_point: str
+
+
+def plan_jobs(runs: int, quotas: Dict[str, int], seeds: Optional[List[int]], base_seed: int) -> List[BatchJob]:
+    """
+    Mysteries come from `quotas` (or are spread evenly over all of them);
+    turning points cycle within each mystery so every pairing gets covered.
+    """
+    if quotas:
+        mysteries = [m for m, count in quotas.items() for _ in range(count)]
+    else:
+        options = StoryStateManager.MYSTERY_OPTIONS
+        mysteries = [options[i % len(options)] for i in range(runs)]
+
+    if seeds is not None and len(seeds) < len(mysteries):
+        raise SystemExit(f"--seeds lists {len(seeds)} seeds for {len(mysteries)} runs")
+
+    per_mystery = Counter()
+    jobs = []
+    for i, mystery in enumerate(mysteries):
+        # Offset by mystery so small quotas don't all start on the same turning point
+        offset = StoryStateManager.MYSTERY_OPTIONS.index(mystery)
+        turning_point = TURNING_POINT_EVENTS[(per_mystery[mystery] + offset) % len(TURNING_POINT_EVENTS)]["id"]
+        per_mystery[mystery] += 1
+        seed = seeds[i] if seeds is not None else base_seed + i
+        jobs.append(BatchJob(i, seed, mystery, turning_point))
+    return jobs
+
+
+# ── Worker process ───────────────────────────────────────────────────────────
+
+def run_shard(worker: int, jobs: List[BatchJob], options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Entry point in each worker process; returns the summary of every run."""
+    return asyncio.run(_run_shard(worker, jobs, options))
+
+
+async def _run_shard(worker: int, jobs: List[BatchJob], options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    config = _worker_config(options)
+    scenario = get_scenario_registry(config).get(options["scenario"])
+    shard_path = Path(options["output_dir"]) / f"shard-{worker:03d}.jsonl"
+    slots = asyncio.Semaphore(options["concurrency"])
+    summaries = []
+
+    with shard_path.open("w", encoding="utf-8") as shard:
+        async def run_one(job: BatchJob) -> None:
+            async with slots:
+                record = await _run_job(job, scenario, config)
+            # One line per run, written as soon as it finishes
+            shard.write(json.dumps(record, default=str) + "\n")
+            shard.flush()
+            summaries.append({k: v for k, v in record.items() if k not in ("events", "metrics")}
+                             | {"llm_totals": record.get("metrics", {}).get("llm_totals", {})})
+
+        await asyncio.gather(*(run_one(job) for job in jobs))
+
+    await shutdown_llm_pool()
+    shutdown_log_sink()
+    return summaries
+
+
+def _worker_config(options: Dict[str, Any]) -> StoryConfig:
+    config = StoryConfig()
+    if options["backend"]:
+        config.llm_backend = options["backend"]
+    if options["latency_ms"] is not None:
+        config.injected_latency_ms = options["latency_ms"]
+    # The LLM concurrency budget is split across worker processes
+    config.llm_max_concurrency = max(1, options["llm_concurrency"] // options["workers"])
+    config.stream_responses = False
+    config.fast_state = True
+    return config
+
+
+async def _run_job(job: BatchJob, scenario, config: StoryConfig) -> Dict[str, Any]:
+    record: Dict[str, Any] = {**asdict(job), "scenario": scenario.name}
+    started = time.perf_counter()
+    try:
+        session = StorySession(
+            f"batch-{job.run_id}", scenario.seed_story, scenario.characters, config,
+            hidden_truth=job.hidden_truth, turning_point=job.turning_point, seed=job.seed,
+            signals=scenario.signals
+        )
+        story = to_story_state(await session.run())
+        narrative = session.narrative
+        record.update({
+            "status": "completed",
+            "dialogue_turns": narrative.dialogue_turn_counter,
+            "actions_triggered": narrative.action_counter,
+            "target_turns": session.story_manager.total_turns,
+            "conclusion_reason": story.conclusion_reason,
+            "events": list(story.events),
+            "metrics": narrative.metrics.summary()
+        })
+    except Exception as e:
+        record.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+    record["duration_s"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+# ── Aggregation ──────────────────────────────────────────────────────────────
+
+def aggregate(summaries: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    ok = [s for s in summaries if s["status"] == "completed"]
+    durations = sorted(s["duration_s"] for s in ok)
+    llm_totals = Counter()
+    for s in ok:
+        llm_totals.update(s.get("llm_totals", {}))
+
+    by_mystery = {}
+    for mystery in sorted({s["hidden_truth"] for s in summaries}):
+        runs = [s for s in ok if s["hidden_truth"] == mystery]
+        by_mystery[mystery] = {
+            "runs": len(runs),
+            "mean_dialogue_turns": round(statistics.fmean(s["dialogue_turns"] for s in runs), 2) if runs else 0,
+            "mean_actions": round(statistics.fmean(s["actions_triggered"] for s in runs), 2) if runs else 0
+        }
+
+    def pct(p: float) -> float:
+        return durations[min(len(durations) - 1, int(round(p * (len(durations) - 1))))] if durations else 0.0
+
+    return {
+        "runs": len(summaries),
+        "completed": len(ok),
+        "failed": len(summaries) - len(ok),
+        "elapsed_s": round(elapsed, 2),
+        "runs_per_hour": round(len(ok) / elapsed * 3600, 1) if elapsed else 0.0,
+        "run_duration_s": {
+            "mean": round(statistics.fmean(durations), 3) if durations else 0.0,
+            "p50": round(pct(0.50), 3),
+            "p95": round(pct(0.95), 3)
+        },
+        "by_mystery": by_mystery,
+        "turning_points": dict(Counter(s["turning_point"] for s in ok)),
+        "conclusions": dict(Counter(s["conclusion_reason"] for s in ok)),
+        "llm_totals": {k: round(v, 3) for k, v in llm_totals.items()}
+    }
+
+
+def parse_quotas(values: List[str]) -> Dict[str, int]:
+    quotas = {}
+    for value in values:
+        mystery, _, count = value.partition("=")
+        if mystery not in StoryStateManager.MYSTERY_OPTIONS or not count.isdigit():
+            raise SystemExit(f"Bad --quota '{value}' (expected <mystery>=<count>, mysteries: "
+                             f"{', '.join(StoryStateManager.MYSTERY_OPTIONS)})")
+        quotas[mystery] = int(count)
+    return quotas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="Total runs, spread evenly over all mysteries")
+    parser.add_argument("--quota", action="append", default=[], metavar="MYSTERY=N",
+                        help="Runs for one mystery (repeatable; replaces --runs)")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; run i gets seed+i")
+    parser.add_argument("--seeds", help="Explicit comma-separated seeds, one per run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent sessions per worker")
+    parser.add_argument("--llm-concurrency", type=int, default=StoryConfig.llm_max_concurrency * 4,
+                        help="In-flight LLM calls across all workers")
+    parser.add_argument("--scenario", default=None, help="Scenario under examples/ (default: config)")
+    parser.add_argument("--backend", default=None, choices=["gemini", "fake", "replay"])
+    parser.add_argument("--latency-ms", type=float, default=None)
+    parser.add_argument("--output-dir", help="Shard directory (default: batch_runs/<timestamp>)")
+    args = parser.parse_args()
+
+    quotas = parse_quotas(args.quota)
+    seeds = [int(s) for s in args.seeds.split(",")] if args.seeds else None
+    jobs = plan_jobs(args.runs, quotas, seeds, args.seed)
+    workers = max(1, min(args.workers, len(jobs)))
+
+    output_dir = Path(args.output_dir) if args.output_dir else \
+        project_root / "batch_runs" / datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    options = {
+        "scenario": args.scenario or StoryConfig().default_scenario,
+        "output_dir": str(output_dir),
+        "concurrency": args.concurrency,
+        "llm_concurrency": args.llm_concurrency,
+        "workers": workers,
+        "backend": args.backend,
+        "latency_ms": args.latency_ms
+    }
+    # Fail fast on a bad scenario before starting any workers
+    get_scenario_registry(StoryConfig()).get(options["scenario"])
+
+    print(f"Running {len(jobs)} simulations on {workers} workers × {args.concurrency} sessions → {output_dir}")
+    started = time.perf_counter()
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, w, jobs[w::workers], options) for w in range(workers)]
+        for future in futures:
+            summaries.extend(future.result())
+    stats = aggregate(summaries, time.perf_counter() - started)
+
+    (output_dir / "summary.json").write_text(json.dumps(stats, indent=2))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -10,13 +11,97 @@ class StoryConfig:
     model_name: str = "gemma-3-27b-it"
     temperature: float = 0.7
     
+    # Session RNG seed (hidden truth, pacing rolls, director choices); None = fresh per session
+    seed: Optional[int] = field(default_factory=lambda: int(os.environ["STORY_SEED"]) if os.getenv("STORY_SEED") else None)
+
     max_turns: int = 25
     min_turns: int = 10
     max_tokens_per_prompt: int = 2000
-    max_context_length: int = 4000
+    max_context_length: int = 4000  # token budget for the assembled history/registry/memory/clue context
+    context_history_turns: int = 4  # most recent turns considered for prompt history
     
     max_consecutive_same_character: int = 2
     
     num_characters: int = 4
     max_dialogue_length: int = 200
-    
\ No newline at end of file
+
+    # Scenarios: examples/<name>/ directories, re-read when their files change
+    scenarios_dir: str = "examples"
+    default_scenario: str = field(default_factory=lambda: os.getenv("SCENARIO", "rickshaw_accident"))
+    scenario_poll_interval: float = 2.0
+
+    # Session engine (server)
+    max_concurrent_sessions: int = 8
+    max_queued_sessions: int = 32
+    session_queue_timeout: float = 30.0
+
+    # SSE pacing: "none", "fixed" (server waits sse_step_delay after each graph step)
+    # or "typewriter" (client reveals text at sse_typewriter_cps)
+    sse_pacing: str = field(default_factory=lambda: os.getenv("SSE_PACING", "none"))
+    sse_step_delay: float = 0.1
+    sse_typewriter_cps: float = 40.0
+
+    # Resumable streams: a run outlives its viewers for session_resume_grace seconds,
+    # and the event logs of the last event_log_retention runs stay available to reconnects
+    session_resume_grace: float = 10.0
+    event_log_retention: int = 64
+    event_log_memory_events: int = 5000
+    event_log_dir: Optional[str] = field(default_factory=lambda: os.getenv("EVENT_LOG_DIR"))
+
+    # Durable sessions: with CHECKPOINT_PATH set, running sessions are snapshotted to that SQLite
+    # file after every turn, and a restarted worker resumes them from their last completed turn
+    checkpoint_path: Optional[str] = field(default_factory=lambda: os.getenv("CHECKPOINT_PATH"))
+
+    # Shared LLM client pool
+    llm_max_concurrency: int = 16
+    llm_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+
+    # Speculative generation: draft likely speakers' lines while the director decides
+    speculative_generation: bool = False
+    speculative_fanout: int = 2
+    speculative_budget: int = 15  # max discarded drafts per session
+    # Drafts are written for the phase mandate; by default one is used only if the
+    # director picks the same goal, otherwise the line is regenerated for its goal
+    speculative_accept_goal_mismatch: bool = False
+
+    # Heuristic director (HEURISTIC_DIRECTOR=1): speaker, goal and narration are chosen locally;
+    # the LLM director is only asked on phase changes, interventions and turning points
+    heuristic_director: bool = field(default_factory=lambda: os.getenv("HEURISTIC_DIRECTOR", "0") == "1")
+
+    # Learned speaker model (SPEAKER_MODEL=<.npz from src/train_speaker_model.py): picks the speaker
+    # instead of the LLM director whenever its probability is at least speaker_model_min_confidence
+    speaker_model_path: Optional[str] = field(default_factory=lambda: os.getenv("SPEAKER_MODEL"))
+    speaker_model_min_confidence: float = 0.6
+
+    # Stream completions (time-to-first-token metrics, live dialogue deltas over SSE)
+    stream_responses: bool = True
+
+    # Graph state between nodes: pydantic StoryState (validated every step) or, with
+    # FAST_STATE=1, slots dataclasses validated only when the final state is converted
+    fast_state: bool = field(default_factory=lambda: os.getenv("FAST_STATE", "0") == "1")
+
+    # LLM backend: "gemini" (live), "fake" (deterministic offline) or "replay" (recorded logs)
+    llm_backend: str = field(default_factory=lambda: os.getenv("LLM_BACKEND", "gemini"))
+    replay_log_paths: tuple = ("prompts_log.json", "prompts.jsonl")
+    injected_latency_ms: float = field(default_factory=lambda: float(os.getenv("LLM_LATENCY_MS", "0")))
+    injected_latency_jitter_ms: float = 0.0
+
+    # Prompt/response logs: agents keep the newest agent_log_buffer entries in memory;
+    # with PROMPT_LOG_PATH set, every entry is also appended there as JSONL (rotated, gzipped)
+    agent_log_buffer: int = 1000
+    prompt_log_path: Optional[str] = field(default_factory=lambda: os.getenv("PROMPT_LOG_PATH"))
+    prompt_log_max_bytes: int = 50_000_000
+    prompt_log_backups: int = 5
+    prompt_log_compress: bool = True
+
+    # Memory volatility log: deltas with a full keyframe every volatility_keyframe_interval
+    # turns; segments older than the last volatility_log_size turns are dropped
+    volatility_keyframe_interval: int = 5
+    volatility_log_size: int = 200
+
+    # Opt-in prompt → response cache (LRU in memory, optional SQLite file shared across workers)
+    response_cache: bool = field(default_factory=lambda: os.getenv("LLM_CACHE", "0") == "1")
+    response_cache_size: int = 1024
+    response_cache_ttl: Optional[float] = None  # seconds; None = never expire
+    response_cache_path: Optional[str] = field(default_factory=lambda: os.getenv("LLM_CACHE_PATH"))
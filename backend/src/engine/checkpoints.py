@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+
+class Checkpoint(NamedTuple):
+    session_id: str
+    scenario: str
+    seed: int
+    hidden_truth: str
+    turning_point: str
+    pacing: str
+    turn: int
+    updated: float
+    snapshot: bytes
+
+
+class SessionCheckpointer:
+    """
+    Latest turn-boundary snapshot of every running session, in a SQLite file,
+    so a restarted worker can pick its runs back up. One row per session,
+    overwritten each turn and deleted once the run is over for good.
+    Snapshots are pickles of our own objects: only point this at a file the
+    workers own.
+    """
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Survives a killed process (not a power cut) without an fsync per turn
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, scenario TEXT NOT NULL, seed INTEGER NOT NULL, "
+            "hidden_truth TEXT NOT NULL, turning_point TEXT NOT NULL, pacing TEXT NOT NULL, "
+            "turn INTEGER NOT NULL, updated REAL NOT NULL, snapshot BLOB NOT NULL)"
+        )
+
+    def save(self, session_id: str, scenario: str, seed: int, hidden_truth: str, turning_point: str,
+             pacing: str, turn: int, snapshot: bytes) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, scenario, seed, hidden_truth, turning_point, pacing, turn, time.time(), snapshot)
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def get(self, session_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return Checkpoint(*row) if row else None
+
+    def pending(self) -> List[Checkpoint]:
+        """Every checkpointed session, oldest update first."""
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM sessions ORDER BY updated").fetchall()
+        return [Checkpoint(*row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
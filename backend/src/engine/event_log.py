@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+
+
+def sse_frame(event: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """One SSE message; `event_id` becomes the id the browser echoes back as Last-Event-ID."""
+    prefix = f"id: {event_id}\n" if event_id else ""
+    return f"{prefix}data: {json.dumps(event)}\n\n"
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    """
+    Split a "<session_id>:<seq>" (first run) or "<session_id>:<epoch>:<seq>"
+    (resumed run) event id into (session_id, epoch, seq), None if it is not one of ours.
+    """
+    parts = (event_id or "").split(":")
+    if len(parts) not in (2, 3) or not parts[0] or not all(p.isdigit() for p in parts[1:]):
+        return None
+    epoch = int(parts[1]) if len(parts) == 3 else 0
+    return parts[0], epoch, int(parts[-1])
+
+
+class EventLog:
+    """
+    Append-only log of one session's SSE frames, shared by every viewer.
+    Events must arrive with contiguous `seq` numbers starting at `first_seq`
+    (1, or the checkpointed seq + 1 for a resumed run, which is also a new
+    `epoch`; EventStream guarantees this). The newest `max_memory_events`
+    frames stay in memory; with `spill_dir`, every frame is also appended to
+    <spill_dir>/<session_id>.jsonl so viewers that fall further behind can
+    still be replayed in full. Spill writes are buffered: flush() at points
+    that must survive the process (turn checkpoints).
+    """
+
+    def __init__(self, session_id: str, max_memory_events: int = 5000, spill_dir: Optional[Path] = None,
+                 first_seq: int = 1, epoch: int = 0):
+        self.session_id = session_id
+        self.max_memory_events = max_memory_events
+        self.epoch = epoch
+        self.epoch_first_seq = first_seq
+        self.last_seq = first_seq - 1
+        self.closed = False
+        self._frames: List[str] = []
+        self._first_seq = first_seq  # seq of _frames[0]
+        self._spill_first_seq = first_seq  # seq of the spill file's first line
+        self._new = asyncio.Event()
+        self._spill_path = None
+        self._spill = None
+        if spill_dir is not None:
+            Path(spill_dir).mkdir(parents=True, exist_ok=True)
+            self._spill_path = Path(spill_dir) / f"{session_id}.jsonl"
+            # A resumed run keeps what the previous worker spilled up to the checkpoint
+            kept = self._spilled_prefix(first_seq - 1)
+            self._spill = self._spill_path.open("w", encoding="utf-8")
+            if kept:
+                self._spill.writelines(kept)
+                self._spill.flush()
+                self._spill_first_seq = 1
+
+    def append(self, events: List[Dict[str, Any]]) -> None:
+        if self.closed or not events:
+            return
+        prefix = f"{self.session_id}:{self.epoch}:" if self.epoch else f"{self.session_id}:"
+        for event in events:
+            frame = sse_frame(event, f"{prefix}{event['seq']}")
+            self._frames.append(frame)
+            if self._spill is not None:
+                self._spill.write(json.dumps(frame) + "\n")
+        self.last_seq = events[-1]["seq"]
+
+        # Trim in halves so trimming stays amortized O(1) per event
+        if len(self._frames) > self.max_memory_events:
+            drop = len(self._frames) - self.max_memory_events // 2
+            del self._frames[:drop]
+            self._first_seq += drop
+
+        self._wake()
+
+    def close(self) -> None:
+        """No more events; followers finish once they have read everything."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._wake()
+
+    def flush(self) -> None:
+        if self._spill is not None:
+            self._spill.flush()
+
+    def resume_after(self, epoch: int, seq: int) -> int:
+        """
+        Where a viewer whose Last-Event-ID was (epoch, seq) continues. Frames an
+        earlier epoch sent past this epoch's start were regenerated since, so
+        such a viewer replays from there, starting with the rewind event.
+        """
+        if epoch == self.epoch:
+            return seq
+        return min(seq, self.epoch_first_seq - 1)
+
+    def discard(self) -> None:
+        """Close the log and delete its spill file (the engine stopped retaining it)."""
+        self.close()
+        if self._spill_path is not None:
+            self._spill_path.unlink(missing_ok=True)
+
+    def read(self, after: int) -> str:
+        """All frames with seq > `after`, joined into a single write."""
+        start = max(after + 1, 1)
+        older = ""
+        if start < self._first_seq:
+            older = self._read_spilled(start, self._first_seq)
+            start = self._first_seq
+        return older + "".join(self._frames[start - self._first_seq:])
+
+    async def follow(self, after: int = 0) -> AsyncIterator[str]:
+        """Yield everything after `after`, then new frames as they arrive, until the log closes."""
+        while True:
+            waiter = self._new
+            if after < self.last_seq:
+                chunk = self.read(after)
+                after = self.last_seq
+                if chunk:
+                    yield chunk
+                continue
+            if self.closed:
+                return
+            await waiter.wait()
+
+    def _wake(self) -> None:
+        waiter, self._new = self._new, asyncio.Event()
+        waiter.set()
+
+    def _spilled_prefix(self, count: int) -> List[str]:
+        """The first `count` spill lines, [] unless the file has all of them."""
+        if count <= 0 or not self._spill_path.exists():
+            return []
+        with self._spill_path.open(encoding="utf-8") as f:
+            lines = list(itertools.islice(f, count))
+        return lines if len(lines) == count else []
+
+    def _read_spilled(self, start: int, stop: int) -> str:
+        """Frames [start, stop) from the spill file; "" if there is none (they were dropped)."""
+        if self._spill_path is None or not self._spill_path.exists():
+            return ""
+        self.flush()
+        frames = []
+        with self._spill_path.open(encoding="utf-8") as f:
+            for seq, line in enumerate(f, start=self._spill_first_seq):
+                if seq >= stop:
+                    break
+                if seq >= start:
+                    frames.append(json.loads(line))
+        return "".join(frames)
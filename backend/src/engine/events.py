@@ -0,0 +1,77 @@
+from typing import Dict, List, Any, Optional
+from ..schemas import EntityRegistry
+
+
+class EventStream:
+    """
+    Turns one session's graph output into client events.
+    Every event gets a monotonic `seq`; entity-registry changes go out as
+    diffs (`entity_update` events) instead of the full item dict each time.
+    `epoch` counts resumes: events after a checkpoint are regenerated by the
+    next worker under the same seqs, so ids carry the epoch to tell them apart.
+    """
+
+    def __init__(self, registry: EntityRegistry):
+        self.registry = registry
+        self.seq = 0
+        self.epoch = 0
+        self._items_version = -1
+        self._items: Dict[str, Dict[str, Any]] = {}
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        return {"seq": self.seq, "epoch": self.epoch, "items_version": self._items_version, "items": self._items}
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """Continue from a checkpoint, in a new epoch."""
+        self.seq = data["seq"]
+        self.epoch = data.get("epoch", 0) + 1
+        self._items_version = data["items_version"]
+        self._items = data["items"]
+
+    def rewind_event(self) -> Dict[str, Any]:
+        """
+        First event of a resumed run: viewers drop everything after `after_seq`
+        (a dead worker may have sent more) and reset the registry to `items`.
+        """
+        return {"type": "rewind", "after_seq": self.seq, "items": {name: dict(item) for name, item in self._items.items()}}
+
+    def stamp(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy `event` with the next sequence number (graph state is never mutated)."""
+        self.seq += 1
+        return {**event, "seq": self.seq}
+
+    def from_step(self, step: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """All events from one "updates" step, followed by an entity diff if anything changed."""
+        events = []
+        turn = 0
+        for node_name, output in step.items():
+            if not output:
+                continue
+            turn = output.get("current_turn", turn)
+            for event in output.get("events") or []:
+                stamped = self.stamp(event)
+                stamped.setdefault("turn", turn)
+                events.append(stamped)
+
+        diff = self.entity_diff()
+        if diff:
+            events.append(self.stamp({"type": "entity_update", "turn": turn, **diff}))
+        return events
+
+    def entity_diff(self) -> Optional[Dict[str, Any]]:
+        """Items added or changed and items removed since the last call, None if unchanged."""
+        if self.registry.version == self._items_version:
+            return None
+        self._items_version = self.registry.version
+
+        current = self.registry.items
+        changed = {
+            name: dict(item) for name, item in current.items()
+            if self._items.get(name) != item
+        }
+        removed = [name for name in self._items if name not in current]
+        self._items = {name: dict(item) for name, item in current.items()}
+
+        if not changed and not removed:
+            return None
+        return {"changed": changed, "removed": removed}
@@ -0,0 +1,367 @@
+import asyncio
+import pickle
+import uuid
+from collections import OrderedDict
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, AsyncIterator
+from ..config import StoryConfig
+from ..agents.character_agent import CharacterAgent
+from ..agents.director_agent import DirectorAgent
+from ..graph.narrative_graph import NarrativeGraph
+from ..signals import ScenarioSignals
+from ..story_state import StoryStateManager
+from .checkpoints import SessionCheckpointer
+from .event_log import EventLog
+from .events import EventStream
+
+
+class SessionRejected(Exception):
+    """Raised when the engine cannot admit a session (queue full or wait timed out)."""
+
+
+class StorySession:
+    """
+    One isolated simulation run: its own state manager, agents and counters.
+    The compiled graph and LLM clients are shared process-wide.
+    With `snapshot` (from checkpoint()), the run continues after that turn.
+    """
+
+    def __init__(self, session_id: str, seed_story: Dict, characters: List[Dict], config: StoryConfig,
+                 hidden_truth: Optional[str] = None, turning_point: Optional[str] = None,
+                 seed: Optional[int] = None, signals: Optional[ScenarioSignals] = None,
+                 scenario: Optional[str] = None, snapshot: Optional[bytes] = None):
+        self.session_id = session_id
+        self.config = config
+        self.seed_story = seed_story
+        self.scenario = scenario  # registry name; only named scenarios can be checkpointed
+        self.created_at = datetime.now()
+        self.status = "created"
+
+        self.story_manager = StoryStateManager(seed_story, characters, config, hidden_truth, seed, signals)
+        self.seed = self.story_manager.seed
+        self.characters = [
+            CharacterAgent(name=char["name"], config=config)
+            for char in characters
+        ]
+        self.director = DirectorAgent(config, self.story_manager, turning_point)
+        self.narrative = NarrativeGraph(config, self.characters, self.director, self.story_manager)
+        for agent in [self.director, *self.characters]:
+            agent.session_id = session_id
+
+        # Client-facing events, logged once and shared by every viewer of this run
+        self.events = EventStream(self.story_manager.state.entity_registry)
+        # Graph values to start from instead of the seed story
+        self.resume_values: Optional[Dict[str, Any]] = None
+        if snapshot is not None:
+            self._restore(snapshot)
+        # A resumed run keeps numbering where it stopped, so viewers' Last-Event-IDs still resolve
+        self.event_log = EventLog(
+            session_id, config.event_log_memory_events,
+            Path(config.event_log_dir) if config.event_log_dir else None,
+            first_seq=self.events.seq + 1, epoch=self.events.epoch
+        )
+        self.viewers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._idle_timer: Optional[asyncio.TimerHandle] = None
+
+    def initial_state(self) -> Dict[str, Any]:
+        if self.resume_values is not None:
+            return self.resume_values
+        return self.narrative.build_initial_state(
+            self.seed_story, self.story_manager.state.character_profiles
+        )
+
+    async def run(self) -> Dict[str, Any]:
+        """Run to completion without streaming; returns the final graph state."""
+        return await self.narrative.run(self.seed_story, self.story_manager.state.character_profiles)
+
+    def astream(self, stream_mode="updates"):
+        return self.narrative.astream(self.initial_state(), stream_mode=stream_mode)
+
+    # ── Checkpointing ─────────────────────────────────────────────────────────
+
+    def checkpoint(self, values: Dict[str, Any]) -> bytes:
+        """
+        Graph values at a turn boundary plus the manager, director, graph and
+        event-stream state, pickled in one call so objects shared between them
+        (profiles, the entity registry) are still shared after restore().
+        """
+        return pickle.dumps({
+            "values": values,
+            "manager": self.story_manager.checkpoint_state(),
+            "director": self.director.checkpoint_state(),
+            "narrative": self.narrative.checkpoint_state(),
+            "events": self.events.checkpoint_state()
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _restore(self, snapshot: bytes) -> None:
+        data = pickle.loads(snapshot)
+        self.story_manager.restore_state(data["manager"])
+        self.director.restore_state(data["director"])
+        self.narrative.restore_state(data["narrative"])
+        self.events = EventStream(self.story_manager.state.entity_registry)
+        self.events.restore_state(data["events"])
+        self.resume_values = data["values"]
+
+
+class SessionEngine:
+    """
+    Runs many StorySessions in one worker with admission control.
+    At most `max_concurrent_sessions` run at once; up to `max_queued_sessions`
+    wait for a slot, anything beyond that is rejected immediately.
+    """
+
+    def __init__(self, config: Optional[StoryConfig] = None):
+        self.config = config or StoryConfig()
+        self.sessions: Dict[str, StorySession] = {}
+        # Logs of running and recently finished sessions, oldest first
+        self.event_logs: "OrderedDict[str, EventLog]" = OrderedDict()
+        self._slots = asyncio.Semaphore(self.config.max_concurrent_sessions)
+        self._running = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._shutting_down = False
+        self.checkpoints: Optional[SessionCheckpointer] = None
+        if self.config.checkpoint_path:
+            self.checkpoints = SessionCheckpointer(Path(self.config.checkpoint_path))
+
+    def create_session(self, seed_story: Dict, characters: List[Dict], seed: Optional[int] = None,
+                       signals: Optional[ScenarioSignals] = None, scenario: Optional[str] = None) -> StorySession:
+        session = StorySession(uuid.uuid4().hex, seed_story, characters, self.config,
+                               seed=seed, signals=signals, scenario=scenario)
+        self.sessions[session.session_id] = session
+        return session
+
+    def get_session(self, session_id: str) -> Optional[StorySession]:
+        return self.sessions.get(session_id)
+
+    def is_saturated(self) -> bool:
+        """True if a new session would be rejected right now."""
+        return (self._running >= self.config.max_concurrent_sessions
+                and self._waiting >= self.config.max_queued_sessions)
+
+    @asynccontextmanager
+    async def admit(self, session: StorySession):
+        if self.is_saturated():
+            self._reject(session)
+            raise SessionRejected("Session queue is full")
+
+        session.status = "queued"
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.config.session_queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject(session)
+            raise SessionRejected("Timed out waiting for a free session slot")
+        finally:
+            self._waiting -= 1
+
+        session.status = "running"
+        self._running += 1
+        try:
+            yield session
+            session.status = "completed"
+            self._completed += 1
+        except (GeneratorExit, asyncio.CancelledError):
+            session.status = "cancelled"
+            self._cancelled += 1
+            raise
+        except BaseException:
+            session.status = "failed"
+            self._failed += 1
+            raise
+        finally:
+            self._running -= 1
+            self._slots.release()
+            self.sessions.pop(session.session_id, None)
+
+    async def stream(self, session: StorySession, stream_mode="updates") -> AsyncIterator[Any]:
+        """
+        Admit the session, then yield its graph steps as they complete.
+        With a list `stream_mode`, items are (mode, chunk) tuples as in LangGraph.
+        """
+        async with self.admit(session):
+            # Closing the graph stream cancels in-flight nodes (and their LLM calls)
+            async with aclosing(session.astream(stream_mode)) as steps:
+                async for step in steps:
+                    yield step
+
+    # ── Background runs & viewers ─────────────────────────────────────────────
+
+    def start(self, session: StorySession, pacing: str = "none") -> None:
+        """
+        Run the session in the background, writing client events to its log.
+        Viewers attach to the log, so reconnects resume instead of restarting.
+        """
+        if session.resume_values is not None:
+            session.event_log.append([session.events.stamp(session.events.rewind_event())])
+        session.event_log.append([session.events.stamp({
+            "type": "stream_config",
+            "pacing": pacing,
+            "seed": session.seed,
+            "chars_per_second": self.config.sse_typewriter_cps if pacing == "typewriter" else None
+        })])
+        self._retain(session.event_log)
+        session.task = asyncio.create_task(self._run(session, pacing))
+        # Stopped after the grace period unless a viewer attaches (the stream may never open)
+        self._arm_idle_timer(session)
+
+    async def _run(self, session: StorySession, pacing: str) -> None:
+        log, events = session.event_log, session.events
+        checkpointed = self.checkpoints is not None and session.scenario is not None
+        stream_mode = ["updates", "custom", "values"] if checkpointed else ["updates", "custom"]
+        turn_ended = False
+        try:
+            async with aclosing(self.stream(session, stream_mode=stream_mode)) as steps:
+                async for mode, chunk in steps:
+                    if mode == "custom":
+                        # Live dialogue text; the committed dialogue event follows when the turn ends
+                        log.append([events.stamp(chunk)])
+                        continue
+                    if mode == "values":
+                        # State after the step; checkpoint once per turn, after check_conclusion
+                        if turn_ended and not chunk["is_concluded"]:
+                            self._checkpoint(session, pacing, chunk)
+                        turn_ended = False
+                        continue
+
+                    # Every event of the step (plus an entity diff) in one append
+                    log.append(events.from_step(chunk))
+                    turn_ended = "check_conclusion" in chunk
+
+                    if pacing == "fixed":
+                        await asyncio.sleep(self.config.sse_step_delay)
+
+            log.append([events.stamp({"type": "end", "message": "Simulation Complete"})])
+        except SessionRejected as e:
+            log.append([events.stamp({"type": "error", "message": str(e)})])
+        except asyncio.CancelledError:
+            # On worker shutdown the checkpoint is kept and viewers reconnect to the next worker
+            if not self._shutting_down:
+                log.append([events.stamp({"type": "error", "message": "Simulation stopped: no viewers"})])
+            raise
+        except Exception as e:
+            print(f"Error in session [{session.session_id}]: {e}")
+            log.append([events.stamp({"type": "error", "message": str(e)})])
+        finally:
+            log.close()
+            self.sessions.pop(session.session_id, None)
+            if checkpointed and not self._shutting_down:
+                self.checkpoints.delete(session.session_id)
+
+    def _checkpoint(self, session: StorySession, pacing: str, values: Dict[str, Any]) -> None:
+        manager = session.story_manager
+        # The resumed run keeps the spilled frames up to here
+        session.event_log.flush()
+        self.checkpoints.save(
+            session.session_id, session.scenario, session.seed, manager.hidden_truth,
+            session.director.turning_point_event["id"], pacing, values["current_turn"],
+            session.checkpoint(values)
+        )
+
+    def resume_checkpointed(self, scenarios) -> List[str]:
+        """
+        Restart every run a previous worker left checkpointed (call once at
+        startup, with the ScenarioRegistry). Each continues from its last
+        completed turn and stops like any other run if nobody reconnects.
+        """
+        if self.checkpoints is None:
+            return []
+        resumed = []
+        for saved in self.checkpoints.pending():
+            try:
+                story = scenarios.get(saved.scenario)
+                session = StorySession(
+                    saved.session_id, story.seed_story, story.characters, self.config,
+                    hidden_truth=saved.hidden_truth, turning_point=saved.turning_point,
+                    seed=saved.seed, signals=story.signals, scenario=saved.scenario,
+                    snapshot=saved.snapshot
+                )
+            except Exception as e:
+                print(f"Dropping checkpoint [{saved.session_id}]: {e}")
+                self.checkpoints.delete(saved.session_id)
+                continue
+            self.sessions[session.session_id] = session
+            self.start(session, saved.pacing)
+            resumed.append(session.session_id)
+        return resumed
+
+    def get_event_log(self, session_id: str) -> Optional[EventLog]:
+        return self.event_logs.get(session_id)
+
+    def attach(self, session_id: str) -> None:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session.viewers += 1
+        if session._idle_timer is not None:
+            session._idle_timer.cancel()
+            session._idle_timer = None
+
+    def detach(self, session_id: str) -> None:
+        """Drop a viewer; the run stops if nobody re-attaches within the grace period."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session.viewers -= 1
+        if session.viewers == 0:
+            self._arm_idle_timer(session)
+
+    def _arm_idle_timer(self, session: StorySession) -> None:
+        if session._idle_timer is not None:
+            session._idle_timer.cancel()
+            session._idle_timer = None
+        if session.task is not None and not session.task.done():
+            session._idle_timer = asyncio.get_running_loop().call_later(
+                self.config.session_resume_grace, self._stop_if_unwatched, session
+            )
+
+    def _stop_if_unwatched(self, session: StorySession) -> None:
+        session._idle_timer = None
+        if session.viewers == 0 and session.task is not None and not session.task.done():
+            print(f"No viewers left, stopping [{session.session_id}]")
+            session.task.cancel()
+
+    async def shutdown(self) -> None:
+        """Cancel every background run (worker shutdown); checkpointed runs resume on the next start."""
+        self._shutting_down = True
+        tasks = [s.task for s in self.sessions.values() if s.task is not None and not s.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Spill files of checkpointed runs are kept for the next worker to resume
+        for sid, log in self.event_logs.items():
+            if self.checkpoints is None or self.checkpoints.get(sid) is None:
+                log.discard()
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+
+    def _retain(self, log: EventLog) -> None:
+        self.event_logs[log.session_id] = log
+        finished = [sid for sid, kept in self.event_logs.items() if kept.closed]
+        for sid in finished[:max(len(self.event_logs) - self.config.event_log_retention, 0)]:
+            self.event_logs.pop(sid).discard()
+
+    def _reject(self, session: StorySession) -> None:
+        session.status = "rejected"
+        self._rejected += 1
+        self.sessions.pop(session.session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._running,
+            "queued": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "cancelled": self._cancelled,
+            "rejected": self._rejected,
+            "viewers": sum(session.viewers for session in self.sessions.values()),
+            "retained_logs": len(self.event_logs),
+            "max_concurrent": self.config.max_concurrent_sessions,
+            "max_queued": self.config.max_queued_sessions
+        }
@@ -0,0 +1,77 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Annotated, Any, Dict, List, Mapping, Optional
+from pydantic import TypeAdapter
+from .append_log import AppendLog, append_items
+from .schemas import StoryState, DialogueTurn, EntityRegistry
+
+# Lightweight graph state (config.fast_state): plain __slots__ dataclasses that
+# LangGraph builds without validation on every node transition. Validation
+# happens at the edges: scenarios on load, and to_story_state() on the final state.
+
+
+@dataclass(slots=True)
+class FastTurn:
+    """Same attributes as DialogueTurn; the timestamp is a cheap epoch float."""
+    turn_number: int
+    speaker: str
+    dialogue: str
+    timestamp: float = field(default_factory=time.time)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_model(self) -> DialogueTurn:
+        return DialogueTurn(
+            turn_number=self.turn_number,
+            speaker=self.speaker,
+            dialogue=self.dialogue,
+            timestamp=datetime.fromtimestamp(self.timestamp),
+            metadata=self.metadata
+        )
+
+
+@dataclass(slots=True)
+class FastStoryState:
+    """Field-for-field twin of StoryState (same channels, same reducers)."""
+    seed_story: Dict[str, Any] = field(default_factory=dict)
+    current_turn: int = 0
+
+    story_narration: Annotated[AppendLog, append_items] = field(default_factory=AppendLog)
+    dialogue_history: Annotated[AppendLog, append_items] = field(default_factory=AppendLog)
+    events: Annotated[AppendLog, append_items] = field(default_factory=AppendLog)
+    character_profiles: Dict[str, Any] = field(default_factory=dict)
+
+    hidden_truth: str = ""
+    entity_registry: Optional[EntityRegistry] = None
+
+    next_move_type: str = "dialogue"
+    next_action: Optional[Dict[str, Any]] = None
+
+    next_speaker: Optional[str] = None
+    director_notes: Annotated[AppendLog, append_items] = field(default_factory=AppendLog)
+    is_concluded: bool = False
+    conclusion_reason: Optional[str] = None
+
+
+# AppendLog fields are passed through by pydantic, so their items are checked here
+_LOG_ITEMS = {
+    "story_narration": TypeAdapter(List[str]),
+    "dialogue_history": TypeAdapter(List[DialogueTurn]),
+    "events": TypeAdapter(List[Dict[str, Any]]),
+    "director_notes": TypeAdapter(List[str]),
+}
+
+
+def to_story_state(values: Mapping[str, Any]) -> StoryState:
+    """Validate a final graph state (from either state model) into the pydantic StoryState."""
+    data = dict(values)
+    data["dialogue_history"] = [
+        turn.to_model() if isinstance(turn, FastTurn) else turn
+        for turn in values.get("dialogue_history", ())
+    ]
+    for name, items in _LOG_ITEMS.items():
+        if name in data:
+            data[name] = AppendLog(items.validate_python(list(data[name])))
+    if data.get("entity_registry") is None:
+        data.pop("entity_registry", None)
+    return StoryState.model_validate(data)
@@ -1,36 +1,119 @@
-from typing import Dict, List, Any
+import asyncio
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 from ..config import StoryConfig
 from ..schemas import StoryState, DialogueTurn
+from ..fast_state import FastStoryState, FastTurn
 from ..agents.character_agent import CharacterAgent
 from ..agents.director_agent import DirectorAgent
 from ..story_state import StoryStateManager
+from ..metrics import RunMetrics, observe_node, observe_speculative_draft
+
+def _session_node(method_name: str):
+    """
+    Wrap a NarrativeGraph node method so the compiled graph can be shared.
+    The per-session NarrativeGraph travels in the run config, not in the graph.
+    `state` is left unannotated so LangGraph hands over the graph's own state schema.
+    """
+    node_name = method_name.strip("_").removesuffix("_node")
+
+    async def node(state, config: RunnableConfig) -> Dict:
+        narrative = config["configurable"]["narrative"]
+        started = time.perf_counter()
+        try:
+            return await getattr(narrative, method_name)(state)
+        finally:
+            observe_node(node_name, time.perf_counter() - started, narrative.metrics)
+
+    node.__name__ = method_name
+    return node
+
+
+class _HeldDeltas:
+    """A speculative draft's dialogue deltas, held until the draft wins, then replayed and forwarded live."""
+
+    def __init__(self):
+        self._held: List[str] = []
+        self._emit: Optional[Callable[[str], None]] = None
+
+    def __call__(self, delta: str) -> None:
+        if self._emit is not None:
+            self._emit(delta)
+        else:
+            self._held.append(delta)
+
+    def release(self, emit: Callable[[str], None]) -> None:
+        for delta in self._held:
+            emit(delta)
+        self._held, self._emit = [], emit
+
 
 class NarrativeGraph:
+    # Compiled once per process (per state model) and shared by every session
+    _compiled_graphs: Dict[type, Any] = {}
+
     def __init__(self, config: StoryConfig, characters: List[CharacterAgent],
                  director: DirectorAgent, story_manager: StoryStateManager):
         self.config = config
         self.characters = {c.name: c for c in characters}
         self.director = director
         self.story_manager = story_manager
-        self.graph = self._build_graph()
+        # config.fast_state: unvalidated slots dataclasses instead of pydantic between nodes
+        self.state_schema = FastStoryState if config.fast_state else StoryState
+        self.turn_model = FastTurn if config.fast_state else DialogueTurn
+        self.graph = self.get_compiled_graph(self.state_schema)
+        self.run_config: RunnableConfig = {"configurable": {"narrative": self}}
         self.dialogue_turn_counter = 0
         self.action_counter = 0
 
-    def _build_graph(self) -> StateGraph:
-        workflow = StateGraph(StoryState)
-
-        workflow.add_node("director_decide",    self._director_decide_node)
-        workflow.add_node("execute_action",     self._execute_action_node)
-        workflow.add_node("character_respond",  self._character_respond_node)
-        workflow.add_node("check_conclusion",   self._check_conclusion_node)
-        workflow.add_node("conclude",           self._conclude_node)
+        # Per-run instrumentation, shared with the agents of this session
+        self.metrics = RunMetrics()
+        for agent in [director, *characters]:
+            agent.run_metrics = self.metrics
+
+        # Speculative generation bookkeeping
+        self.speculative_hits = 0
+        self.speculative_misses = 0
+        self.speculative_discarded = 0
+        self.speculative_goal_mismatches = 0  # right speaker, but drafted for another goal (regenerated)
+
+    # Counters a resumed run continues from (metrics start over)
+    _CHECKPOINT_FIELDS = (
+        "dialogue_turn_counter", "action_counter",
+        "speculative_hits", "speculative_misses", "speculative_discarded", "speculative_goal_mismatches"
+    )
+
+    def checkpoint_state(self) -> Dict:
+        return {name: getattr(self, name) for name in self._CHECKPOINT_FIELDS}
+
+    def restore_state(self, data: Dict) -> None:
+        for name in self._CHECKPOINT_FIELDS:
+            setattr(self, name, data.get(name, getattr(self, name)))  # older checkpoints lack newer counters
+
+    @classmethod
+    def get_compiled_graph(cls, state_schema: type = StoryState):
+        if state_schema not in cls._compiled_graphs:
+            cls._compiled_graphs[state_schema] = cls._build_graph(state_schema)
+        return cls._compiled_graphs[state_schema]
+
+    @classmethod
+    def _build_graph(cls, state_schema: type) -> StateGraph:
+        workflow = StateGraph(state_schema)
+
+        workflow.add_node("director_decide",    _session_node("_director_decide_node"))
+        workflow.add_node("execute_action",     _session_node("_execute_action_node"))
+        workflow.add_node("character_respond",  _session_node("_character_respond_node"))
+        workflow.add_node("check_conclusion",   _session_node("_check_conclusion_node"))
+        workflow.add_node("conclude",           _session_node("_conclude_node"))
 
         workflow.set_entry_point("director_decide")
 
         workflow.add_conditional_edges(
             "director_decide",
-            self._route_director_decision,
+            cls._route_director_decision,
             {"action": "execute_action", "dialogue": "character_respond"}
         )
 
@@ -39,7 +122,7 @@ class NarrativeGraph:
 
         workflow.add_conditional_edges(
             "check_conclusion",
-            self._route_conclusion,
+            cls._route_conclusion,
             {"conclude": "conclude", "continue": "director_decide"}
         )
 
@@ -49,6 +132,8 @@ class NarrativeGraph:
     # ── Nodes ─────────────────────────────────────────────────────────────────
 
     async def _director_decide_node(self, state: StoryState) -> Dict:
+        # The director's plot clock reads the manager's turn; the graph owns the count
+        self.story_manager.state.current_turn = state.current_turn
         move_type, character, action_dict = self.director.decide_next_move()
         # Return only the new notes to be appended
         return {
@@ -87,29 +172,54 @@ class NarrativeGraph:
         # FIX: Return only the NEW event array
         return {"events": [action_event]}
 
-    async def _character_respond_node(self, state: StoryState) -> Dict:
-        available = list(self.characters.keys())
-
-        next_speaker, narration, speaker_goal, tp_event, intervention = \
-            await self.director.select_next_speaker(state, available)
+    def _dialogue_delta_emitter(self, speaker: str):
+        """
+        Forward live dialogue text to "custom" stream consumers (the SSE server).
+        The committed dialogue event still follows once the turn is parsed.
+        """
+        if not self.config.stream_responses:
+            return None
+        writer = get_stream_writer()
+        turn = self.dialogue_turn_counter + 1
 
-        character = self.characters[next_speaker]
-        memory_snapshot  = self.story_manager.get_memory_snapshot(next_speaker)
-        context          = self.story_manager.get_context_for_character(next_speaker)
-        action_constraint = self.story_manager.get_action_constraint()
-        entity_context = self.story_manager.get_entity_context()
-        clue = self.story_manager.get_clue_for_turn(state.current_turn)
+        def emit(delta: str) -> None:
+            writer({"type": "dialogue_delta", "turn": turn, "speaker": speaker, "delta": delta})
+        return emit
 
-        dialogue, thought, action_decision = await character.respond(
-            state, context, memory_snapshot, speaker_goal, action_constraint, entity_context
-        )
+    async def _character_respond_node(self, state: StoryState) -> Dict:
+        available = list(self.characters.keys())
+        candidates = self._speculative_candidates(state, available)
+
+        if candidates:
+            (next_speaker, narration, speaker_goal, tp_event, intervention), draft = \
+                await self._select_speaker_speculatively(state, available, candidates)
+        else:
+            next_speaker, narration, speaker_goal, tp_event, intervention = \
+                await self.director.select_next_speaker(state, available)
+            draft = None
+
+        if draft:
+            dialogue, thought, action_decision = draft
+            clue = self.story_manager.get_clue_for_turn(state.current_turn)
+        else:
+            character = self.characters[next_speaker]
+            memory_snapshot  = self.story_manager.get_memory_snapshot(next_speaker, state.dialogue_history)
+            context          = self.story_manager.get_context_for_character(next_speaker, state.dialogue_history)
+            action_constraint = self.story_manager.get_action_constraint()
+            entity_context = self.story_manager.get_entity_context()
+            clue = self.story_manager.get_clue_for_turn(state.current_turn)
+
+            dialogue, thought, action_decision = await character.respond(
+                state, context, memory_snapshot, speaker_goal, action_constraint, entity_context,
+                on_dialogue_delta=self._dialogue_delta_emitter(next_speaker)
+            )
 
         self.story_manager.update_memory_from_dialogue(next_speaker, dialogue, state.current_turn)
         self.story_manager.record_dialogue(next_speaker, dialogue)
         self.story_manager.increment_dialogue_count()
         self.dialogue_turn_counter += 1
 
-        new_turn = DialogueTurn(
+        new_turn = self.turn_model(
             turn_number=self.dialogue_turn_counter,
             speaker=next_speaker,
             dialogue=dialogue
@@ -170,6 +280,87 @@ class NarrativeGraph:
             "story_narration":  ([narration] if narration else [])
         }
 
+    # ── Speculative generation ────────────────────────────────────────────────
+
+    def _speculative_candidates(self, state: StoryState, available: List[str]) -> List[str]:
+        """Speakers worth drafting ahead of the director, or [] to run sequentially."""
+        fanout = self.config.speculative_fanout
+        if not self.config.speculative_generation or fanout < 1:
+            return []
+        # Interventions and turning points change knowledge before the line is written
+        if self.director.has_pending_event():
+            return []
+        # A local (heuristic) selection is instant; drafting ahead would only waste calls
+        if not self.director.selection_needs_llm():
+            return []
+        # A miss (or rejected goal mismatch) discards every draft
+        if self.speculative_discarded + fanout > self.config.speculative_budget:
+            return []
+        return self.director.rank_likely_speakers(state, available)[:fanout]
+
+    async def _select_speaker_speculatively(
+        self, state: StoryState, available: List[str], candidates: List[str]
+    ) -> Tuple[Tuple, Optional[Tuple[str, str, str]]]:
+        """
+        Run the director call and candidate drafts concurrently.
+        Drafts use the phase mandate as their goal since the director's goal is not known yet,
+        so a draft only counts as a hit if the director picks its speaker with that same goal
+        (or config.speculative_accept_goal_mismatch is set). The winning draft's streamed
+        dialogue is held back, then replayed to viewers once it wins.
+        Returns (director selection, response or None on a miss).
+        """
+        action_constraint = self.story_manager.get_action_constraint()
+        entity_context = self.story_manager.get_entity_context()
+
+        drafts = {}
+        for name in candidates:
+            goal, deltas = self.director.get_speaker_mandate(name), _HeldDeltas()
+            drafts[name] = (goal, deltas, asyncio.create_task(self.characters[name].respond(
+                state,
+                self.story_manager.get_context_for_character(name, state.dialogue_history),
+                self.story_manager.get_memory_snapshot(name, state.dialogue_history),
+                goal, action_constraint, entity_context,
+                on_dialogue_delta=deltas
+            )))
+
+        try:
+            selection = await self.director.select_next_speaker(state, available)
+        except BaseException:
+            await self._discard_drafts([task for _, _, task in drafts.values()])
+            raise
+
+        next_speaker, speaker_goal = selection[0], selection[2]
+        await self._discard_drafts([task for name, (_, _, task) in drafts.items() if name != next_speaker])
+
+        outcome = "hit"
+        if next_speaker not in drafts:
+            outcome = "miss"
+        elif drafts[next_speaker][0] != speaker_goal and not self.config.speculative_accept_goal_mismatch:
+            outcome = "goal_mismatch"
+            await self._discard_drafts([drafts[next_speaker][2]])
+        observe_speculative_draft(outcome, self.metrics)
+
+        if outcome != "hit":
+            if outcome == "miss":
+                self.speculative_misses += 1
+            else:
+                self.speculative_goal_mismatches += 1
+            # The draft consumed the pending action constraint; hand it to the real speaker
+            if action_constraint:
+                self.story_manager.set_last_action(self.story_manager.last_action_taken)
+            return selection, None
+
+        self.speculative_hits += 1
+        _, deltas, task = drafts[next_speaker]
+        deltas.release(self._dialogue_delta_emitter(next_speaker))
+        return selection, await task
+
+    async def _discard_drafts(self, tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            task.cancel()
+        self.speculative_discarded += len(tasks)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     async def _check_conclusion_node(self, state: StoryState) -> Dict:
         should_end, reason, conclusion_narration = \
             self.director.check_conclusion_deterministic(state)
@@ -193,14 +384,17 @@ class NarrativeGraph:
     async def _conclude_node(self, state: StoryState) -> Dict:
         return {"is_concluded": True}
 
-    def _route_director_decision(self, state: StoryState) -> str:
+    # Routers stay unannotated too (LangGraph infers a branch's input schema from it)
+    @staticmethod
+    def _route_director_decision(state) -> str:
         return state.next_move_type
 
-    def _route_conclusion(self, state: StoryState) -> str:
+    @staticmethod
+    def _route_conclusion(state) -> str:
         return "conclude" if state.is_concluded else "continue"
 
-    async def run(self, seed_story: Dict, character_profiles: Dict[str, Any] = None) -> StoryState:
-        initial_state = {
+    def build_initial_state(self, seed_story: Dict, character_profiles: Dict[str, Any] = None) -> Dict:
+        return {
             "seed_story":          seed_story,
             "current_turn":        0,
             "dialogue_history":    [],
@@ -214,4 +408,14 @@ class NarrativeGraph:
             "next_action":         None,
             "entity_registry":     self.story_manager.state.entity_registry
         }
-        return await self.graph.ainvoke(initial_state)
\ No newline at end of file
+
+    def astream(self, initial_state: Dict, stream_mode="updates"):
+        """
+        Stream graph steps for this session through the shared compiled graph.
+        Include "custom" in `stream_mode` to also receive live dialogue deltas.
+        """
+        return self.graph.astream(initial_state, config=self.run_config, stream_mode=stream_mode)
+
+    async def run(self, seed_story: Dict, character_profiles: Dict[str, Any] = None) -> StoryState:
+        initial_state = self.build_initial_state(seed_story, character_profiles)
+        return await self.graph.ainvoke(initial_state, config=self.run_config)
\ No newline at end of file
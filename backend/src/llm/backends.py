@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Iterable, Optional
+from ..config import StoryConfig
+from .pool import get_llm_pool
+from ..log_sink import iter_jsonl
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class LLMResponse:
+    content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    queue_seconds: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class LLMBackend(ABC):
+    """Something that turns a prompt into a completion. Agents only talk to this."""
+
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, prompt: str, config: StoryConfig) -> LLMResponse:
+        ...
+
+    async def astream(self, prompt: str, config: StoryConfig) -> AsyncIterator[LLMResponse]:
+        """
+        Yield the completion as deltas. Queue time rides on the first chunk,
+        token usage on whichever chunk reports it. Default: one chunk.
+        """
+        yield await self.generate(prompt, config)
+
+
+async def _chunked(response: LLMResponse, size: int = 16) -> AsyncIterator[LLMResponse]:
+    """Replay a finished response as small deltas, like a live stream would arrive."""
+    text = response.content
+    for start in range(0, max(len(text), 1), size):
+        yield LLMResponse(text[start:start + size], response.metadata if start == 0 else {})
+        await asyncio.sleep(0)
+
+
+class GeminiBackend(LLMBackend):
+    """Live calls through the shared, pooled Gemini clients."""
+
+    name = "gemini"
+
+    async def generate(self, prompt: str, config: StoryConfig) -> LLMResponse:
+        pool = get_llm_pool(config)
+        llm = pool.client_for(config)
+        queued = time.perf_counter()
+        async with pool.slot():
+            queue_seconds = time.perf_counter() - queued
+            response = await llm.ainvoke([("human", prompt)])
+        usage = getattr(response, "usage_metadata", None) or {}
+        return LLMResponse(
+            response.content,
+            dict(getattr(response, "response_metadata", {}) or {}),
+            queue_seconds=queue_seconds,
+            prompt_tokens=usage.get("input_tokens"),
+            completion_tokens=usage.get("output_tokens")
+        )
+
+    async def astream(self, prompt: str, config: StoryConfig) -> AsyncIterator[LLMResponse]:
+        pool = get_llm_pool(config)
+        llm = pool.client_for(config)
+        queued = time.perf_counter()
+        async with pool.slot():
+            queue_seconds = time.perf_counter() - queued
+            async for chunk in llm.astream([("human", prompt)]):
+                usage = getattr(chunk, "usage_metadata", None) or {}
+                yield LLMResponse(
+                    chunk.content,
+                    queue_seconds=queue_seconds,
+                    prompt_tokens=usage.get("input_tokens"),
+                    completion_tokens=usage.get("output_tokens")
+                )
+                queue_seconds = 0.0
+
+
+class FakeBackend(LLMBackend):
+    """
+    Deterministic offline stand-in. Same prompt, same answer.
+    Produces schema-valid JSON for the director and character prompts.
+    """
+
+    name = "fake"
+
+    NARRATIONS = [
+        "Horns blare as the crowd presses closer around the two vehicles.",
+        "A hot gust of exhaust rolls over the scene as tempers rise.",
+        "Someone in the crowd laughs, and the argument sharpens.",
+        "The traffic behind them grinds to a complete halt.",
+    ]
+    GOALS = [
+        "Answer the last accusation directly and add one new detail.",
+        "Push back on the previous speaker and make a concrete demand.",
+        "Try to calm things down while protecting your own interest.",
+        "Raise the stakes with a threat or a revelation.",
+    ]
+    LINES = [
+        "Bhai, please, I have a family to feed — this was not my fault!",
+        "This is preposterous. I demand to see your papers right now.",
+        "Let us settle this quietly, between us, nobody needs to know.",
+        "I saw everything from my shop, yaar, the car came into his lane.",
+        "I will call my lawyer and charge you for every scratch.",
+        "Calm down, everyone, let us be reasonable about this.",
+        "My wallet — where is my wallet? It was here a minute ago!",
+        "A small facilitation fee and the whole matter disappears.",
+    ]
+    ACTIONS = ["none", "wipes sweat from forehead", "points at the damage", "checks his watch"]
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    def _pick(self, prompt: str, options: list, salt: str) -> Any:
+        digest = hashlib.sha256(f"{self.seed}:{salt}:{prompt}".encode("utf-8")).digest()
+        return options[int.from_bytes(digest[:8], "big") % len(options)]
+
+    async def generate(self, prompt: str, config: StoryConfig) -> LLMResponse:
+        if prompt.startswith("You are the Director"):
+            match = re.search(r"Available Characters: (.+)", prompt)
+            names = [n.strip() for n in match.group(1).split(",")] if match else ["Unknown"]
+            content = json.dumps({
+                "next_speaker": self._pick(prompt, names, "speaker"),
+                "narration": self._pick(prompt, self.NARRATIONS, "narration"),
+                "speaker_goal": self._pick(prompt, self.GOALS, "goal")
+            })
+        else:
+            match = re.match(r"You are ([^.\n]+)\.", prompt)
+            name = match.group(1) if match else "I"
+            content = json.dumps({
+                "thought": f"{name} weighs the situation and decides to press the point.",
+                "action_decision": self._pick(prompt, self.ACTIONS, "action"),
+                "dialogue": self._pick(prompt, self.LINES, "line")
+            })
+        return LLMResponse(content, {"backend": self.name})
+
+    async def astream(self, prompt: str, config: StoryConfig) -> AsyncIterator[LLMResponse]:
+        async for chunk in _chunked(await self.generate(prompt, config)):
+            yield chunk
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Serves responses recorded in prompt logs, keyed by prompt hash.
+    Prompts that were never recorded go to `fallback` (the fake by default).
+    """
+
+    name = "replay"
+
+    def __init__(self, log_paths: Iterable[Path], fallback: Optional[LLMBackend] = None):
+        self.fallback = fallback or FakeBackend()
+        self.responses: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        for path in log_paths:
+            self._load(Path(path))
+
+    def _load(self, path: Path) -> None:
+        if not path.exists():
+            return
+        if path.suffix in (".jsonl", ".gz"):
+            entries = iter_jsonl(path)
+        else:
+            entries = json.loads(path.read_text())
+        for entry in entries:
+            if "prompt" in entry and "response" in entry:
+                self.responses[prompt_hash(entry["prompt"])] = entry["response"]
+
+    async def generate(self, prompt: str, config: StoryConfig) -> LLMResponse:
+        recorded = self.responses.get(prompt_hash(prompt))
+        if recorded is None:
+            self.misses += 1
+            return await self.fallback.generate(prompt, config)
+        self.hits += 1
+        return LLMResponse(recorded, {"backend": self.name})
+
+    async def astream(self, prompt: str, config: StoryConfig) -> AsyncIterator[LLMResponse]:
+        async for chunk in _chunked(await self.generate(prompt, config)):
+            yield chunk
+
+
+class LatencyBackend(LLMBackend):
+    """Wraps another backend and sleeps before answering, to model network latency."""
+
+    name = "latency"
+
+    def __init__(self, inner: LLMBackend, latency_ms: float, jitter_ms: float = 0.0, seed: int = 0):
+        self.inner = inner
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+
+    async def generate(self, prompt: str, config: StoryConfig) -> LLMResponse:
+        await self._delay()
+        return await self.inner.generate(prompt, config)
+
+    async def astream(self, prompt: str, config: StoryConfig) -> AsyncIterator[LLMResponse]:
+        await self._delay()
+        async for chunk in self.inner.astream(prompt, config):
+            yield chunk
+
+    async def _delay(self) -> None:
+        delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(delay, 0.0) / 1000)
+
+
+def build_backend(config: StoryConfig) -> LLMBackend:
+    if config.llm_backend == "gemini":
+        backend: LLMBackend = GeminiBackend()
+    elif config.llm_backend == "fake":
+        backend = FakeBackend()
+    elif config.llm_backend == "replay":
+        backend = ReplayBackend(PROJECT_ROOT / p for p in config.replay_log_paths)
+    else:
+        raise ValueError(f"Unknown LLM backend: {config.llm_backend}")
+
+    if config.injected_latency_ms > 0:
+        backend = LatencyBackend(backend, config.injected_latency_ms, config.injected_latency_jitter_ms)
+
+    if config.response_cache:
+        from .cache import CachingBackend, ResponseCache
+        db_path = PROJECT_ROOT / config.response_cache_path if config.response_cache_path else None
+        backend = CachingBackend(backend, ResponseCache(
+            config.response_cache_size, config.response_cache_ttl, db_path
+        ))
+    return backend
+
+
+_backends: Dict[tuple, LLMBackend] = {}
+
+
+def get_backend(config: StoryConfig) -> LLMBackend:
+    """Process-wide backend for this config (replay indexes are loaded once)."""
+    key = (config.llm_backend, tuple(config.replay_log_paths),
+           config.injected_latency_ms, config.injected_latency_jitter_ms,
+           config.response_cache, config.response_cache_size,
+           config.response_cache_ttl, config.response_cache_path)
+    backend = _backends.get(key)
+    if backend is None:
+        backend = build_backend(config)
+        _backends[key] = backend
+    return backend
@@ -0,0 +1,133 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from ..config import StoryConfig
+from ..metrics import REGISTRY, Counter
+from .backends import LLMBackend, LLMResponse
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "llm_cache_requests_total", "Response cache lookups", ("result",)))
+
+
+def cache_key(prompt: str, config: StoryConfig) -> str:
+    raw = f"{config.model_name}\x00{config.temperature}\x00{config.max_tokens_per_prompt}\x00{prompt}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Prompt → response cache.
+    In-memory LRU bounded by `max_entries`, optional TTL, and an optional
+    SQLite file shared by every worker process on the machine.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None, db_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        if db_path is not None:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, created REAL NOT NULL, response TEXT NOT NULL)"
+            )
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self._record(hit=True)
+                return entry[1]
+            if entry is not None:
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[0]):
+                    self._remember(key, row[0], row[1])
+                    self._record(hit=True)
+                    return row[1]
+
+            self._record(hit=False)
+            return None
+
+    def put(self, key: str, response: str) -> None:
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, response)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, created, response) VALUES (?, ?, ?)",
+                    (key, created, response)
+                )
+
+    def _remember(self, key: str, created: float, response: str) -> None:
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        CACHE_REQUESTS.inc("hit" if hit else "miss")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory),
+                "max_entries": self.max_entries}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class CachingBackend(LLMBackend):
+    """Answers repeated prompts from a ResponseCache; everything else goes to `inner`."""
+
+    name = "cache"
+
+    def __init__(self, inner: LLMBackend, cache: ResponseCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def generate(self, prompt: str, config: StoryConfig) -> LLMResponse:
+        key = cache_key(prompt, config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LLMResponse(cached, {"cache": "hit"})
+        response = await self.inner.generate(prompt, config)
+        # Empty completions are usually failures; don't pin them
+        if response.content:
+            self.cache.put(key, response.content)
+        return response
+
+    async def astream(self, prompt: str, config: StoryConfig) -> AsyncIterator[LLMResponse]:
+        key = cache_key(prompt, config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield LLMResponse(cached, {"cache": "hit"})
+            return
+        parts: List[str] = []
+        async for chunk in self.inner.astream(prompt, config):
+            parts.append(chunk.content)
+            yield chunk
+        if parts:
+            self.cache.put(key, "".join(parts))
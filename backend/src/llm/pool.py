@@ -0,0 +1,108 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+import httpx
+from langchain_google_genai import ChatGoogleGenerativeAI
+from ..config import StoryConfig
+
+ClientKey = Tuple[str, float, int]
+
+
+class LLMClientPool:
+    """
+    Process-wide pool of LLM clients.
+    One client per (model_name, temperature, max_output_tokens), each keeping
+    its HTTP connections alive between calls. A semaphore caps how many
+    requests are in flight across all sessions of the worker.
+    """
+
+    def __init__(self, max_concurrency: int = 16, keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.keepalive_connections = keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: Dict[ClientKey, ChatGoogleGenerativeAI] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._closed = False
+
+    def get_client(self, model_name: str, temperature: float, max_output_tokens: int) -> ChatGoogleGenerativeAI:
+        if self._closed:
+            raise RuntimeError("LLM client pool has been shut down")
+        key = (model_name, temperature, max_output_tokens)
+        client = self._clients.get(key)
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            client = ChatGoogleGenerativeAI(
+                model=model_name,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                client_args={"limits": limits}
+            )
+            self._clients[key] = client
+        return client
+
+    def client_for(self, config: StoryConfig) -> ChatGoogleGenerativeAI:
+        return self.get_client(config.model_name, config.temperature, config.max_tokens_per_prompt)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the pool's concurrency slots for the duration of a call."""
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+
+    async def aclose(self) -> None:
+        """Wait for in-flight calls to drain, then close every client's transports."""
+        self._closed = True
+        for _ in range(self.max_concurrency):
+            await self._semaphore.acquire()
+        try:
+            for client in self._clients.values():
+                aclose = getattr(client, "aclose", None)
+                if aclose is not None:
+                    try:
+                        await aclose()
+                    except Exception as e:
+                        print(f"Error closing LLM client {client.model}: {e}")
+            self._clients.clear()
+        finally:
+            for _ in range(self.max_concurrency):
+                self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "clients": len(self._clients),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency
+        }
+
+
+_pool: Optional[LLMClientPool] = None
+
+
+def get_llm_pool(config: Optional[StoryConfig] = None) -> LLMClientPool:
+    """Return the worker's pool, creating it from `config` on first use."""
+    global _pool
+    if _pool is None or _pool._closed:
+        config = config or StoryConfig()
+        _pool = LLMClientPool(
+            max_concurrency=config.llm_max_concurrency,
+            keepalive_connections=config.llm_keepalive_connections,
+            keepalive_expiry=config.llm_keepalive_expiry
+        )
+    return _pool
+
+
+async def shutdown_llm_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
@@ -0,0 +1,99 @@
+from typing import List, Optional
+
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStreamer:
+    """
+    Pulls one top-level string field out of a JSON object while it is still arriving.
+    feed(chunk) returns the newly decoded characters of that field's value ("" if none yet).
+    Anything before the opening brace (markdown fences, stray prose) is ignored.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape: Optional[str] = None
+        self._high_surrogate: Optional[str] = None  # \uD83D of a \uD83D\uDE00 pair, until its partner arrives
+        self._is_value = False
+        self._after_colon = False
+        self._capturing = False
+        self._key: List[str] = []
+        self._last_key: Optional[str] = None
+
+    def feed(self, chunk: str) -> str:
+        out: List[str] = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self._in_string:
+                self._feed_string_char(ch, out)
+            elif ch == '"':
+                self._start_string()
+            elif ch in "{[":
+                self._depth += 1
+                self._after_colon = False
+            elif ch in "}]":
+                self._depth -= 1
+            elif ch == ":":
+                self._after_colon = True
+            elif ch == ",":
+                self._after_colon = False
+                self._last_key = None
+        return "".join(out)
+
+    def _start_string(self) -> None:
+        self._in_string = True
+        self._is_value = self._after_colon
+        self._capturing = self._depth == 1 and self._is_value and self._last_key == self.field
+        self._key = []
+
+    def _feed_string_char(self, ch: str, out: List[str]) -> None:
+        if self._escape is not None:
+            self._escape += ch
+            decoded = self._decode_escape(self._escape)
+            if decoded is None:
+                return
+            self._escape = None
+            self._emit(decoded, out)
+        elif ch == "\\":
+            self._escape = ""
+        elif ch == '"':
+            self._in_string = False
+            if self._capturing:
+                self.done = True
+            elif self._is_value:
+                self._after_colon = False
+            elif self._depth == 1:
+                self._last_key = "".join(self._key)
+        else:
+            self._emit(ch, out)
+
+    def _emit(self, text: str, out: List[str]) -> None:
+        if self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            if "\udc00" <= text <= "\udfff":
+                text = (high + text).encode("utf-16", "surrogatepass").decode("utf-16")
+            else:
+                self._emit(high, out)
+        elif "\ud800" <= text <= "\udbff":
+            self._high_surrogate = text
+            return
+        if self._capturing:
+            out.append(text)
+        elif not self._is_value:
+            self._key.append(text)
+
+    @staticmethod
+    def _decode_escape(escape: str) -> Optional[str]:
+        """Decoded text for a complete escape sequence (without the backslash), None if incomplete."""
+        if escape[0] != "u":
+            return _SIMPLE_ESCAPES.get(escape, escape)
+        if len(escape) < 5:
+            return None
+        try:
+            return chr(int(escape[1:5], 16))
+        except ValueError:
+            return escape
@@ -0,0 +1,169 @@
+import gzip
+import heapq
+import json
+import queue
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+from .config import StoryConfig
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+_STOP = object()
+
+
+class LogSink:
+    """
+    Append-only JSONL log written by a background thread.
+    `write()` only enqueues, so agents never block on disk. When the file
+    passes `max_bytes` it is rotated to <stem>.1.jsonl[.gz], older files shift
+    up, and anything past `backups` is deleted. If the queue is full, records
+    are dropped and counted, not buffered without bound.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 50_000_000, backups: int = 5,
+                 compress: bool = True, queue_size: int = 10_000):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._drain, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {"written": self.written, "dropped": self.dropped,
+                "rotations": self.rotations, "queued": self._queue.qsize()}
+
+    # ── Writer thread ────────────────────────────────────────────────────────
+
+    def _drain(self) -> None:
+        stopping = False
+        while not stopping:
+            # Take whatever is waiting (up to a batch) and write it in one go
+            batch = [self._queue.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                lines = []
+                for record in batch:
+                    if record is _STOP:
+                        stopping = True
+                    else:
+                        lines.append(json.dumps(record, default=str))
+                if lines:
+                    self._file.write("\n".join(lines) + "\n")
+                    self._file.flush()
+                    self.written += len(lines)
+                    if self._file.tell() >= self.max_bytes:
+                        self._rotate()
+            except Exception as e:
+                print(f"Log sink error ({self.path.name}): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        self._file.close()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        for index in range(self.backups, 0, -1):
+            older = self._backup_path(index, suffix)
+            if not older.exists():
+                continue
+            if index == self.backups:
+                older.unlink()
+            else:
+                older.rename(self._backup_path(index + 1, suffix))
+        if self.backups > 0:
+            target = self._backup_path(1, suffix)
+            if self.compress:
+                with self.path.open("rb") as src, gzip.open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                self.path.unlink()
+            else:
+                self.path.rename(target)
+        else:
+            self.path.unlink()
+        self.rotations += 1
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def _backup_path(self, index: int, suffix: str) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{index}{suffix}")
+
+
+# ── Reading & merging ────────────────────────────────────────────────────────
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Records from a .jsonl or .jsonl.gz file, one at a time."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def log_files(path: Path) -> List[Path]:
+    """A sink's rotated backups (oldest first) followed by the live file."""
+    path = Path(path)
+    indexed = []
+    for candidate in path.parent.glob(f"{path.stem}.*.jsonl*"):
+        index = candidate.name[len(path.stem) + 1:].split(".")[0]
+        if index.isdigit():
+            indexed.append((int(index), candidate))
+    backups = [p for _, p in sorted(indexed, reverse=True)]
+    return backups + ([path] if path.exists() else [])
+
+
+def merge_by_timestamp(*streams: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """k-way merge of per-agent logs that are each already in timestamp order."""
+    return heapq.merge(*streams, key=lambda entry: entry["timestamp"])
+
+
+_sink: Optional[LogSink] = None
+
+
+def get_log_sink(config: StoryConfig) -> Optional[LogSink]:
+    """Process-wide sink at config.prompt_log_path (None when logging to disk is off)."""
+    global _sink
+    if _sink is None and config.prompt_log_path:
+        _sink = LogSink(
+            PROJECT_ROOT / config.prompt_log_path,
+            max_bytes=config.prompt_log_max_bytes,
+            backups=config.prompt_log_backups,
+            compress=config.prompt_log_compress
+        )
+    return _sink
+
+
+def shutdown_log_sink() -> None:
+    global _sink
+    if _sink is not None:
+        _sink.close()
+        _sink = None
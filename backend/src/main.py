@@ -14,6 +14,10 @@ from src.agents.character_agent import CharacterAgent
 from src.agents.director_agent import DirectorAgent
 from src.graph.narrative_graph import NarrativeGraph
 from src.story_state import StoryStateManager
+from src.fast_state import to_story_state
+from src.llm.pool import shutdown_llm_pool
+from src.log_sink import merge_by_timestamp, shutdown_log_sink
+from src.scenarios import ScenarioError, get_scenario_registry
 
 def print_header():
     """Beautiful ASCII header."""
@@ -39,17 +43,20 @@ def print_initialization_info(story_manager, seed_story):
     print("└" + "─" * 78 + "┘\n")
 
 async def main():
-    # Load seed story
-    examples_dir = project_root / "examples" / "rickshaw_accident"
-    
-    seed_story = json.loads((examples_dir / "seed_story.json").read_text())
-    char_configs = json.loads((examples_dir / "character_configs.json").read_text())
-    
     # Initialize config
     config = StoryConfig()
+
+    # Load seed story (scenario name from argv, else SCENARIO / default)
+    scenario_name = sys.argv[1] if len(sys.argv) > 1 else config.default_scenario
+    try:
+        scenario = get_scenario_registry(config).get(scenario_name)
+    except ScenarioError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    seed_story = scenario.seed_story
     
     # Initialize state manager (includes hidden mystery)
-    story_manager = StoryStateManager(seed_story, char_configs["characters"], config)
+    story_manager = StoryStateManager(seed_story, scenario.characters, config, signals=scenario.signals)
     
     # Print beautiful header
     print_header()
@@ -58,7 +65,7 @@ async def main():
     # Create character agents
     characters = [
         CharacterAgent(name=char["name"], config=config)
-        for char in char_configs["characters"]
+        for char in scenario.characters
     ]
     
     # Create director with story manager reference
@@ -75,6 +82,8 @@ async def main():
         seed_story=seed_story,
         character_profiles=story_manager.state.character_profiles
     )
+    # Validated once here, whichever state model the graph ran with
+    story = to_story_state(final_state)
     
     # Print final summary
     print("\n\n" + "═" * 80)
@@ -87,7 +96,15 @@ async def main():
     print(f"│  Dialogue Turns: {story_graph.dialogue_turn_counter}")
     print(f"│  Actions Triggered: {story_graph.action_counter}")
     print(f"│  Total Events: {story_graph.dialogue_turn_counter + story_graph.action_counter}")
-    print(f"│  Conclusion: {final_state.get('conclusion_reason', 'Natural ending')}")
+    print(f"│  Conclusion: {story.conclusion_reason or 'Natural ending'}")
+    if config.heuristic_director or config.speaker_model_path:
+        selections = story_graph.metrics.speaker_selections
+        print(f"│  Speaker Selections: {selections['heuristic']} heuristic, {selections['model']} model, "
+              f"{selections['llm']} LLM")
+    if config.speculative_generation:
+        print(f"│  Speculative Drafts: {story_graph.speculative_hits} hits, "
+              f"{story_graph.speculative_misses} misses, {story_graph.speculative_discarded} discarded, "
+              f"{story_graph.speculative_goal_mismatches} drafted for another goal")
     print("└" + "─" * 78 + "┘")
 
     # Save story_output.json
@@ -99,26 +116,28 @@ async def main():
             "actions_triggered": story_graph.action_counter,
             "total_events": story_graph.dialogue_turn_counter + story_graph.action_counter,
             "hidden_truth": "not_revealed",
+            "seed": story_manager.seed,
             "target_turns": story_manager.total_turns
         },
         "seed_story": seed_story,
-        "events": final_state.get("events", []),
+        "events": list(story.events),
         "conclusion": {
-            "reason": final_state.get("conclusion_reason"),
-            "final_narration": final_state.get("story_narration", [])[-1] if final_state.get("story_narration") else ""
-        }
+            "reason": story.conclusion_reason,
+            "final_narration": story.story_narration[-1] if story.story_narration else ""
+        },
+        "metrics": story_graph.metrics.summary()
     }
     output_path.write_text(json.dumps(output_data, indent=2))
     
-    # Save prompts_log.json with enhanced metadata
-    all_logs = director.logs.copy()
-    for char_agent in characters:
-        all_logs.extend(char_agent.logs)
-    
-    all_logs.sort(key=lambda x: x["timestamp"])
-    
+    # Save prompts_log.json with enhanced metadata: k-way merge of the
+    # per-agent logs (each already in time order), written entry by entry
     log_path = project_root / "prompts_log.json"
-    log_path.write_text(json.dumps(all_logs, indent=2))
+    with log_path.open("w") as f:
+        f.write("[")
+        merged = merge_by_timestamp(director.logs, *(char_agent.logs for char_agent in characters))
+        for i, entry in enumerate(merged):
+            f.write(("," if i else "") + "\n  " + json.dumps(entry, indent=2).replace("\n", "\n  "))
+        f.write("\n]")
     
     print("\n┌─ OUTPUT FILES " + "─" * 62 + "┐")
     print(f"│  ✅ Story Output: {output_path.name}")
@@ -134,5 +153,8 @@ async def main():
     print("│  ✓ Efficient Token Usage")
     print("└" + "─" * 78 + "┘\n")
 
+    await shutdown_llm_pool()
+    shutdown_log_sink()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
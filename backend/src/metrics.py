@@ -0,0 +1,207 @@
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Seconds; tuned for both local node work (ms) and LLM calls (s)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self.values[label_values] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, *label_values: str, value: float) -> None:
+        self.values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def observe(self, *label_values: str, value: float) -> None:
+        counts = self.counts.setdefault(label_values, [0] * (len(self.buckets) + 1))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        self.sums[label_values] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, counts in self.counts.items():
+            for bound, count in zip(self.buckets, counts):
+                extra = {"le": str(bound)}
+                lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, extra)} {count}")
+            lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, {'le': '+Inf'})} {counts[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {self.sums[label_values]}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {counts[-1]}")
+        return lines
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: Dict[str, str] = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in Prometheus text exposition format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+NODE_LATENCY = REGISTRY.register(Histogram(
+    "narrative_node_latency_seconds", "LangGraph node wall-clock time", ("node",)))
+LLM_QUEUE_LATENCY = REGISTRY.register(Histogram(
+    "llm_queue_latency_seconds", "Time spent waiting for an LLM concurrency slot", ("agent",)))
+LLM_NETWORK_LATENCY = REGISTRY.register(Histogram(
+    "llm_network_latency_seconds", "LLM request time once a slot is held", ("agent",)))
+LLM_FIRST_TOKEN = REGISTRY.register(Histogram(
+    "llm_first_token_seconds", "Time from request to the first streamed chunk", ("agent",)))
+LLM_PARSE_LATENCY = REGISTRY.register(Histogram(
+    "llm_parse_latency_seconds", "Time spent parsing LLM JSON output", ("agent",)))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "Tokens reported by the LLM response metadata", ("agent", "kind")))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "llm_errors_total", "LLM calls that raised", ("agent",)))
+JSON_PARSE_FAILURES = REGISTRY.register(Counter(
+    "llm_json_parse_failures_total", "LLM responses that were not valid JSON", ("agent",)))
+SPEAKER_SELECTIONS = REGISTRY.register(Counter(
+    "director_speaker_selections_total", "Director speaker selections by how they were made", ("selector",)))
+SPECULATIVE_DRAFTS = REGISTRY.register(Counter(
+    "speculative_drafts_total", "Speculative draft outcomes (goal_mismatch: right speaker, other goal, regenerated)",
+    ("outcome",)))
+
+
+class RunMetrics:
+    """Per-session view of the same measurements, summarized into story_output.json."""
+
+    def __init__(self):
+        self.node_times: Dict[str, List[float]] = defaultdict(list)
+        self.llm: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.speaker_selections: Dict[str, int] = defaultdict(int)
+        self.speculative_drafts: Dict[str, int] = defaultdict(int)
+
+    def summary(self) -> Dict:
+        nodes = {
+            node: {
+                "count": len(times),
+                "total_ms": round(sum(times) * 1000, 3),
+                "mean_ms": round(sum(times) / len(times) * 1000, 3),
+                "max_ms": round(max(times) * 1000, 3)
+            }
+            for node, times in self.node_times.items()
+        }
+        llm = {agent: {k: round(v, 4) for k, v in stats.items()} for agent, stats in self.llm.items()}
+        totals = defaultdict(float)
+        for stats in self.llm.values():
+            for key, value in stats.items():
+                totals[key] += value
+        return {"nodes": nodes, "llm": llm, "llm_totals": {k: round(v, 4) for k, v in totals.items()},
+                "speaker_selections": dict(self.speaker_selections),
+                "speculative_drafts": dict(self.speculative_drafts)}
+
+
+def observe_node(node: str, seconds: float, run: Optional[RunMetrics] = None) -> None:
+    NODE_LATENCY.observe(node, value=seconds)
+    if run is not None:
+        run.node_times[node].append(seconds)
+
+
+def observe_llm_call(agent: str, queue_seconds: float, network_seconds: float,
+                     prompt_tokens: Optional[int], completion_tokens: Optional[int],
+                     run: Optional[RunMetrics] = None) -> None:
+    LLM_QUEUE_LATENCY.observe(agent, value=queue_seconds)
+    LLM_NETWORK_LATENCY.observe(agent, value=network_seconds)
+    if prompt_tokens is not None:
+        LLM_TOKENS.inc(agent, "prompt", amount=prompt_tokens)
+    if completion_tokens is not None:
+        LLM_TOKENS.inc(agent, "completion", amount=completion_tokens)
+    if run is not None:
+        stats = run.llm[agent]
+        stats["calls"] += 1
+        stats["queue_s"] += queue_seconds
+        stats["network_s"] += network_seconds
+        if prompt_tokens is None:
+            stats["calls_without_usage"] += 1
+        else:
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens or 0
+
+
+def observe_first_token(agent: str, seconds: float, run: Optional[RunMetrics] = None) -> None:
+    LLM_FIRST_TOKEN.observe(agent, value=seconds)
+    if run is not None:
+        run.llm[agent]["first_token_s"] += seconds
+        run.llm[agent]["streamed_calls"] += 1
+
+
+def observe_llm_error(agent: str, run: Optional[RunMetrics] = None) -> None:
+    LLM_ERRORS.inc(agent)
+    if run is not None:
+        run.llm[agent]["errors"] += 1
+
+
+def observe_speaker_selection(selector: str, run: Optional[RunMetrics] = None) -> None:
+    """`selector` is "llm", "heuristic" or "model"."""
+    SPEAKER_SELECTIONS.inc(selector)
+    if run is not None:
+        run.speaker_selections[selector] += 1
+
+
+def observe_speculative_draft(outcome: str, run: Optional[RunMetrics] = None) -> None:
+    """`outcome` is "hit", "miss" or "goal_mismatch" (right speaker, but drafted for another goal)."""
+    SPECULATIVE_DRAFTS.inc(outcome)
+    if run is not None:
+        run.speculative_drafts[outcome] += 1
+
+
+def observe_parse(agent: str, started: float, ok: bool, run: Optional[RunMetrics] = None) -> None:
+    """Record a JSON parse that began at `started` (time.perf_counter())."""
+    seconds = time.perf_counter() - started
+    LLM_PARSE_LATENCY.observe(agent, value=seconds)
+    if not ok:
+        JSON_PARSE_FAILURES.inc(agent)
+    if run is not None:
+        run.llm[agent]["parse_s"] += seconds
+        if not ok:
+            run.llm[agent]["json_parse_failures"] += 1
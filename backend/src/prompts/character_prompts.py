@@ -1,7 +1,54 @@
+from functools import lru_cache
 from ..schemas import CharacterProfile
+from .compiler import PromptTemplate
 from typing import Dict
 
 
+CHARACTER_PROMPT_TEMPLATE = PromptTemplate("""You are {character_name}.
+
+PROFILE: {profile_description}{inventory_str}
+
+YOUR INTERNAL STATE:
+{memory_str}
+{repetition_block}{goal_block}{constraint_block}{entity_block}
+CURRENT SITUATION:
+{context}
+
+INSTRUCTIONS:
+Think step by step about your situation before speaking.
+Then respond with JSON ONLY — no extra text, no markdown:
+
+{{
+  "thought": "Your internal reasoning: what just happened, what you want, what strategy you are using RIGHT NOW",
+  "action_decision": "A brief physical action or gesture you take (or 'none')",
+  "dialogue": "What you actually say — 1-2 sentences MAX 100 words, in your natural voice"
+}}
+
+CRITICAL ENTITY RULES:
+- The ENTITY REGISTRY shows the TRUE ownership of all items
+- You can LIE or be MISTAKEN about ownership, but you must KNOW the truth
+- If you find/mention an item, CHECK THE REGISTRY for who it belongs to
+- Example: If registry shows "wallet OWNER=Saleem", you can't genuinely think it's Ahmed's
+- You can ACCUSE Ahmed of stealing Saleem's wallet, but you can't claim it was Ahmed's to begin with
+- Items you're carrying are in your inventory — only reference those as yours
+
+DIALOGUE RULES:
+- React SPECIFICALLY to the last thing said — not the general situation
+- Accomplish YOUR GOAL this turn
+- Introduce something NEW: a detail, demand, threat, or revelation
+- Do NOT repeat your previous lines
+- Use your natural register: Saleem uses Urdu/Sindhi mix; Ahmed is formal English; Raza is clipped official tone; Uncle Jameel is folksy and gossipy""")
+
+
+@lru_cache(maxsize=256)
+def compile_character_prompt(character_name: str, profile_description: str) -> PromptTemplate:
+    """Pre-render the static per-character segments (name, profile, rules) once."""
+    return CHARACTER_PROMPT_TEMPLATE.partial(
+        character_name=character_name,
+        profile_description=profile_description
+    )
+
+
 def get_character_prompt(
     character_name: str,
     character_profile: CharacterProfile,
@@ -43,37 +90,12 @@ def get_character_prompt(
     if entity_context:
         entity_block = f"\n{entity_context}\n"
 
-    return f"""You are {character_name}.
-
-PROFILE: {character_profile.description}{inventory_str}
-
-YOUR INTERNAL STATE:
-{memory_str}
-{repetition_block}{goal_block}{constraint_block}{entity_block}
-CURRENT SITUATION:
-{context}
-
-INSTRUCTIONS:
-Think step by step about your situation before speaking.
-Then respond with JSON ONLY — no extra text, no markdown:
-
-{{
-  "thought": "Your internal reasoning: what just happened, what you want, what strategy you are using RIGHT NOW",
-  "action_decision": "A brief physical action or gesture you take (or 'none')",
-  "dialogue": "What you actually say — 1-2 sentences MAX 100 words, in your natural voice"
-}}
-
-CRITICAL ENTITY RULES:
-- The ENTITY REGISTRY shows the TRUE ownership of all items
-- You can LIE or be MISTAKEN about ownership, but you must KNOW the truth
-- If you find/mention an item, CHECK THE REGISTRY for who it belongs to
-- Example: If registry shows "wallet OWNER=Saleem", you can't genuinely think it's Ahmed's
-- You can ACCUSE Ahmed of stealing Saleem's wallet, but you can't claim it was Ahmed's to begin with
-- Items you're carrying are in your inventory — only reference those as yours
-
-DIALOGUE RULES:
-- React SPECIFICALLY to the last thing said — not the general situation
-- Accomplish YOUR GOAL this turn
-- Introduce something NEW: a detail, demand, threat, or revelation
-- Do NOT repeat your previous lines
-- Use your natural register: Saleem uses Urdu/Sindhi mix; Ahmed is formal English; Raza is clipped official tone; Uncle Jameel is folksy and gossipy"""
\ No newline at end of file
+    return compile_character_prompt(character_name, character_profile.description).render(
+        inventory_str=inventory_str,
+        memory_str=memory_str,
+        repetition_block=repetition_block,
+        goal_block=goal_block,
+        constraint_block=constraint_block,
+        entity_block=entity_block,
+        context=context
+    )
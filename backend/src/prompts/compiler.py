@@ -0,0 +1,56 @@
+from string import Formatter
+from typing import Dict, List, Optional, Tuple
+
+
+class PromptTemplate:
+    """
+    A str.format-style template parsed once into literal segments and slots.
+    `partial()` folds per-story / per-character values into the literals, so
+    each turn only fills the dynamic slots. `render(**kw)` is generated per
+    instance and returns exactly what `template.format(**kw)` would.
+    """
+
+    def __init__(self, template: str, _parts: Optional[List[Tuple[str, Optional[str]]]] = None):
+        self.template = template
+        if _parts is None:
+            _parts = []
+            for literal, field, spec, conversion in Formatter().parse(template):
+                if spec or conversion:
+                    raise ValueError(f"Format specs are not supported in prompt templates: {field}")
+                _parts.append((literal, field))
+        self._parts = _parts
+        self.fields = {field for _, field in _parts if field is not None}
+        self.render = self._compile()
+
+    def _compile(self):
+        """Generate a keyword-only function whose body is a single f-string over the parts."""
+        namespace: Dict[str, str] = {}
+        pieces = []
+        for i, (literal, field) in enumerate(self._parts):
+            if literal:
+                namespace[f"_lit{i}"] = literal
+                pieces.append(f"{{_lit{i}}}")
+            if field is not None:
+                pieces.append(f"{{{field}}}")
+        params = ", ".join(sorted(self.fields))
+        signature = f"*, {params}" if params else ""
+        body = "".join(pieces)
+        source = f"def render({signature}):\n    return f'{body}'\n"
+        exec(source, namespace)
+        return namespace["render"]
+
+    def partial(self, **static) -> "PromptTemplate":
+        """Return a template with `static` slots pre-rendered into the literal text."""
+        parts: List[Tuple[str, Optional[str]]] = []
+        pending = ""
+        for literal, field in self._parts:
+            pending += literal
+            if field is None:
+                continue
+            if field in static:
+                pending += str(static[field])
+            else:
+                parts.append((pending, field))
+                pending = ""
+        parts.append((pending, None))
+        return PromptTemplate(self.template, parts)
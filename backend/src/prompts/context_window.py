@@ -0,0 +1,82 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_WORD_RE = re.compile(r"\S+")
+
+
+class TokenEstimator:
+    """
+    Local token counter, no network round-trip.
+    Starts from ~4 characters per token and is recalibrated from the real
+    prompt token counts the LLM reports, so estimates track the live model.
+    """
+
+    def __init__(self, chars_per_token: float = 4.0, smoothing: float = 0.1):
+        self.chars_per_token = chars_per_token
+        self.smoothing = smoothing
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        by_chars = len(text) / self.chars_per_token
+        # Short, word-heavy lines (names, Urdu fillers) tokenize worse than prose
+        by_words = len(_WORD_RE.findall(text)) * 1.3
+        return int(max(by_chars, by_words)) + 1
+
+    def calibrate(self, text: str, actual_tokens: int) -> None:
+        if not text or actual_tokens <= 0:
+            return
+        observed = len(text) / actual_tokens
+        self.chars_per_token += self.smoothing * (observed - self.chars_per_token)
+
+
+# Shared by every session in the worker; calibrated by BaseAgent
+ESTIMATOR = TokenEstimator()
+
+
+@dataclass
+class ContextBlock:
+    """Candidate lines for one prompt section, most important first."""
+    name: str
+    priority: int  # lower packs first
+    items: List[str]
+
+
+@dataclass
+class PackedContext:
+    budget: int
+    used: int = 0
+    blocks: Dict[str, List[str]] = field(default_factory=dict)
+    truncated: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def remaining(self) -> int:
+        return max(self.budget - self.used, 0)
+
+    def report(self) -> Dict:
+        return {"budget": self.budget, "used": self.used, "truncated": dict(self.truncated)}
+
+
+class ContextAssembler:
+    """Packs prompt blocks by priority into a token budget and records what was dropped."""
+
+    def __init__(self, budget_tokens: int, estimator: TokenEstimator = ESTIMATOR):
+        self.budget_tokens = budget_tokens
+        self.estimator = estimator
+
+    def pack(self, blocks: List[ContextBlock], budget: Optional[int] = None) -> PackedContext:
+        packed = PackedContext(budget=self.budget_tokens if budget is None else budget)
+        for block in sorted(blocks, key=lambda b: b.priority):
+            kept = []
+            for item in block.items:
+                cost = self.estimator.count(item)
+                if cost > packed.remaining:
+                    break
+                kept.append(item)
+                packed.used += cost
+            packed.blocks[block.name] = kept
+            dropped = len(block.items) - len(kept)
+            if dropped:
+                packed.truncated[block.name] = dropped
+        return packed
@@ -1,3 +1,5 @@
+from .compiler import PromptTemplate
+
 DIRECTOR_SELECT_SPEAKER_PROMPT = """You are the Director of a Karachi street drama.
 
 SCENE: {description}
@@ -42,4 +44,7 @@ Respond with JSON ONLY — no extra text:
 }}
 """
 
+# Parsed once; DirectorAgent folds in the per-story scene description
+DIRECTOR_SELECT_SPEAKER_TEMPLATE = PromptTemplate(DIRECTOR_SELECT_SPEAKER_PROMPT)
+
 DIRECTOR_CONCLUSION_PROMPT = """DEPRECATED — using deterministic logic."""
\ No newline at end of file
@@ -0,0 +1,110 @@
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+
+FIELDS = ("trust", "suspicion")
+
+
+class RelationshipMatrix:
+    """
+    Session-wide trust and suspicion as two N×N arrays.
+    Row i is how character i sees everyone else. The diagonal is unused and
+    never exposed. CharacterProfile.trust/.suspicion are RelationshipRow views
+    over these arrays, so dict-style code keeps working while bulk updates and
+    queries stay vectorized for crowd scenes.
+    """
+
+    def __init__(self, names: List[str], trust: float = 0.5, suspicion: float = 0.3):
+        self.names = list(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        size = len(self.names)
+        self.trust = np.full((size, size), trust, dtype=np.float64)
+        self.suspicion = np.full((size, size), suspicion, dtype=np.float64)
+        self.others = ~np.eye(size, dtype=bool)
+        self._observers = [np.flatnonzero(self.others[:, j]) for j in range(size)]
+
+    def matrix(self, field: str) -> np.ndarray:
+        if field not in FIELDS:
+            raise ValueError(f"Unknown relationship field '{field}'")
+        return getattr(self, field)
+
+    def row(self, name: str, field: str) -> "RelationshipRow":
+        return RelationshipRow(self, self.index[name], self.matrix(field))
+
+    # ── Vectorized updates ───────────────────────────────────────────────────
+
+    def adjust_toward(self, field: str, target: str,
+                      delta: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Add `delta` to how every other character sees `target`, clipped to [0, 1].
+        Returns (observer indices, old values, new values).
+        """
+        values = self.matrix(field)
+        column = self.index[target]
+        observers = self._observers[column]
+        old = values[observers, column].copy()
+        new = np.clip(old + delta, 0.0, 1.0)
+        values[observers, column] = new
+        return observers, old, new
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def row_means(self, field: str) -> np.ndarray:
+        """Each character's mean over everyone else (0 when alone)."""
+        values = self.matrix(field)
+        others = max(len(self.names) - 1, 1)
+        return np.where(self.others, values, 0.0).sum(axis=1) / others
+
+    def rows(self, field: str, decimals: int) -> Dict[str, Dict[str, float]]:
+        """Plain {observer: {other: value}} dicts, rounded (builtin round, as in the dict days)."""
+        names = self.names
+        return {
+            names[i]: {names[j]: round(v, decimals) for j, v in enumerate(row) if j != i}
+            for i, row in enumerate(self.matrix(field).tolist())
+        }
+
+    def top_k(self, name: str, field: str, k: int) -> List[Tuple[str, float]]:
+        """Highest k values in `name`'s row; ties keep name order, like a stable sort."""
+        i = self.index[name]
+        row = self.matrix(field)[i].copy()
+        row[i] = -np.inf
+        order = np.argsort(-row, kind="stable")[:min(k, len(self.names) - 1)]
+        return [(self.names[j], float(row[j])) for j in order]
+
+
+class RelationshipRow(MutableMapping):
+    """Dict view of one character's row; keys are the other characters in session order."""
+
+    __slots__ = ("_matrix", "_row", "_values")
+
+    def __init__(self, matrix: RelationshipMatrix, row: int, values: np.ndarray):
+        self._matrix = matrix
+        self._row = row
+        self._values = values
+
+    def _column(self, name: str) -> int:
+        column = self._matrix.index.get(name)
+        if column is None or column == self._row:
+            raise KeyError(name)
+        return column
+
+    def __getitem__(self, name: str) -> float:
+        return float(self._values[self._row, self._column(name)])
+
+    def __setitem__(self, name: str, value: float) -> None:
+        self._values[self._row, self._column(name)] = value
+
+    def __delitem__(self, name: str) -> None:
+        raise TypeError("Relationship rows have a fixed set of characters")
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for j, name in enumerate(self._matrix.names) if j != self._row)
+
+    def __len__(self) -> int:
+        return len(self._matrix.names) - 1
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._matrix.index and self._matrix.index[name] != self._row
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from .config import StoryConfig
+from .signals import ScenarioSignals, parse_term
+from .story_state import MYSTERY_CAST
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+SEED_STORY_FILE = "seed_story.json"
+CHARACTER_CONFIGS_FILE = "character_configs.json"
+SIGNAL_LEXICONS_FILE = "signal_lexicons.json"  # optional
+
+
+class ScenarioError(Exception):
+    """Raised for unknown scenarios or scenario files that fail validation."""
+
+
+# ── File schemas ─────────────────────────────────────────────────────────────
+
+class SeedStoryFile(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    title: str = Field(min_length=1)
+    description: str = Field(min_length=1)
+
+
+class CharacterSpec(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str = Field(min_length=1)
+    description: str = Field(min_length=1)
+
+
+class CharacterConfigsFile(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    characters: List[CharacterSpec] = Field(min_length=2)
+
+    @field_validator("characters")
+    @classmethod
+    def unique_names(cls, characters: List[CharacterSpec]) -> List[CharacterSpec]:
+        names = [c.name for c in characters]
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate character names: {', '.join(duplicates)}")
+        # The mystery engine's tables name these characters; without them sessions fail mid-run
+        missing = [name for name in MYSTERY_CAST if name not in names]
+        if missing:
+            raise ValueError(f"missing characters the mystery engine requires: {', '.join(missing)}")
+        return characters
+
+
+class SignalLexiconsFile(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    # family -> terms; terms are whole words/phrases, a trailing * makes the last word a stem
+    dialogue: Dict[str, List[str]] = Field(default_factory=dict)
+    action: Dict[str, List[str]] = Field(default_factory=dict)
+
+    @field_validator("dialogue", "action")
+    @classmethod
+    def valid_terms(cls, lexicons: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        for terms in lexicons.values():
+            for term in terms:
+                parse_term(term)
+        return lexicons
+
+
+# ── Registry ─────────────────────────────────────────────────────────────────
+
+class Scenario(BaseModel):
+    """A validated, parsed scenario. Shared by every session: treat as read-only."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    path: Path
+    seed_story: Dict[str, Any]
+    characters: List[Dict[str, Any]]
+    signals: ScenarioSignals  # compiled once per load
+    mtimes: Tuple[float, float, Optional[float]]
+
+
+class ScenarioRegistry:
+    """
+    Scenarios found under `root/<name>/` (seed_story.json + character_configs.json,
+    optionally signal_lexicons.json). Each is a new setting for the same mystery
+    engine, so its cast must include story_state.MYSTERY_CAST.
+    Files are parsed and validated once; `refresh()` re-reads only scenarios whose
+    mtimes changed, at most every `poll_interval` seconds. A scenario that stops
+    validating keeps serving its last good version.
+    """
+
+    def __init__(self, root: Path, poll_interval: float = 2.0):
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self.scenarios: Dict[str, Scenario] = {}
+        self.errors: Dict[str, str] = {}
+        self._last_poll = 0.0
+        self.scan()
+
+    def get(self, name: str) -> Scenario:
+        self.refresh()
+        scenario = self.scenarios.get(name)
+        if scenario is None:
+            raise ScenarioError(f"Unknown scenario '{name}' (available: {', '.join(self.names()) or 'none'})")
+        return scenario
+
+    def names(self) -> List[str]:
+        return sorted(self.scenarios)
+
+    def refresh(self) -> None:
+        """Rescan if the poll interval has elapsed since the last scan."""
+        if time.monotonic() - self._last_poll >= self.poll_interval:
+            self.scan()
+
+    def scan(self) -> None:
+        self._last_poll = time.monotonic()
+        found = set()
+        for directory in sorted(self.root.iterdir()) if self.root.is_dir() else []:
+            mtimes = self._mtimes(directory)
+            if mtimes is None:
+                continue
+            found.add(directory.name)
+            current = self.scenarios.get(directory.name)
+            if current is not None and current.mtimes == mtimes:
+                continue
+            try:
+                self.scenarios[directory.name] = self._load(directory, mtimes)
+                self.errors.pop(directory.name, None)
+                if current is not None:
+                    print(f"Reloaded scenario '{directory.name}'")
+            except ScenarioError as e:
+                if self.errors.get(directory.name) != str(e):
+                    print(f"Skipping scenario '{directory.name}': {e}")
+                self.errors[directory.name] = str(e)
+
+        for name in set(self.scenarios) - found:
+            del self.scenarios[name]
+        for name in set(self.errors) - found:
+            del self.errors[name]
+
+    async def watch(self) -> None:
+        """Poll for changes forever (run as a background task)."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self.scan()
+
+    @staticmethod
+    def _mtimes(directory: Path) -> Optional[Tuple[float, float, Optional[float]]]:
+        try:
+            required = (
+                (directory / SEED_STORY_FILE).stat().st_mtime,
+                (directory / CHARACTER_CONFIGS_FILE).stat().st_mtime
+            )
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        lexicons = directory / SIGNAL_LEXICONS_FILE
+        return required + (lexicons.stat().st_mtime if lexicons.exists() else None,)
+
+    @staticmethod
+    def _load(directory: Path, mtimes: Tuple[float, float, Optional[float]]) -> Scenario:
+        try:
+            seed_story = SeedStoryFile.model_validate_json((directory / SEED_STORY_FILE).read_bytes())
+            char_configs = CharacterConfigsFile.model_validate_json((directory / CHARACTER_CONFIGS_FILE).read_bytes())
+            lexicons_path = directory / SIGNAL_LEXICONS_FILE
+            lexicons = SignalLexiconsFile.model_validate_json(lexicons_path.read_bytes()) \
+                if mtimes[2] is not None else SignalLexiconsFile()
+        except (OSError, ValidationError) as e:
+            raise ScenarioError(str(e)) from e
+        return Scenario(
+            name=directory.name,
+            path=directory,
+            seed_story=seed_story.model_dump(),
+            characters=[c.model_dump() for c in char_configs.characters],
+            signals=ScenarioSignals(lexicons.dialogue, lexicons.action),
+            mtimes=mtimes
+        )
+
+
+_registry: Optional[ScenarioRegistry] = None
+
+
+def get_scenario_registry(config: StoryConfig) -> ScenarioRegistry:
+    """Process-wide registry over config.scenarios_dir (relative paths are from the backend root)."""
+    global _registry
+    if _registry is None:
+        _registry = ScenarioRegistry(PROJECT_ROOT / config.scenarios_dir, config.scenario_poll_interval)
+    return _registry
@@ -1,6 +1,51 @@
-from typing import List, Dict, Any, Optional, Set
+from typing import Annotated, List, Dict, Any, Iterable, Iterator, Mapping, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
+from pydantic_core import core_schema
+from .append_log import AppendLog, append_items
+
+
+class OrderedSet:
+    """
+    Set that iterates in insertion order, so prompts built from it (the newest
+    knowledge items) do not depend on PYTHONHASHSEED. Dumps as a list.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Iterable[str] = ()):
+        self._items: Dict[str, None] = dict.fromkeys(items)
+
+    def add(self, item: str) -> None:
+        self._items[item] = None
+
+    def discard(self, item: str) -> None:
+        self._items.pop(item, None)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (OrderedSet, set, frozenset)):
+            return set(self._items) == set(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"OrderedSet({list(self._items)!r})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            lambda value: value if isinstance(value, OrderedSet) else cls(value),
+            serialization=core_schema.plain_serializer_function_ser_schema(list)
+        )
+
 
 class DialogueTurn(BaseModel):
     turn_number: int
@@ -17,17 +62,25 @@ class CharacterProfile(BaseModel):
     trust: Dict[str, float] = Field(default_factory=dict)
     suspicion: Dict[str, float] = Field(default_factory=dict)
     emotional_state: str = "neutral"
-    knowledge: Set[str] = Field(default_factory=set)
+    knowledge: OrderedSet = Field(default_factory=OrderedSet)  # insertion-ordered
     inventory: List[str] = Field(default_factory=list)
     
     class Config:
         arbitrary_types_allowed = True
 
+    # Session profiles hold RelationshipMatrix row views rather than plain dicts
+    @field_serializer("trust", "suspicion")
+    def _serialize_relationships(self, values: Mapping[str, float]) -> Dict[str, float]:
+        return dict(values)
+
 # NEW: Entity Registry to track "who owns what"
 class EntityRegistry(BaseModel):
     """Source of Truth for all items, claims, and ownership in the story."""
     items: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
     # Structure: {"wallet": {"owner": "Saleem", "status": "missing", "value": "50000 rupees", "last_seen": "in rickshaw"}}
+
+    # Bumped on every change so derived prompt blocks know when to rebuild
+    version: int = Field(default=0, exclude=True)
     
     def register_item(self, item_name: str, owner: str, **attributes):
         """Register an item with its owner and attributes."""
@@ -35,11 +88,13 @@ class EntityRegistry(BaseModel):
             "owner": owner,
             **attributes
         }
+        self.version += 1
     
     def update_item_status(self, item_name: str, **updates):
         """Update item attributes (e.g., status, location)."""
         if item_name in self.items:
             self.items[item_name].update(updates)
+            self.version += 1
     
     def get_item(self, item_name: str) -> Optional[Dict[str, Any]]:
         """Retrieve item information."""
@@ -57,9 +112,11 @@ class EntityRegistry(BaseModel):
 class StoryState(BaseModel):
     seed_story: Dict[str, Any]
     current_turn: int = 0
-    story_narration: List[str] = []
-    dialogue_history: List[DialogueTurn] = Field(default_factory=list)
-    events: List[Dict[str, Any]] = Field(default_factory=list)
+
+    # Append-only: nodes return just their new items and the reducer chains them on
+    story_narration: Annotated[AppendLog, append_items] = Field(default_factory=AppendLog)    # str
+    dialogue_history: Annotated[AppendLog, append_items] = Field(default_factory=AppendLog)   # DialogueTurn
+    events: Annotated[AppendLog, append_items] = Field(default_factory=AppendLog)            # Dict[str, Any]
     character_profiles: Dict[str, CharacterProfile] = Field(default_factory=dict)
     
     # Hidden truth
@@ -74,7 +131,7 @@ class StoryState(BaseModel):
     
     # Controls
     next_speaker: Optional[str] = None
-    director_notes: List[str] = []
+    director_notes: Annotated[AppendLog, append_items] = Field(default_factory=AppendLog)     # str
     is_concluded: bool = False
     conclusion_reason: Optional[str] = None
 
@@ -0,0 +1,93 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple, NamedTuple
+
+WORD = re.compile(r"\w+")
+
+Span = Tuple[int, int]
+
+
+class _Term(NamedTuple):
+    tail: Tuple[str, ...]   # words after the first one
+    stem: bool              # last word is a prefix ("threaten*")
+    families: Tuple[str, ...]
+
+
+class SignalMatcher:
+    """
+    Classifies a line against keyword families in one pass over its words.
+    Terms match whole words, case-insensitively, so "fee" no longer fires
+    inside "coffee". A trailing "*" on a term's last word matches any
+    continuation ("threaten*" covers "threatened"). Multi-word phrases match
+    consecutive words. Each word costs a dict lookup per distinct stem length,
+    whatever the size of the lexicons.
+    """
+
+    def __init__(self, lexicons: Dict[str, List[str]]):
+        self.families = list(lexicons)
+        # A term listed under several families is indexed once
+        term_families: Dict[Tuple[Tuple[str, ...], bool], List[str]] = defaultdict(list)
+        for family, terms in lexicons.items():
+            for term in terms:
+                words, stem = parse_term(term)
+                if family not in term_families[(words, stem)]:
+                    term_families[(words, stem)].append(family)
+
+        self._exact: Dict[str, List[_Term]] = defaultdict(list)
+        self._stems: Dict[str, List[_Term]] = defaultdict(list)
+        for (words, stem), families in term_families.items():
+            entry = _Term(words[1:], stem, tuple(families))
+            if stem and len(words) == 1:
+                self._stems[words[0]].append(entry)
+            else:
+                self._exact[words[0]].append(entry)
+        self._stem_lengths = sorted({len(s) for s in self._stems})
+
+    def classify(self, text: str) -> Dict[str, List[Span]]:
+        """Every family with at least one match in `text`, mapped to the (start, end) spans."""
+        tokens = [(m.group().lower(), m.start(), m.end()) for m in WORD.finditer(text)]
+        found: Dict[str, List[Span]] = {}
+        for i, (word, start, _) in enumerate(tokens):
+            candidates = self._exact.get(word, [])
+            for length in self._stem_lengths:
+                if length > len(word):
+                    break
+                candidates = candidates + self._stems.get(word[:length], [])
+            for term in candidates:
+                end = self._match_tail(tokens, i, term)
+                if end is not None:
+                    for family in term.families:
+                        found.setdefault(family, []).append((start, end))
+        return found
+
+    def matches(self, text: str) -> Set[str]:
+        """Just the matched family names."""
+        return set(self.classify(text))
+
+    @staticmethod
+    def _match_tail(tokens: List[Tuple[str, int, int]], i: int, term: _Term) -> Optional[int]:
+        last = i + len(term.tail)
+        if last >= len(tokens):
+            return None
+        for j, expected in enumerate(term.tail, start=i + 1):
+            word = tokens[j][0]
+            if not (word.startswith(expected) if j == last and term.stem else word == expected):
+                return None
+        return tokens[last][2]
+
+
+def parse_term(term: str) -> Tuple[Tuple[str, ...], bool]:
+    """Lower-cased words of a term, and whether its last word is a stem (trailing *)."""
+    stem = term.rstrip().endswith("*")
+    words = tuple(w.lower() for w in WORD.findall(term))
+    if not words or "*" in term.rstrip().rstrip("*"):
+        raise ValueError(f"bad signal term {term!r} (words, with an optional trailing *)")
+    return words, stem
+
+
+class ScenarioSignals:
+    """A scenario's compiled lexicons: one matcher for dialogue lines, one for action descriptions."""
+
+    def __init__(self, dialogue: Dict[str, List[str]] = None, action: Dict[str, List[str]] = None):
+        self.dialogue = SignalMatcher(dialogue or {})
+        self.action = SignalMatcher(action or {})
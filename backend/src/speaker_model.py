@@ -0,0 +1,237 @@
+import json
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from .log_sink import iter_jsonl
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Learned speaker selection: a conditional logistic regression (softmax over the
+# available characters) on hashed features of the director's selection context.
+# Trained offline from logged LLM decisions (src/train_speaker_model.py); the
+# director uses it in place of the LLM when it is confident (config.speaker_model_path).
+
+
+# ── Selection context & features ──────────────────────────────────────────────
+# A context is a plain dict, the same whether it was logged live by the director
+# or parsed back out of an older director prompt:
+#   phase, candidates, recent_speakers (oldest first), last_line, event (an
+#   intervention or turning point is active), tension (optional: each
+#   candidate's suspicion minus trust toward the last speaker)
+
+def candidate_features(context: Dict[str, Any], candidate: str) -> List[Tuple[str, float]]:
+    recent = context.get("recent_speakers") or []
+    last = recent[-1] if recent else "none"
+    prev = recent[-2] if len(recent) > 1 else "none"
+    last_line = (context.get("last_line") or "").lower()
+    phase = context.get("phase") or "unknown"
+
+    features = [
+        (f"cand={candidate}", 1.0),
+        (f"phase={phase}|cand={candidate}", 1.0),
+        (f"last={last}|cand={candidate}", 1.0),
+        (f"prev={prev}|cand={candidate}", 1.0),
+        (f"recent_count={recent.count(candidate)}", 1.0),
+    ]
+    if candidate == last:
+        features.append(("is_last", 1.0))
+    if candidate == prev:
+        features.append(("is_prev", 1.0))
+    if any(part.lower() in last_line for part in candidate.split() if len(part) > 3):
+        features.append(("addressed", 1.0))
+        features.append((f"phase={phase}|addressed", 1.0))
+    if context.get("event"):
+        features.append((f"event|cand={candidate}", 1.0))
+    tension = (context.get("tension") or {}).get(candidate)
+    if tension is not None:
+        features.append(("tension", float(tension)))
+        features.append((f"tension_bucket={round(tension * 4) / 4}", 1.0))
+    return features
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, n_features: int) -> int:
+    # crc32, not hash(): buckets must match across processes
+    return zlib.crc32(feature.encode("utf-8")) % n_features
+
+
+def hash_features(features: List[Tuple[str, float]], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    return (np.array([_bucket(name, n_features) for name, _ in features], dtype=np.int64),
+            np.array([value for _, value in features], dtype=np.float64))
+
+
+# ── Model ─────────────────────────────────────────────────────────────────────
+
+class SpeakerModel:
+    """
+    One weight per hashed feature; a candidate's score is the sum of its
+    features' weights and the prediction is the softmax over candidates.
+    Stored as .npz (weights + metadata).
+    """
+
+    def __init__(self, n_features: int = 4096, weights: Optional[np.ndarray] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.n_features = n_features
+        self.weights = weights if weights is not None else np.zeros(n_features)
+        self.metadata = metadata or {}
+
+    def probabilities(self, context: Dict[str, Any]) -> Dict[str, float]:
+        candidates = context["candidates"]
+        scores = np.empty(len(candidates))
+        for k, candidate in enumerate(candidates):
+            index, value = hash_features(candidate_features(context, candidate), self.n_features)
+            scores[k] = self.weights[index] @ value
+        exp = np.exp(scores - scores.max())
+        exp /= exp.sum()
+        return {candidate: float(p) for candidate, p in zip(candidates, exp)}
+
+    def predict(self, context: Dict[str, Any]) -> Tuple[str, float]:
+        """(most likely speaker, its probability)."""
+        probabilities = self.probabilities(context)
+        speaker = max(context["candidates"], key=probabilities.__getitem__)
+        return speaker, probabilities[speaker]
+
+    def fit(self, examples: List[Tuple[Dict[str, Any], str]], epochs: int = 300,
+            learning_rate: float = 0.5, l2: float = 1e-3) -> "SpeakerModel":
+        """Full-batch gradient descent on the softmax log-loss over each example's candidates."""
+        rows, cols, values, labels, starts = [], [], [], [], []
+        row = 0
+        for context, label in examples:
+            starts.append(row)
+            for candidate in context["candidates"]:
+                index, value = hash_features(candidate_features(context, candidate), self.n_features)
+                rows.append(np.full(len(index), row))
+                cols.append(index)
+                values.append(value)
+                labels.append(candidate == label)
+                row += 1
+        if not examples:
+            return self
+        rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+        target = np.array(labels, dtype=np.float64)
+        starts = np.array(starts)
+        group = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, row)))
+
+        for _ in range(epochs):
+            scores = np.bincount(rows, weights=self.weights[cols] * values, minlength=row)
+            exp = np.exp(scores - np.maximum.reduceat(scores, starts)[group])
+            probabilities = exp / np.add.reduceat(exp, starts)[group]
+            residual = probabilities - target
+            gradient = np.bincount(cols, weights=residual[rows] * values, minlength=self.n_features)
+            self.weights -= learning_rate * (gradient / len(starts) + l2 * self.weights)
+        return self
+
+    def save(self, path: Path) -> None:
+        np.savez(path, weights=self.weights, metadata=json.dumps(self.metadata))
+
+    @classmethod
+    def load(cls, path: Path) -> "SpeakerModel":
+        with np.load(path) as data:
+            weights = data["weights"]
+            return cls(len(weights), weights, json.loads(str(data["metadata"])))
+
+
+@lru_cache(maxsize=None)
+def load_speaker_model(path: str) -> SpeakerModel:
+    """Process-wide model per path, relative paths from the backend root (sessions share it read-only)."""
+    return SpeakerModel.load(PROJECT_ROOT / path)
+
+
+# ── Training data from prompt logs ────────────────────────────────────────────
+
+class Example(NamedTuple):
+    context: Dict[str, Any]
+    label: str
+    group: str  # session (or log file) the decision came from
+    latency_s: Optional[float]  # the director call's latency, if logged
+
+
+_PHASE = re.compile(r"NARRATIVE PHASE: (\w+)")
+_INTERVENTION = re.compile(r"ACTIVE INTERVENTION: (.*)")
+_CANDIDATES = re.compile(r"Available Characters:\s*(.+)")
+_HISTORY = re.compile(r"(?:Recent Conversation[^\n]*|Recent Dialogue):\n(.*?)(?:\n\n|\Z)", re.S)
+_SPEAKER_LINE = re.compile(r"^([A-Z][\w .'-]{0,40}?): (.*)$")
+
+
+def parse_selection_prompt(prompt: str) -> Optional[Dict[str, Any]]:
+    """Selection context from a director speaker prompt (current or older template), None if it is not one."""
+    candidates_match = _CANDIDATES.search(prompt)
+    if not prompt.startswith("You are the Director") or not candidates_match:
+        return None
+    candidates = [name.strip() for name in candidates_match.group(1).split(",") if name.strip()]
+    phase = _PHASE.search(prompt)
+    intervention = _INTERVENTION.search(prompt)
+    history = _HISTORY.search(prompt)
+    turns = []
+    for line in (history.group(1).splitlines() if history else []):
+        match = _SPEAKER_LINE.match(line.strip())
+        if match:
+            turns.append((match.group(1), match.group(2)))
+    return {
+        "phase": phase.group(1).lower() if phase else "unknown",
+        "candidates": candidates,
+        "recent_speakers": [speaker for speaker, _ in turns],
+        "last_line": turns[-1][1] if turns else "",
+        "event": bool(intervention and intervention.group(1).strip() not in ("", "None"))
+    }
+
+
+def _read_entries(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.suffix in (".jsonl", ".gz"):
+        return iter_jsonl(path)
+    return iter(json.loads(path.read_text()))
+
+
+def load_examples(paths: Iterable[Path]) -> List[Example]:
+    """
+    LLM speaker decisions from prompt logs (prompts_log.json, JSONL sinks and
+    their rotated backups). The label is the decision entry's speaker, else
+    the recorded response's next_speaker, else (older logs) the character
+    prompted next. Heuristic and model-made selections are skipped.
+    """
+    examples = []
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        pending: Dict[str, Dict[str, Any]] = {}  # per group: the last unanswered selection prompt
+        for entry in _read_entries(path):
+            group = entry.get("session") or path.name
+            agent = entry.get("agent")
+            if agent == "Director" and "prompt" in entry:
+                context = parse_selection_prompt(entry["prompt"])
+                if context is not None:
+                    pending[group] = {"context": context, "latency": entry.get("latency_s"),
+                                      "label": _response_speaker(entry.get("response"), context)}
+                continue
+
+            selection = pending.get(group)
+            if agent == "Director" and entry.get("decision_type") == "speaker_selection":
+                pending.pop(group, None)
+                metadata = entry.get("metadata") or {}
+                if metadata.get("selector", "llm") != "llm":
+                    continue
+                context = metadata.get("context") or (selection or {}).get("context")
+                if context is not None and metadata.get("speaker") in context["candidates"]:
+                    latency = (selection or {}).get("latency")
+                    examples.append(Example(context, metadata["speaker"], group, latency))
+                continue
+
+            # Older logs have no decision entries: the next character prompt is the choice
+            if selection is not None and "prompt" in entry and agent in selection["context"]["candidates"]:
+                pending.pop(group)
+                examples.append(Example(selection["context"], selection["label"] or agent,
+                                        group, selection["latency"]))
+    return examples
+
+
+def _response_speaker(response: Optional[str], context: Dict[str, Any]) -> Optional[str]:
+    if not response:
+        return None
+    match = re.search(r'"next_speaker"\s*:\s*"([^"]+)"', response)
+    if match and match.group(1) in context["candidates"]:
+        return match.group(1)
+    return None
@@ -1,10 +1,20 @@
-from typing import List, Dict, Tuple, Optional, Set
+from typing import List, Dict, Sequence, Tuple, Optional, Set
 from datetime import datetime
 import random
-from .schemas import StoryState, CharacterProfile, DialogueTurn, EntityRegistry
+import numpy as np
+from .schemas import StoryState, CharacterProfile, DialogueTurn, EntityRegistry, OrderedSet
 from .config import StoryConfig
+from .prompts.context_window import ContextAssembler, ContextBlock, PackedContext
+from .relationships import RelationshipMatrix
+from .signals import ScenarioSignals
+from .volatility_log import VolatilityLog
 
 
+# The mysteries, clues and entity facts below, and the director's phase mandates,
+# interventions and turning points, are written for this cast; scenarios must
+# include every one of them (extra characters are fine)
+MYSTERY_CAST = ("Saleem", "Ahmed Malik", "Constable Raza", "Uncle Jameel")
+
 MYSTERY_CLUES = {
     "saleem_innocent": {
         "hint":     "Uncle Jameel squints at the road surface — there are no skid marks from Saleem's side.",
@@ -43,24 +53,42 @@ class StoryStateManager:
         "uncle_witnessed_bribe"
     ]
 
-    def __init__(self, seed_story: Dict, characters: List[Dict], config: StoryConfig):
+    def __init__(self, seed_story: Dict, characters: List[Dict], config: StoryConfig,
+                 hidden_truth: Optional[str] = None, seed: Optional[int] = None,
+                 signals: Optional[ScenarioSignals] = None):
         self.config = config
-        self.hidden_truth = random.choice(self.MYSTERY_OPTIONS)
+        # Keyword families from the scenario's signal_lexicons.json (none fire without one)
+        self.signals = signals or ScenarioSignals()
+        # Per-session RNG (shared with the director) so runs are reproducible
+        # and concurrent sessions never disturb each other's sequences
+        if seed is None:
+            seed = config.seed if config.seed is not None else random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Batch runs pin the mystery to fill per-mystery quotas
+        if hidden_truth is not None and hidden_truth not in self.MYSTERY_OPTIONS:
+            raise ValueError(f"Unknown mystery '{hidden_truth}'")
+        self.hidden_truth = hidden_truth or self.rng.choice(self.MYSTERY_OPTIONS)
 
         character_profiles = {}
         character_names = [char["name"] for char in characters]
 
+        # Trust/suspicion live in session-wide matrices; profiles get dict views of their rows
+        self.relationships = RelationshipMatrix(character_names, trust=0.5, suspicion=0.3)
+
         for char in characters:
             name = char["name"]
-            character_profiles[name] = CharacterProfile(
+            profile = CharacterProfile(
                 name=name,
                 description=char["description"],
-                trust={other: 0.5 for other in character_names if other != name},
-                suspicion={other: 0.3 for other in character_names if other != name},
                 emotional_state="neutral",
-                knowledge=set(),
+                knowledge=OrderedSet(),
                 inventory=[]
             )
+            profile.trust = self.relationships.row(name, "trust")
+            profile.suspicion = self.relationships.row(name, "suspicion")
+            character_profiles[name] = profile
 
         self._initialize_mystery_knowledge(character_profiles)
 
@@ -75,7 +103,7 @@ class StoryStateManager:
             entity_registry=entity_registry  # NEW
         )
 
-        self.total_turns = random.randint(18, 22)
+        self.total_turns = self.rng.randint(18, 22)
         self.action_count = 0
         self.consecutive_dialogue_count = 0
 
@@ -88,12 +116,24 @@ class StoryStateManager:
         self.last_action_acknowledged: bool = True
 
         # Issue 3: Volatility log
-        self.memory_volatility_log: List[Dict] = []
+        # Trust/suspicion/emotion deltas plus periodic keyframes; snapshot_at(turn) rebuilds any turn
+        self.memory_volatility_log = VolatilityLog(
+            self._snapshot_memory,
+            keyframe_interval=config.volatility_keyframe_interval,
+            max_turns=config.volatility_log_size
+        )
 
         # Issue 5: Clue progression
         self.clues = MYSTERY_CLUES.get(self.hidden_truth, {})
         self.clues_dropped: Set[str] = set()
 
+        # Memoized prompt blocks, keyed by the state they were built from
+        self._entity_context_cache: Optional[Tuple[int, str]] = None
+        self._character_context_cache: Optional[Tuple[Tuple[int, int], str, PackedContext]] = None
+
+        # Token-budgeted packing of prompt context (config.max_context_length)
+        self.context_assembler = ContextAssembler(config.max_context_length)
+
     def _initialize_mystery_knowledge(self, profiles: Dict) -> None:
         if self.hidden_truth == "saleem_innocent":
             profiles["Saleem"].knowledge.add("i_was_careful_driving")
@@ -151,20 +191,21 @@ class StoryStateManager:
             registry.update_item_status("wallet", status="stolen", last_seen="in Ahmed's briefcase")
 
     # NEW: Update entity registry when items are mentioned/discovered
-    def update_entity_from_dialogue(self, speaker: str, dialogue: str) -> None:
+    def update_entity_from_dialogue(self, speaker: str, dialogue: str, signals: Optional[Set[str]] = None) -> None:
         """Track item mentions and update registry."""
-        dialogue_lower = dialogue.lower()
+        if signals is None:
+            signals = self.signals.dialogue.matches(dialogue)
         registry = self.state.entity_registry
         
         # Track wallet mentions
-        if "wallet" in dialogue_lower:
+        if "wallet" in signals:
             if speaker == "Saleem":
-                if "missing" in dialogue_lower or "lost" in dialogue_lower:
+                if "wallet_missing" in signals:
                     registry.update_item_status("wallet", status="missing", last_mentioned_by=speaker)
-                elif "50000" in dialogue or "fifty thousand" in dialogue_lower:
+                elif "wallet_value" in signals:
                     registry.update_item_status("wallet", value="50000 rupees", claim_made_by=speaker)
             elif speaker == "Uncle Jameel":
-                if "found" in dialogue_lower:
+                if "wallet_found" in signals:
                     # Get the TRUE owner from registry
                     true_owner = registry.get_owner("wallet")
                     registry.update_item_status("wallet", status="found", found_by=speaker, location="rickshaw seat")
@@ -173,12 +214,17 @@ class StoryStateManager:
     def get_entity_context(self) -> str:
         """Return formatted entity registry for Director/Character prompts."""
         registry = self.state.entity_registry
+        cached = self._entity_context_cache
+        if cached is not None and cached[0] == registry.version:
+            return cached[1]
         lines = ["ENTITY REGISTRY (Source of Truth):"]
         for item_name, data in registry.items.items():
             owner = data.get("owner", "unknown")
             status = data.get("status", "unknown")
             lines.append(f"  • {item_name}: OWNER={owner}, STATUS={status}")
-        return "\n".join(lines)
+        text = "\n".join(lines)
+        self._entity_context_cache = (registry.version, text)
+        return text
 
     # ── Issue 5: Clue Progression ─────────────────────────────────────────────
 
@@ -204,9 +250,9 @@ class StoryStateManager:
                 profiles["Uncle Jameel"].knowledge.add("raza_is_running_his_routine")
         elif clue_type == "evidence":
             if truth == "ahmed_stole_wallet" and "Ahmed Malik" in profiles:
-                profiles["Ahmed Malik"].emotional_state = "nervous"
+                self._set_memory(profiles["Ahmed Malik"], "emotional_state", None, "nervous")
             elif truth == "raza_corrupt" and "Constable Raza" in profiles:
-                profiles["Constable Raza"].emotional_state = "nervous"
+                self._set_memory(profiles["Constable Raza"], "emotional_state", None, "nervous")
         elif clue_type == "weapon":
             for profile in profiles.values():
                 profile.knowledge.add(f"mystery_truth_emerging_{truth}")
@@ -231,76 +277,65 @@ class StoryStateManager:
     # ── Issue 3: Perception Update (Volatile Memory) ──────────────────────────
 
     def update_memory_from_dialogue(self, speaker: str, dialogue: str, turn_number: int) -> None:
-        dialogue_lower = dialogue.lower()
-        profiles = self.state.character_profiles
-
-        aggressive_signals = ["threaten", "sue", "lawyer", "arrest", "charge", "demand",
-                              "incompetent", "preposterous", "idiot", "fool"]
-        conciliatory_signals = ["please", "sorry", "understand", "calm", "settle",
-                                "reasonable", "bhai", "yaar", "let us"]
-        corruption_signals = ["chai pani", "facilitation", "settle quietly", "fee",
-                              "between us", "nobody needs to know", "small amount"]
-        victim_signals = ["family", "livelihood", "children", "cannot afford", "poor",
-                          "mouths to feed"]
-
-        is_aggressive    = any(s in dialogue_lower for s in aggressive_signals)
-        is_conciliatory  = any(s in dialogue_lower for s in conciliatory_signals)
-        is_corrupt       = any(s in dialogue_lower for s in corruption_signals)
-        is_victim        = any(s in dialogue_lower for s in victim_signals)
+        # One pass over the line for every keyword family
+        matched = self.signals.dialogue.classify(dialogue)
 
-        before_snapshot = self._snapshot_memory()
+        is_aggressive    = "aggressive" in matched
+        is_conciliatory  = "conciliatory" in matched
+        is_corrupt       = "corrupt" in matched
+        is_victim        = "victim" in matched
 
-        for observer_name, observer_profile in profiles.items():
-            if observer_name == speaker:
-                continue
+        self.memory_volatility_log.begin_turn(turn_number, speaker, matched)
 
+        # Each signal moves every other character's view of the speaker at once
+        if speaker in self.relationships.index:
             if is_aggressive:
-                observer_profile.suspicion[speaker] = min(
-                    1.0, observer_profile.suspicion.get(speaker, 0.3) + 0.15)
-                observer_profile.trust[speaker] = max(
-                    0.0, observer_profile.trust.get(speaker, 0.5) - 0.10)
+                self._adjust_toward("suspicion", speaker, +0.15)
+                self._adjust_toward("trust", speaker, -0.10)
 
             if is_conciliatory:
-                observer_profile.trust[speaker] = min(
-                    1.0, observer_profile.trust.get(speaker, 0.5) + 0.08)
+                self._adjust_toward("trust", speaker, +0.08)
 
             if is_corrupt and speaker == "Constable Raza":
-                observer_profile.suspicion[speaker] = min(
-                    1.0, observer_profile.suspicion.get(speaker, 0.3) + 0.20)
-                observer_profile.trust[speaker] = max(
-                    0.0, observer_profile.trust.get(speaker, 0.5) - 0.15)
+                self._adjust_toward("suspicion", speaker, +0.20)
+                self._adjust_toward("trust", speaker, -0.15)
 
             if is_victim and speaker == "Saleem":
-                observer_profile.trust[speaker] = min(
-                    1.0, observer_profile.trust.get(speaker, 0.5) + 0.05)
-
-        after_snapshot = self._snapshot_memory()
-        self.memory_volatility_log.append({
-            "turn": turn_number,
-            "speaker": speaker,
-            "before": before_snapshot,
-            "after": after_snapshot,
-            "signals": {
-                "aggressive": is_aggressive,
-                "conciliatory": is_conciliatory,
-                "corrupt": is_corrupt,
-                "victim": is_victim
-            }
-        })
+                self._adjust_toward("trust", speaker, +0.05)
         
         # NEW: Update entity registry from dialogue
-        self.update_entity_from_dialogue(speaker, dialogue)
+        self.update_entity_from_dialogue(speaker, dialogue, set(matched))
 
     def _snapshot_memory(self) -> Dict:
+        trust = self.relationships.rows("trust", 3)
+        suspicion = self.relationships.rows("suspicion", 3)
         return {
             name: {
-                "trust": {k: round(v, 3) for k, v in p.trust.items()},
-                "suspicion": {k: round(v, 3) for k, v in p.suspicion.items()},
+                "trust": trust[name],
+                "suspicion": suspicion[name],
                 "emotional_state": p.emotional_state
             }
             for name, p in self.state.character_profiles.items()
         }
 
+    def _set_memory(self, profile: CharacterProfile, field: str, target: Optional[str], value) -> None:
+        """Single write path for trust/suspicion (per target) and emotional_state (target None)."""
+        if field == "emotional_state":
+            old = profile.emotional_state
+            profile.emotional_state = value
+        else:
+            values = getattr(profile, field)
+            old = values.get(target)
+            values[target] = value
+        self.memory_volatility_log.record(profile.name, field, target, old, value)
+
+    def _adjust_toward(self, field: str, target: str, delta: float) -> None:
+        observers, old, new = self.relationships.adjust_toward(field, target, delta)
+        changed = old != new
+        names = self.relationships.names
+        for i, before, after in zip(observers[changed].tolist(), old[changed].tolist(), new[changed].tolist()):
+            self.memory_volatility_log.record(names[i], field, target, before, after)
+
     # ── Existing: Memory Update from Actions ──────────────────────────────────
 
     def update_memory_from_action(self, character: str, action: str, targets: List[str] = None) -> None:
@@ -308,71 +343,101 @@ class StoryStateManager:
         if not profile:
             return
         action_lower = action.lower()
-        if "accuse" in action_lower or "blame" in action_lower:
-            profile.emotional_state = "angry"
+        signals = self.signals.action.matches(action)
+        if "accuse" in signals:
+            self._set_memory(profile, "emotional_state", None, "angry")
             if targets:
                 for t in targets:
-                    profile.suspicion[t] = min(1.0, profile.suspicion.get(t, 0.5) + 0.3)
-                    profile.trust[t] = max(0.0, profile.trust.get(t, 0.5) - 0.2)
-        elif "show" in action_lower or "reveal" in action_lower:
-            profile.emotional_state = "defensive"
-            if "wallet" in action_lower: profile.knowledge.add("wallet_discussed")
-            if "damage" in action_lower: profile.knowledge.add("damage_shown")
-        elif "demand" in action_lower or "threaten" in action_lower:
-            profile.emotional_state = "aggressive"
+                    self._set_memory(profile, "suspicion", t, min(1.0, profile.suspicion.get(t, 0.5) + 0.3))
+                    self._set_memory(profile, "trust", t, max(0.0, profile.trust.get(t, 0.5) - 0.2))
+        elif "show" in signals:
+            self._set_memory(profile, "emotional_state", None, "defensive")
+            if "wallet" in signals: profile.knowledge.add("wallet_discussed")
+            if "damage" in signals: profile.knowledge.add("damage_shown")
+        elif "demand" in signals:
+            self._set_memory(profile, "emotional_state", None, "aggressive")
             if targets:
                 for t in targets:
-                    profile.trust[t] = max(0.0, profile.trust.get(t, 0.5) - 0.3)
-        elif "calm" in action_lower or "mediate" in action_lower:
-            profile.emotional_state = "diplomatic"
+                    self._set_memory(profile, "trust", t, max(0.0, profile.trust.get(t, 0.5) - 0.3))
+        elif "calm" in signals:
+            self._set_memory(profile, "emotional_state", None, "diplomatic")
             if targets:
                 for t in targets:
-                    profile.trust[t] = min(1.0, profile.trust.get(t, 0.5) + 0.1)
-        elif "bribe" in action_lower or "fee" in action_lower or "money" in action_lower:
-            profile.emotional_state = "nervous"
+                    self._set_memory(profile, "trust", t, min(1.0, profile.trust.get(t, 0.5) + 0.1))
+        elif "bribe" in signals:
+            self._set_memory(profile, "emotional_state", None, "nervous")
             profile.knowledge.add("bribe_attempted")
             if targets:
                 for t in targets:
-                    profile.suspicion[t] = min(1.0, profile.suspicion.get(t, 0.5) + 0.2)
-        elif "search" in action_lower or "check" in action_lower:
-            profile.emotional_state = "suspicious"
-            if "rickshaw" in action_lower: profile.knowledge.add("rickshaw_searched")
-        elif "leave" in action_lower or "walk" in action_lower:
-            profile.emotional_state = "frustrated"
+                    self._set_memory(profile, "suspicion", t, min(1.0, profile.suspicion.get(t, 0.5) + 0.2))
+        elif "search" in signals:
+            self._set_memory(profile, "emotional_state", None, "suspicious")
+            if "rickshaw" in signals: profile.knowledge.add("rickshaw_searched")
+        elif "leave" in signals:
+            self._set_memory(profile, "emotional_state", None, "frustrated")
         profile.knowledge.add(f"action_{action_lower.replace(' ', '_')[:30]}")
 
     # ── Memory Snapshot for Prompts ───────────────────────────────────────────
 
-    def get_memory_snapshot(self, character_name: str) -> Dict:
+    def get_memory_snapshot(self, character_name: str, dialogue_history: Optional[Sequence] = None) -> Dict:
         profile = self.state.character_profiles.get(character_name)
         if not profile:
             return {}
-        top_trust = sorted(profile.trust.items(), key=lambda x: x[1], reverse=True)[:2]
-        top_suspicion = sorted(profile.suspicion.items(), key=lambda x: x[1], reverse=True)[:2]
+        top_trust = self.relationships.top_k(character_name, "trust", 2)
+        top_suspicion = self.relationships.top_k(character_name, "suspicion", 2)
         own_recent = self.character_dialogue_history.get(character_name, [])[-3:]
+
+        # Memory packs into whatever the shared situation context left over
+        self.get_context_for_character(character_name, dialogue_history)
+        window = self._character_context_cache[2]
+        packed = self.context_assembler.pack([
+            ContextBlock("recent_own_dialogue", 0, own_recent[::-1]),
+            ContextBlock("key_knowledge", 1, list(profile.knowledge)[-4:]),
+        ], budget=window.remaining)
+
         return {
             "emotional_state": profile.emotional_state,
             "top_trust": {n: round(v, 2) for n, v in top_trust},
             "top_suspicion": {n: round(v, 2) for n, v in top_suspicion},
-            "key_knowledge": list(profile.knowledge)[-4:],
+            "key_knowledge": packed.blocks["key_knowledge"],
             "inventory": profile.inventory,
-            "recent_own_dialogue": own_recent
+            "recent_own_dialogue": packed.blocks["recent_own_dialogue"][::-1],
+            "context_window": {
+                "budget": window.budget,
+                "used": window.used + packed.used,
+                "truncated": {**window.truncated, **packed.truncated}
+            }
         }
 
-    def get_context_for_character(self, character_name: str) -> str:
-        recent = self.state.dialogue_history[-4:]
-        history_text = "\n".join(
-            f"{t.speaker}: {t.dialogue}" for t in recent
-        ) if recent else "Story just started."
-        
-        # NEW: Add entity context
-        entity_context = self.get_entity_context()
-        
-        return (
-            f"Initial Event: {self.state.seed_story.get('description', 'Unknown event')}\n\n"
-            f"{entity_context}\n\n"
-            f"Recent Conversation:\n{history_text}"
-        )
+    def get_context_for_character(self, character_name: str, dialogue_history: Optional[Sequence] = None) -> str:
+        """
+        `dialogue_history` is the graph state's (the graph does not write turns
+        back to this manager); defaults to the manager's own history.
+        """
+        if dialogue_history is None:
+            dialogue_history = self.state.dialogue_history
+        # Same text for every character; rebuilt only when history or registry change
+        key = (len(dialogue_history), self.state.entity_registry.version)
+        cached = self._character_context_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        recent = dialogue_history[-self.config.context_history_turns:]
+        packed = self.context_assembler.pack([
+            ContextBlock("initial_event", 0, [
+                f"Initial Event: {self.state.seed_story.get('description', 'Unknown event')}"
+            ]),
+            ContextBlock("entity_registry", 0, self.get_entity_context().split("\n")),
+            # Newest first, so the oldest turns are the ones dropped
+            ContextBlock("history", 1, [f"{t.speaker}: {t.dialogue}" for t in reversed(recent)]),
+        ])
+        history = packed.blocks["history"][::-1]
+        history_text = "\n".join(history) if history else "Story just started."
+
+        sections = packed.blocks["initial_event"] + ["\n".join(packed.blocks["entity_registry"])]
+        context = "\n\n".join(sections) + f"\n\nRecent Conversation:\n{history_text}"
+        self._character_context_cache = (key, context, packed)
+        return context
 
     def get_context_for_director(self) -> str:
         history_text = "\n".join(
@@ -399,7 +464,7 @@ class StoryStateManager:
             dialogue=dialogue,
             metadata=metadata or {}
         )
-        self.state.dialogue_history.append(turn)
+        self.state.dialogue_history = self.state.dialogue_history.appended([turn])
         self.state.current_turn += 1
 
     def should_force_action(self) -> bool:
@@ -422,4 +487,29 @@ class StoryStateManager:
 
     def record_dialogue(self, speaker: str, dialogue: str) -> None:
         if speaker in self.character_dialogue_history:
-            self.character_dialogue_history[speaker].append(dialogue)
\ No newline at end of file
+            self.character_dialogue_history[speaker].append(dialogue)
+
+    # ── Checkpointing ─────────────────────────────────────────────────────────
+
+    _CHECKPOINT_FIELDS = (
+        "state", "relationships", "total_turns", "action_count", "consecutive_dialogue_count",
+        "character_dialogue_history", "last_action_taken", "last_action_acknowledged", "clues_dropped"
+    )
+
+    def checkpoint_state(self) -> Dict:
+        """Mutable run state, to be pickled in one go with the graph values (shared objects stay shared)."""
+        log = self.memory_volatility_log
+        data = {name: getattr(self, name) for name in self._CHECKPOINT_FIELDS}
+        data["rng"] = self.rng.getstate()
+        data["volatility"] = (log.turn, log.changes, log.turns, log.keyframes)
+        return data
+
+    def restore_state(self, data: Dict) -> None:
+        for name in self._CHECKPOINT_FIELDS:
+            setattr(self, name, data[name])
+        # In place: the director draws from the same Random
+        self.rng.setstate(data["rng"])
+        log = self.memory_volatility_log
+        log.turn, log.changes, log.turns, log.keyframes = data["volatility"]
+        self._entity_context_cache = None
+        self._character_context_cache = None
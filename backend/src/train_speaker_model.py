@@ -0,0 +1,159 @@
+"""
+Train the learned speaker-selection model from logged director decisions.
+
+Reads LLM speaker selections from prompt logs (prompts_log.json, older
+prompts.jsonl, and the PROMPT_LOG_PATH sink with its rotated backups),
+holds out a split, and reports the model's agreement with the LLM, how
+many director calls it would replace at --min-confidence, and the latency
+that saves. The saved model is then refit on every example, unless its
+confident picks did worse than the baseline rule on the held-out split
+(--force saves it anyway).
+
+    python src/train_speaker_model.py
+    python src/train_speaker_model.py logs/prompts.jsonl --out speaker_model.npz --min-confidence 0.7
+    SPEAKER_MODEL=speaker_model.npz python src/main.py
+"""
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.config import StoryConfig
+from src.log_sink import log_files
+from src.speaker_model import Example, SpeakerModel, load_examples
+
+
+def default_log_paths(config: StoryConfig) -> List[Path]:
+    paths = [project_root / p for p in config.replay_log_paths]
+    if config.prompt_log_path:
+        paths.extend(log_files(project_root / config.prompt_log_path))
+    return paths
+
+
+def split_examples(examples: List[Example], test_fraction: float) -> Tuple[List[Example], List[Example]]:
+    """Hold out whole sessions when there are enough of them, else the tail of each session."""
+    groups: Dict[str, List[Example]] = {}
+    for example in examples:
+        groups.setdefault(example.group, []).append(example)
+    if len(groups) >= 5:
+        held_out = set(list(groups)[-max(1, round(len(groups) * test_fraction)):])
+        return ([e for e in examples if e.group not in held_out],
+                [e for e in examples if e.group in held_out])
+    train, test = [], []
+    for group in groups.values():
+        cut = len(group) - max(1, math.ceil(len(group) * test_fraction))
+        train.extend(group[:cut])
+        test.extend(group[cut:])
+    return train, test
+
+
+def baseline_choice(context: Dict[str, Any]) -> str:
+    """Not the last speaker, whoever was addressed by name first (DirectorAgent.rank_likely_speakers)."""
+    recent = context.get("recent_speakers") or []
+    last_line = (context.get("last_line") or "").lower()
+    candidates = [c for c in context["candidates"] if not recent or c != recent[-1]] or context["candidates"]
+    addressed = [c for c in candidates if any(p.lower() in last_line for p in c.split() if len(p) > 3)]
+    return (addressed or candidates)[0]
+
+
+def evaluate(model: SpeakerModel, test: List[Example], min_confidence: float,
+             llm_latency_s: Optional[float]) -> Dict[str, Any]:
+    predictions = [model.predict(e.context) for e in test]
+    correct = [speaker == e.label for (speaker, _), e in zip(predictions, test)]
+    confident = [ok for (_, p), ok in zip(predictions, correct) if p >= min_confidence]
+
+    # Per-prediction latency, averaged over repeated passes
+    passes = max(1, 2000 // max(len(test), 1))
+    started = time.perf_counter()
+    for _ in range(passes):
+        for e in test:
+            model.predict(e.context)
+    model_s = (time.perf_counter() - started) / (passes * len(test))
+
+    coverage = len(confident) / len(test)
+    report = {
+        "held_out": len(test),
+        "accuracy_vs_llm": round(sum(correct) / len(test), 3),
+        "baseline_accuracy": round(sum(baseline_choice(e.context) == e.label for e in test) / len(test), 3),
+        "min_confidence": min_confidence,
+        "coverage": round(coverage, 3),
+        "accuracy_when_confident": round(sum(confident) / len(confident), 3) if confident else None,
+        "model_latency_us": round(model_s * 1e6, 1),
+        "llm_latency_ms": round(llm_latency_s * 1000, 1) if llm_latency_s is not None else None,
+        "latency_saved_per_selection_ms": None
+    }
+    if llm_latency_s is not None:
+        # Confident selections skip the call; the rest pay for the model and then the call
+        saved = coverage * llm_latency_s - model_s
+        report["latency_saved_per_selection_ms"] = round(saved * 1000, 1)
+    return report
+
+
+def beats_baseline(report: Dict[str, Any]) -> bool:
+    """False if the picks the director would take from the model are less accurate than the baseline rule."""
+    confident = report["accuracy_when_confident"]
+    return confident is None or confident >= report["baseline_accuracy"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="*", help="Prompt logs (default: replay logs + PROMPT_LOG_PATH sink)")
+    parser.add_argument("--out", default="speaker_model.npz", help="Model path (relative to the backend root)")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--min-confidence", type=float, default=StoryConfig.speaker_model_min_confidence)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--n-features", type=int, default=4096, help="Hashed feature buckets")
+    parser.add_argument("--llm-latency-ms", type=float, default=None,
+                        help="Director call latency, for logs that do not record latency_s")
+    parser.add_argument("--force", action="store_true",
+                        help="Save the model even if it does worse than the baseline when confident")
+    args = parser.parse_args()
+
+    config = StoryConfig()
+    paths = [Path(p) for p in args.logs] if args.logs else default_log_paths(config)
+    examples = load_examples(paths)
+    if len(examples) < 2:
+        sys.exit(f"Need at least 2 logged LLM speaker selections, found {len(examples)} in "
+                 f"{', '.join(str(p) for p in paths)}")
+
+    latencies = [e.latency_s for e in examples if e.latency_s is not None]
+    llm_latency_s = statistics.mean(latencies) if latencies else \
+        (args.llm_latency_ms / 1000 if args.llm_latency_ms is not None else None)
+
+    train, test = split_examples(examples, args.test_fraction)
+    model = SpeakerModel(args.n_features).fit([(e.context, e.label) for e in train], epochs=args.epochs)
+    report = {
+        "examples": len(examples),
+        "sessions": len({e.group for e in examples}),
+        "train": len(train),
+        **evaluate(model, test, args.min_confidence, llm_latency_s)
+    }
+
+    print(json.dumps(report, indent=2))
+    if not beats_baseline(report):
+        message = (f"Held-out accuracy when confident ({report['accuracy_when_confident']}) is below the "
+                   f"baseline ({report['baseline_accuracy']}) at --min-confidence {args.min_confidence}: "
+                   f"the director would replace LLM choices with worse ones")
+        if not args.force:
+            sys.exit(f"{message}. Not saving (log more decisions, raise --min-confidence, or pass --force).")
+        print(f"Warning: {message}.", file=sys.stderr)
+
+    final = SpeakerModel(args.n_features).fit([(e.context, e.label) for e in examples], epochs=args.epochs)
+    final.metadata = {"trained_at": datetime.now().isoformat(), "evaluation": report}
+    out = project_root / args.out
+    final.save(out)
+    print(f"Saved {out} (refit on all {len(examples)} examples)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import copy
+from typing import Callable, Dict, List, Any, Optional, NamedTuple
+
+# Snapshot shape: {character: {"trust": {other: v}, "suspicion": {other: v}, "emotional_state": str}}
+MemorySnapshot = Dict[str, Dict[str, Any]]
+
+
+class MemoryChange(NamedTuple):
+    turn: int
+    observer: str
+    target: Optional[str]  # None for emotional_state
+    field: str             # "trust" | "suspicion" | "emotional_state"
+    old: Any
+    new: Any
+
+
+class VolatilityLog:
+    """
+    Audit trail of character memory as deltas instead of full snapshots.
+    Every changed (observer, target, field, old, new) is appended once; a full
+    keyframe is taken every `keyframe_interval` turns, and `snapshot_at(turn)`
+    rebuilds the complete snapshot from the nearest keyframe plus deltas.
+    Values are rounded to 3 places, and changes that vanish when rounded are skipped.
+    With `max_turns` set, whole keyframe segments older than the newest
+    `max_turns` dialogue turns are dropped, so memory stays flat on long runs.
+    """
+
+    def __init__(self, take_snapshot: Callable[[], MemorySnapshot], keyframe_interval: int = 5,
+                 max_turns: Optional[int] = None):
+        self.take_snapshot = take_snapshot
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.max_turns = max_turns
+        self.turn = 0
+        self.changes: List[MemoryChange] = []
+        self.turns: List[Dict[str, Any]] = []  # per dialogue update: turn, speaker, matched signal spans
+        # (turn, index into self.changes, snapshot), oldest first
+        self.keyframes: List[tuple] = [(0, 0, take_snapshot())]
+
+    def begin_turn(self, turn: int, speaker: str, signals: Dict[str, Any]) -> None:
+        """Start a dialogue update; later changes are attributed to `turn`."""
+        self.turn = turn
+        if turn - self.keyframes[-1][0] >= self.keyframe_interval:
+            self.keyframes.append((turn, len(self.changes), self.take_snapshot()))
+        self.turns.append({"turn": turn, "speaker": speaker, "signals": signals})
+        if self.max_turns is not None and len(self.turns) > self.max_turns:
+            self._trim()
+
+    def record(self, observer: str, field: str, target: Optional[str], old: Any, new: Any) -> None:
+        if field != "emotional_state":
+            old = round(old, 3) if old is not None else None
+            new = round(new, 3)
+        if old != new:
+            self.changes.append(MemoryChange(self.turn, observer, target, field, old, new))
+
+    def changes_at(self, turn: int) -> List[MemoryChange]:
+        return [c for c in self.changes if c.turn == turn]
+
+    def snapshot_at(self, turn: int) -> MemorySnapshot:
+        """Full memory snapshot after every change up to and including `turn`."""
+        _, start, keyframe = self.keyframes[0]
+        for candidate in self.keyframes[1:]:
+            if candidate[0] > turn:
+                break
+            _, start, keyframe = candidate
+
+        snapshot = copy.deepcopy(keyframe)
+        for change in self.changes[start:]:
+            if change.turn > turn:
+                break
+            character = snapshot[change.observer]
+            if change.field == "emotional_state":
+                character["emotional_state"] = change.new
+            else:
+                character[change.field][change.target] = change.new
+        return snapshot
+
+    def _trim(self) -> None:
+        oldest_kept = self.turns[-self.max_turns]["turn"]
+        # Drop the first segment only once the next keyframe can stand in for it
+        while len(self.keyframes) > 1 and self.keyframes[1][0] <= oldest_kept:
+            cut = self.keyframes[1][1]
+            del self.changes[:cut]
+            self.keyframes = [(t, index - cut, snap) for t, index, snap in self.keyframes[1:]]
+        first = self.keyframes[0][0]
+        while self.turns and self.turns[0]["turn"] < first:
+            self.turns.pop(0)
+
+    def __len__(self) -> int:
+        return len(self.turns)
@@ -0,0 +1,49 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from src.agents.character_agent import CharacterAgent
+from src.agents.director_agent import DirectorAgent
+from src.append_log import AppendLog
+from src.config import StoryConfig
+from src.graph.narrative_graph import NarrativeGraph
+from src.scenarios import get_scenario_registry
+from src.story_state import StoryStateManager
+
+LOG_FIELDS = ("events", "dialogue_history", "director_notes", "story_narration")
+
+
+async def _run_story(config: StoryConfig):
+    """Stream one fake-backend story; returns (per-field item totals from the updates, final values)."""
+    scenario = get_scenario_registry(config).get(config.default_scenario)
+    manager = StoryStateManager(scenario.seed_story, scenario.characters, config, signals=scenario.signals)
+    characters = [CharacterAgent(name=char["name"], config=config) for char in scenario.characters]
+    director = DirectorAgent(config, manager)
+    graph = NarrativeGraph(config, characters, director, manager)
+
+    appended, final = Counter(), None
+    initial = graph.build_initial_state(scenario.seed_story, manager.state.character_profiles)
+    async for mode, chunk in graph.astream(initial, stream_mode=["updates", "values"]):
+        if mode == "values":
+            final = chunk
+            continue
+        for update in chunk.values():
+            for field in LOG_FIELDS:
+                appended[field] += len((update or {}).get(field) or ())
+    return appended, final
+
+
+@pytest.mark.parametrize("fast_state", [False, True])
+def test_full_run_keeps_every_appended_item(fast_state):
+    config = StoryConfig(llm_backend="fake", seed=7, max_turns=25, fast_state=fast_state)
+    appended, final = asyncio.run(_run_story(config))
+
+    assert final["is_concluded"]
+    assert appended["events"] > 0 and appended["dialogue_history"] > 0
+    for field in LOG_FIELDS:
+        log = final[field]
+        assert isinstance(log, AppendLog)
+        assert len(log) == appended[field], field
+        for k in (1, 3, len(log)):
+            assert log[-k:] == list(log)[-k:], (field, k)
@@ -0,0 +1,94 @@
+import asyncio
+
+from src.config import StoryConfig
+from src.engine.checkpoints import SessionCheckpointer
+from src.engine.sessions import StorySession
+from src.scenarios import get_scenario_registry
+
+
+def _save(checkpoints, session_id, turn, snapshot=b"\x00snap"):
+    checkpoints.save(session_id, "rickshaw_accident", 7, "truth", "tp", "none", turn, snapshot)
+
+
+def test_save_get_overwrite_delete(tmp_path):
+    checkpoints = SessionCheckpointer(tmp_path / "checkpoints.db")
+    assert checkpoints.get("a") is None
+    _save(checkpoints, "a", 1)
+    _save(checkpoints, "a", 2, b"\xffnewer")
+    saved = checkpoints.get("a")
+    assert (saved.session_id, saved.scenario, saved.seed, saved.hidden_truth) == ("a", "rickshaw_accident", 7, "truth")
+    assert (saved.turning_point, saved.pacing, saved.turn, saved.snapshot) == ("tp", "none", 2, b"\xffnewer")
+    assert len(checkpoints.pending()) == 1
+
+    checkpoints.delete("a")
+    checkpoints.delete("never-saved")
+    assert checkpoints.get("a") is None and checkpoints.pending() == []
+    checkpoints.close()
+
+
+def test_pending_is_oldest_update_first(tmp_path):
+    checkpoints = SessionCheckpointer(tmp_path / "checkpoints.db")
+    for session_id in ["b", "a", "c"]:
+        _save(checkpoints, session_id, 1)
+    _save(checkpoints, "b", 2)
+    assert [saved.session_id for saved in checkpoints.pending()] == ["a", "c", "b"]
+    checkpoints.close()
+
+
+def test_checkpoints_survive_reopening(tmp_path):
+    path = tmp_path / "checkpoints.db"
+    first = SessionCheckpointer(path)
+    _save(first, "a", 3, bytes(range(256)))
+    first.close()  # the worker goes away
+
+    second = SessionCheckpointer(path)
+    saved = second.get("a")
+    assert saved.turn == 3 and saved.snapshot == bytes(range(256))
+    second.close()
+
+
+def _story_values(values):
+    """Graph values without the wall-clock timestamps of dialogue turns."""
+    return {
+        key: [turn.model_dump(exclude={"timestamp"}) for turn in value] if key == "dialogue_history" else value
+        for key, value in values.items()
+    }
+
+
+def test_restored_session_finishes_the_same_story(tmp_path):
+    config = StoryConfig(llm_backend="fake", seed=5)
+    story = get_scenario_registry(config).get(config.default_scenario)
+
+    async def drive(session, checkpoint_turn=None):
+        """Run to the end like SessionEngine does, checkpointing after `checkpoint_turn`."""
+        snapshot, turn_ended, values = None, False, None
+        async for mode, chunk in session.astream(["updates", "values"]):
+            if mode == "values":
+                if turn_ended and not chunk["is_concluded"] and chunk["current_turn"] == checkpoint_turn:
+                    snapshot = session.checkpoint(chunk)
+                turn_ended = False
+                values = chunk
+            else:
+                turn_ended = "check_conclusion" in chunk
+        return snapshot, values
+
+    async def run():
+        original = StorySession("a", story.seed_story, story.characters, config,
+                                signals=story.signals, scenario=story.name)
+        snapshot, uninterrupted = await drive(original, checkpoint_turn=3)
+
+        checkpoints = SessionCheckpointer(tmp_path / "checkpoints.db")
+        _save(checkpoints, "a", 3, snapshot)
+        saved = checkpoints.get("a")
+        resumed = StorySession("a", story.seed_story, story.characters, config,
+                               hidden_truth=original.story_manager.hidden_truth,
+                               turning_point=original.director.turning_point_event["id"],
+                               seed=original.seed, signals=story.signals, scenario=story.name,
+                               snapshot=saved.snapshot)
+        assert resumed.initial_state()["current_turn"] == 3
+        _, finished = await drive(resumed)
+        return uninterrupted, finished
+
+    uninterrupted, finished = asyncio.run(run())
+    assert finished["current_turn"] > 3
+    assert _story_values(finished) == _story_values(uninterrupted)
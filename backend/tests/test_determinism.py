@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def _batch_events(output_dir: Path, hash_seed: str):
+    env = {**os.environ, "PYTHONHASHSEED": hash_seed}
+    subprocess.run(
+        [sys.executable, "src/batch.py", "--runs", "2", "--workers", "1", "--backend", "fake",
+         "--seed", "100", "--output-dir", str(output_dir)],
+        cwd=BACKEND, env=env, check=True, capture_output=True
+    )
+    runs = [json.loads(line) for shard in sorted(output_dir.glob("shard-*.jsonl")) for line in shard.open()]
+    return {run["seed"]: run["events"] for run in runs}
+
+
+def test_same_seed_same_story_across_hash_seeds(tmp_path):
+    first = _batch_events(tmp_path / "a", "1")
+    second = _batch_events(tmp_path / "b", "2")
+    assert len(first) == 2
+    assert first == second
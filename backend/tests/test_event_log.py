@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+from src.config import StoryConfig
+from src.engine.event_log import EventLog, parse_event_id
+from src.engine.sessions import SessionEngine
+from src.scenarios import get_scenario_registry
+
+
+def _frames(text):
+    """[(id, event)] from joined SSE frames."""
+    parsed = []
+    for frame in filter(None, text.split("\n\n")):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        parsed.append((lines.get("id"), json.loads(lines["data"])))
+    return parsed
+
+
+def _events(first, last):
+    return [{"type": "dialogue", "seq": seq} for seq in range(first, last + 1)]
+
+
+def test_parse_event_id():
+    assert parse_event_id("abc:12") == ("abc", 0, 12)
+    assert parse_event_id("abc:2:12") == ("abc", 2, 12)
+    for bad in (None, "", "abc", ":12", "abc:x", "abc:1:2:3"):
+        assert parse_event_id(bad) is None
+
+
+def test_replays_frames_dropped_from_memory_from_the_spill_file(tmp_path):
+    log = EventLog("s", max_memory_events=4, spill_dir=tmp_path)
+    for event in _events(1, 20):
+        log.append([event])
+
+    assert [e["seq"] for _, e in _frames(log.read(0))] == list(range(1, 21))
+    assert [i for i, _ in _frames(log.read(15))] == [f"s:{seq}" for seq in range(16, 21)]
+
+
+def test_follow_yields_everything_then_stops_when_closed():
+    async def follow():
+        log = EventLog("s")
+        log.append(_events(1, 3))
+        chunks = []
+
+        async def reader():
+            async for chunk in log.follow(1):
+                chunks.append(chunk)
+        task = asyncio.create_task(reader())
+        await asyncio.sleep(0)
+        log.append(_events(4, 5))
+        log.close()
+        await task
+        return [e["seq"] for chunk in chunks for _, e in _frames(chunk)]
+
+    assert asyncio.run(follow()) == [2, 3, 4, 5]
+
+
+def test_discard_deletes_the_spill_file(tmp_path):
+    log = EventLog("s", spill_dir=tmp_path)
+    log.append(_events(1, 3))
+    assert (tmp_path / "s.jsonl").exists()
+    log.discard()
+    assert log.closed and not (tmp_path / "s.jsonl").exists()
+
+
+def test_resumed_log_keeps_the_checkpointed_prefix_in_a_new_epoch(tmp_path):
+    crashed = EventLog("s", spill_dir=tmp_path)
+    crashed.append(_events(1, 10))
+    crashed.flush()  # the checkpoint flushes; the process then dies
+
+    resumed = EventLog("s", spill_dir=tmp_path, first_seq=7, epoch=1)
+    resumed.append(_events(7, 8))
+    ids = [i for i, _ in _frames(resumed.read(0))]
+    assert ids == [f"s:{seq}" for seq in range(1, 7)] + ["s:1:7", "s:1:8"]
+
+    # Frames 7-10 of epoch 0 were regenerated: those viewers replay from the checkpoint
+    assert resumed.resume_after(0, 9) == 6
+    assert resumed.resume_after(0, 3) == 3
+    assert resumed.resume_after(1, 8) == 8
+
+
+def test_engine_resumes_a_checkpointed_run_after_shutdown(tmp_path):
+    config = StoryConfig(llm_backend="fake", seed=7, event_log_dir=str(tmp_path / "logs"),
+                         checkpoint_path=str(tmp_path / "checkpoints.db"), injected_latency_ms=20)
+    scenarios = get_scenario_registry(config)
+    story = scenarios.get(config.default_scenario)
+
+    async def run():
+        engine = SessionEngine(config)
+        session = engine.create_session(story.seed_story, story.characters, 7, story.signals, story.name)
+        engine.start(session)
+        engine.attach(session.session_id)
+        while engine.checkpoints.get(session.session_id) is None:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.3)  # run on past the checkpoint
+        await engine.shutdown()
+        assert (tmp_path / "logs" / f"{session.session_id}.jsonl").exists()
+
+        restarted = SessionEngine(config)
+        assert restarted.resume_checkpointed(scenarios) == [session.session_id]
+        resumed = restarted.sessions[session.session_id]
+        restarted.attach(session.session_id)
+        await resumed.task
+        return restarted, resumed
+
+    engine, session = asyncio.run(run())
+    frames = _frames(session.event_log.read(0))
+    assert [e["seq"] for _, e in frames] == list(range(1, len(frames) + 1))
+    rewind = next(e for _, e in frames if e["type"] == "rewind")
+    assert rewind["seq"] == rewind["after_seq"] + 1 == session.event_log.epoch_first_seq
+    assert frames[-1][1]["type"] == "end"
+    assert frames[-1][0] == f"{session.session_id}:1:{len(frames)}"
+    assert engine.checkpoints.get(session.session_id) is None
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from src.prompts.character_prompts import CHARACTER_PROMPT_TEMPLATE, get_character_prompt
+from src.prompts.compiler import PromptTemplate
+from src.prompts.director_prompts import DIRECTOR_SELECT_SPEAKER_PROMPT, DIRECTOR_SELECT_SPEAKER_TEMPLATE
+from src.schemas import CharacterProfile
+
+# Values that would trip a naive code generator: quotes, braces, backslashes, newlines
+AWKWARD = ['plain', "it's", 'say "no"', "{not_a_field}", "{{", "back\\slash", "two\nlines", "'''", '"""', ""]
+
+
+def test_render_matches_str_format():
+    template = "A {x} and {y}, {{literal}} {x}!'\"\\n"
+    compiled = PromptTemplate(template)
+    assert compiled.fields == {"x", "y"}
+    for x in AWKWARD:
+        for y in AWKWARD:
+            assert compiled.render(x=x, y=y) == template.format(x=x, y=y)
+
+
+def test_partial_folds_static_slots():
+    template = "{a}-{b}-{c}-{a}"
+    partial = PromptTemplate(template).partial(a="{A}", c="'C'")
+    assert partial.fields == {"b"}
+    assert partial.render(b="B") == template.format(a="{A}", b="B", c="'C'")
+    assert partial.partial(b="x").render() == "{A}-x-'C'-{A}"
+    with pytest.raises(TypeError):
+        partial.render(a="again", b="B")
+
+
+def test_format_specs_are_rejected():
+    with pytest.raises(ValueError):
+        PromptTemplate("{turn:03d}")
+    with pytest.raises(ValueError):
+        PromptTemplate("{name!r}")
+
+
+def _random_snapshot(rng):
+    pick = lambda: rng.choice(AWKWARD)
+    return {
+        "emotional_state": pick(),
+        "top_trust": {pick(): 0.5},
+        "top_suspicion": {pick(): 0.25},
+        "key_knowledge": [pick() for _ in range(rng.randint(0, 3))],
+        "inventory": [pick() for _ in range(rng.randint(0, 2))],
+        "recent_own_dialogue": [pick() for _ in range(rng.randint(0, 3))],
+    }
+
+
+def test_character_prompt_matches_the_uncompiled_template():
+    """The template text is the old f-string's body, so str.format of it is the old prompt."""
+    rng = random.Random(0)
+    for _ in range(200):
+        name, description = rng.choice(["Saleem", "Uncle Jameel"]), rng.choice(AWKWARD) or "x"
+        snapshot = _random_snapshot(rng)
+        goal, constraint, entity, context = (rng.choice(AWKWARD) for _ in range(4))
+        profile = CharacterProfile(name=name, description=description)
+
+        prompt = get_character_prompt(name, profile, context, snapshot, None, goal, constraint, entity)
+
+        inventory = snapshot["inventory"]
+        recent = snapshot["recent_own_dialogue"]
+        already_said = "\n".join(f'  - "{line}"' for line in recent)
+        expected = CHARACTER_PROMPT_TEMPLATE.template.format(
+            character_name=name,
+            profile_description=description,
+            inventory_str=f"\nCarrying: {', '.join(inventory)}" if inventory else "",
+            memory_str=(
+                f"Emotional State: {snapshot['emotional_state']}\n"
+                f"Trust: {snapshot['top_trust']}\n"
+                f"Suspicion: {snapshot['top_suspicion']}\n"
+                f"Knowledge: {', '.join(snapshot['key_knowledge'])}"
+            ),
+            repetition_block=(f"\nYOU HAVE ALREADY SAID THESE — DO NOT REPEAT OR PARAPHRASE:\n{already_said}\n"
+                              if recent else ""),
+            goal_block=f"\nYOUR GOAL THIS TURN: {goal}\n" if goal else "",
+            constraint_block=f"\n{constraint}\n" if constraint else "",
+            entity_block=f"\n{entity}\n" if entity else "",
+            context=context
+        )
+        assert prompt == expected
+        assert prompt.startswith(f"You are {name}.\n\nPROFILE: {description}")
+        assert '{\n  "thought"' in prompt
+
+
+def test_director_prompt_matches_format():
+    rng = random.Random(1)
+    slots = DIRECTOR_SELECT_SPEAKER_TEMPLATE.fields - {"description"}
+    for _ in range(100):
+        description = rng.choice(AWKWARD)
+        values = {slot: rng.choice(AWKWARD) for slot in slots}
+        compiled = DIRECTOR_SELECT_SPEAKER_TEMPLATE.partial(description=description)
+        assert compiled.render(**values) == DIRECTOR_SELECT_SPEAKER_PROMPT.format(description=description, **values)
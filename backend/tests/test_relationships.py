@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.relationships import RelationshipMatrix
+from src.schemas import CharacterProfile
+
+NAMES = ["Saleem", "Ahmed Malik", "Constable Raza", "Uncle Jameel"]
+
+
+def _dict_rows(names, value):
+    """The pre-matrix representation: one {other: value} dict per character."""
+    return {name: {other: value for other in names if other != name} for name in names}
+
+
+def test_row_is_a_dict_view_without_the_diagonal():
+    matrix = RelationshipMatrix(NAMES)
+    row = matrix.row("Saleem", "trust")
+
+    assert list(row) == ["Ahmed Malik", "Constable Raza", "Uncle Jameel"]
+    assert len(row) == 3
+    assert dict(row) == _dict_rows(NAMES, 0.5)["Saleem"]
+    assert "Ahmed Malik" in row and "Saleem" not in row and "Nobody" not in row
+    assert row.get("Saleem", "missing") == "missing"
+    assert row.get("Nobody", 0.1) == 0.1
+    with pytest.raises(KeyError):
+        row["Saleem"]
+    with pytest.raises(KeyError):
+        row["Nobody"] = 1.0
+    with pytest.raises(TypeError):
+        del row["Ahmed Malik"]
+
+
+def test_row_writes_go_to_the_matrix():
+    matrix = RelationshipMatrix(NAMES)
+    row = matrix.row("Uncle Jameel", "suspicion")
+    row["Constable Raza"] = 0.9
+    row.update({"Saleem": 0.1})
+
+    assert matrix.suspicion[3, 2] == 0.9 and matrix.suspicion[3, 0] == 0.1
+    assert matrix.row("Uncle Jameel", "suspicion")["Constable Raza"] == 0.9
+    assert matrix.trust[3, 2] == 0.5  # the other field is untouched
+    with pytest.raises(ValueError):
+        matrix.row("Saleem", "respect")
+
+
+def test_profile_rows_dump_as_plain_dicts():
+    matrix = RelationshipMatrix(NAMES)
+    profile = CharacterProfile(name="Saleem", description="driver",
+                               trust=matrix.row("Saleem", "trust"), suspicion=matrix.row("Saleem", "suspicion"))
+    profile.trust["Uncle Jameel"] = 0.8
+    dumped = profile.model_dump()
+    assert dumped["trust"] == {"Ahmed Malik": 0.5, "Constable Raza": 0.5, "Uncle Jameel": 0.8}
+    assert type(dumped["suspicion"]) is dict
+
+
+def test_updates_and_queries_match_the_dict_version():
+    rng = random.Random(3)
+    names = NAMES + [f"Bystander {i}" for i in range(6)]
+    matrix = RelationshipMatrix(names)
+    rows = _dict_rows(names, 0.5)
+
+    for _ in range(300):
+        target = rng.choice(names)
+        delta = rng.choice([-0.3, -0.15, -0.1, 0.05, 0.08, 0.1, 0.2])
+        observers, old, new = matrix.adjust_toward("trust", target, delta)
+        expected_old = []
+        for observer in names:
+            if observer != target:
+                expected_old.append(rows[observer][target])
+                rows[observer][target] = min(1.0, max(0.0, rows[observer][target] + delta))
+        assert [names[i] for i in observers] == [n for n in names if n != target]
+        assert old.tolist() == expected_old
+        assert new.tolist() == [rows[n][target] for n in names if n != target]
+
+    assert matrix.rows("trust", 3) == {n: {o: round(v, 3) for o, v in row.items()} for n, row in rows.items()}
+    for name in names:
+        assert matrix.top_k(name, "trust", 2) == sorted(rows[name].items(), key=lambda x: x[1], reverse=True)[:2]
+    np.testing.assert_allclose(matrix.row_means("trust"),
+                               [sum(rows[n].values()) / len(rows[n]) for n in names])
+
+
+def test_top_k_keeps_name_order_on_ties():
+    matrix = RelationshipMatrix(NAMES)
+    assert [n for n, _ in matrix.top_k("Constable Raza", "suspicion", 3)] == ["Saleem", "Ahmed Malik", "Uncle Jameel"]
+    assert matrix.top_k("Saleem", "trust", 10) == [("Ahmed Malik", 0.5), ("Constable Raza", 0.5), ("Uncle Jameel", 0.5)]
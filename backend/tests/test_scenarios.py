@@ -0,0 +1,58 @@
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.config import StoryConfig
+from src.engine.sessions import StorySession
+from src.scenarios import ScenarioError, ScenarioRegistry
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+
+
+def _write_scenario(root: Path, name: str, seed_story: dict, characters: list) -> None:
+    directory = root / name
+    directory.mkdir()
+    (directory / "seed_story.json").write_text(json.dumps(seed_story))
+    (directory / "character_configs.json").write_text(json.dumps({"characters": characters}))
+
+
+@pytest.fixture
+def registry(tmp_path):
+    shutil.copytree(EXAMPLES / "rickshaw_accident", tmp_path / "rickshaw_accident")
+    cast = json.loads((EXAMPLES / "rickshaw_accident" / "character_configs.json").read_text())["characters"]
+
+    # Same cast in a new setting, plus a bystander the mystery tables do not know
+    _write_scenario(tmp_path, "monsoon_flood", {
+        "title": "Flooded Underpass",
+        "description": "A rickshaw stalls in a flooded underpass and a reversing car clips it."
+    }, cast + [{"name": "Chai Wala", "description": "Tea seller watching from the dry end."}])
+
+    # A cast the mystery engine cannot run
+    _write_scenario(tmp_path, "office_heist", {
+        "title": "Office Heist",
+        "description": "The petty cash box is empty on Monday morning."
+    }, [{"name": "Accountant", "description": "Nervous."}, {"name": "Manager", "description": "Angry."}])
+
+    return ScenarioRegistry(tmp_path, poll_interval=0)
+
+
+def test_second_scenario_loads_and_runs(registry):
+    assert registry.names() == ["monsoon_flood", "rickshaw_accident"]
+    scenario = registry.get("monsoon_flood")
+    assert scenario.seed_story["title"] == "Flooded Underpass"
+
+    config = StoryConfig(llm_backend="fake", seed=3)
+    session = StorySession("test", scenario.seed_story, scenario.characters, config,
+                           signals=scenario.signals, scenario=scenario.name)
+    final = asyncio.run(session.run())
+    assert final["is_concluded"]
+    assert {turn.speaker for turn in final["dialogue_history"]} <= {c["name"] for c in scenario.characters}
+
+
+def test_scenario_without_the_mystery_cast_is_rejected(registry):
+    assert "missing characters the mystery engine requires" in registry.errors["office_heist"]
+    with pytest.raises(ScenarioError):
+        registry.get("office_heist")
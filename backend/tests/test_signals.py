@@ -0,0 +1,83 @@
+import json
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from src.signals import SignalMatcher, parse_term
+
+LEXICONS = json.loads(
+    (Path(__file__).resolve().parents[1] / "examples" / "rickshaw_accident" / "signal_lexicons.json").read_text()
+)
+
+
+def _reference_matches(lexicons, text):
+    """Straightforward regex version of the matcher's rules: whole words, trailing * = stem."""
+    found = set()
+    for family, terms in lexicons.items():
+        for term in terms:
+            words, stem = parse_term(term)
+            pattern = r"\W+".join(re.escape(w) for w in words) + (r"\w*" if stem else "")
+            if re.search(rf"(?<!\w){pattern}(?!\w)", text, re.I):
+                found.add(family)
+    return found
+
+
+def test_whole_words_only():
+    matcher = SignalMatcher({"corrupt": ["fee"], "wallet": ["wallet*"]})
+    assert matcher.matches("Just a small fee, sahib.") == {"corrupt"}
+    assert matcher.matches("Want some coffee?") == set()
+    assert matcher.matches("Feel free.") == set()
+
+
+def test_stem_matches_any_continuation():
+    matcher = SignalMatcher({"aggressive": ["threaten*"]})
+    for line in ("I threaten you", "He threatened me", "Stop THREATENING people"):
+        assert matcher.matches(line) == {"aggressive"}
+    assert matcher.matches("a threat") == set()
+
+
+def test_phrases_match_consecutive_words():
+    matcher = SignalMatcher({"corrupt": ["chai pani", "nobody needs to know"], "calm": ["let us"]})
+    assert matcher.classify("Some chai pani, bhai") == {"corrupt": [(5, 14)]}
+    assert matcher.matches("Nobody needs   to know, okay?") == {"corrupt"}
+    assert matcher.matches("chai and pani") == set()
+    assert matcher.matches("Let's talk") == set()
+    assert matcher.matches("let us talk") == {"calm"}
+
+
+def test_phrase_with_stem_tail():
+    matcher = SignalMatcher({"corrupt": ["settle quiet*"]})
+    assert matcher.matches("We can settle quietly.") == {"corrupt"}
+    assert matcher.matches("We can settle now, quietly.") == set()
+
+
+def test_term_shared_by_families_reports_every_family():
+    matcher = SignalMatcher({"bribe": ["fee"], "corrupt": ["fee"]})
+    assert matcher.classify("the fee") == {"bribe": [(4, 7)], "corrupt": [(4, 7)]}
+
+
+def test_spans_cover_every_occurrence():
+    matcher = SignalMatcher({"wallet": ["wallet*"]})
+    text = "My wallet! Where are the wallets?"
+    assert [text[s:e] for s, e in matcher.classify(text)["wallet"]] == ["wallet", "wallets"]
+
+
+@pytest.mark.parametrize("term", ["", "  ", "*", "thr*eaten", "a * b"])
+def test_bad_terms_are_rejected(term):
+    with pytest.raises(ValueError):
+        parse_term(term)
+
+
+def test_scenario_lexicons_agree_with_the_regex_reference():
+    rng = random.Random(0)
+    vocabulary = sorted({w for terms in LEXICONS["dialogue"].values() for t in terms for w in parse_term(t)[0]})
+    vocabulary += ["coffee", "threatened", "wallets", "calmly", "feel", "the", "and", "of", "settled", "lawyers"]
+    dialogue = SignalMatcher(LEXICONS["dialogue"])
+    action = SignalMatcher(LEXICONS["action"])
+    for _ in range(500):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 12))]
+        text = rng.choice([" ", ", ", "! "]).join(w.capitalize() if rng.random() < 0.3 else w for w in words)
+        assert dialogue.matches(text) == _reference_matches(LEXICONS["dialogue"], text), text
+        assert action.matches(text) == _reference_matches(LEXICONS["action"], text), text
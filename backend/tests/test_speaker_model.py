@@ -0,0 +1,103 @@
+import asyncio
+from functools import lru_cache
+
+import numpy as np
+
+from src.agents.director_agent import PLOT_CLOCK, DirectorAgent
+from src.config import StoryConfig
+from src.engine.sessions import StorySession
+from src.scenarios import get_scenario_registry
+from src.speaker_model import SpeakerModel, candidate_features
+from src.train_speaker_model import beats_baseline
+
+
+@lru_cache(maxsize=None)
+def _selection_contexts(seeds):
+    """Every context DirectorAgent.selection_context built during short fake-backend runs."""
+    contexts = []
+    selection_context = DirectorAgent.selection_context
+
+    def recording(self, *args):
+        context = selection_context(self, *args)
+        contexts.append(context)
+        return context
+
+    DirectorAgent.selection_context = recording
+    try:
+        for seed in seeds:
+            config = StoryConfig(llm_backend="fake", seed=seed)
+            story = get_scenario_registry(config).get(config.default_scenario)
+            session = StorySession(f"speaker-{seed}", story.seed_story, story.characters, config, signals=story.signals)
+            asyncio.run(session.run())
+    finally:
+        DirectorAgent.selection_context = selection_context
+    return tuple(contexts)
+
+
+def _label(context):
+    """Whoever the last line names answers; otherwise Raza in the resolution, else the most hostile candidate."""
+    last_line = context["last_line"].lower()
+    for candidate in context["candidates"]:
+        if any(part.lower() in last_line for part in candidate.split() if len(part) > 3):
+            return candidate
+    if context["phase"] == "resolution" and "Constable Raza" in context["candidates"]:
+        return "Constable Raza"
+    tension = context["tension"] or {}
+    return max(context["candidates"], key=lambda name: tension.get(name, float("-inf")))
+
+
+def _examples(seeds):
+    return [(context, _label(context)) for context in _selection_contexts(seeds)]
+
+
+TRAIN_SEEDS = tuple(range(8))
+HELD_OUT_SEEDS = tuple(range(100, 104))
+
+
+def test_live_contexts_carry_the_features_the_model_expects():
+    contexts = _selection_contexts(TRAIN_SEEDS)
+    assert {context["phase"] for context in contexts} == {phase["name"] for phase in PLOT_CLOCK}
+    assert any(context["tension"] for context in contexts)
+    for context in contexts:
+        assert set(context) == {"phase", "candidates", "recent_speakers", "last_line", "event", "tension"}
+        assert set(context["tension"] or {}) <= set(context["candidates"])
+        for candidate in context["candidates"]:
+            names = [name for name, _ in candidate_features(context, candidate)]
+            assert f"phase={context['phase']}|cand={candidate}" in names
+            assert ("tension" in names) == (candidate in (context["tension"] or {}))
+
+
+def test_fit_recovers_the_labelling_rule():
+    model = SpeakerModel(n_features=1024).fit(_examples(TRAIN_SEEDS))
+    held_out = _examples(HELD_OUT_SEEDS)
+    predictions = [model.predict(context) for context, _ in held_out]
+    accuracy = np.mean([speaker == label for (speaker, _), (_, label) in zip(predictions, held_out)])
+    assert accuracy >= 0.9
+    confident = [p for _, p in predictions if p >= 0.6]
+    assert len(confident) >= 0.8 * len(held_out)
+
+
+def test_save_load_round_trip(tmp_path):
+    model = SpeakerModel(n_features=1024, metadata={"evaluation": {"held_out": 100}})
+    model.fit(_examples(TRAIN_SEEDS))
+    path = tmp_path / "speaker_model.npz"
+    model.save(path)
+
+    loaded = SpeakerModel.load(path)
+    assert loaded.n_features == model.n_features
+    assert loaded.metadata == model.metadata
+    np.testing.assert_array_equal(loaded.weights, model.weights)
+    for context in _selection_contexts(HELD_OUT_SEEDS):
+        assert loaded.predict(context) == model.predict(context)
+
+
+def test_untrained_model_is_never_confident():
+    context = _selection_contexts(TRAIN_SEEDS)[0]
+    _, probability = SpeakerModel(n_features=64).predict(context)
+    assert probability == 1 / len(context["candidates"])
+
+
+def test_trainer_rejects_models_worse_than_baseline_when_confident():
+    assert beats_baseline({"accuracy_when_confident": 0.5, "baseline_accuracy": 0.4})
+    assert beats_baseline({"accuracy_when_confident": None, "baseline_accuracy": 0.4})
+    assert not beats_baseline({"accuracy_when_confident": 0.0, "baseline_accuracy": 0.111})
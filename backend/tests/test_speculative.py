@@ -0,0 +1,72 @@
+import asyncio
+from collections import defaultdict
+
+from src.config import StoryConfig
+from src.engine.sessions import StorySession
+from src.scenarios import get_scenario_registry
+
+SEED = 11
+
+
+def _run(**overrides):
+    """One fake-backend story; returns (graph, dialogue events, streamed deltas per turn)."""
+    config = StoryConfig(llm_backend="fake", seed=SEED, **overrides)
+    scenario = get_scenario_registry(config).get(config.default_scenario)
+    session = StorySession("test", scenario.seed_story, scenario.characters, config,
+                           signals=scenario.signals, scenario=scenario.name)
+
+    async def collect():
+        dialogue, deltas = [], defaultdict(str)
+        async for mode, chunk in session.astream(["updates", "custom"]):
+            if mode == "custom":
+                deltas[chunk["turn"]] += chunk["delta"]
+                continue
+            for update in chunk.values():
+                dialogue.extend(e for e in (update or {}).get("events") or () if e["type"] == "dialogue")
+        return dialogue, deltas
+
+    dialogue, deltas = asyncio.run(collect())
+    return session.narrative, dialogue, deltas
+
+
+def _lines(dialogue):
+    return [(e["turn"], e["speaker"], e["content"], e["speaker_goal"]) for e in dialogue]
+
+
+def _assert_discard_accounting(graph, fanout):
+    # Losing drafts are dropped on every speculative turn; the winner too on a miss or goal mismatch
+    rejected = graph.speculative_misses + graph.speculative_goal_mismatches
+    assert graph.speculative_discarded == fanout * rejected + (fanout - 1) * graph.speculative_hits
+
+
+def test_goal_mismatch_regenerates_so_the_story_is_unchanged():
+    _, baseline, _ = _run()
+    graph, dialogue, _ = _run(speculative_generation=True, speculative_budget=1000)
+
+    # The fake director never repeats the phase mandate, so no draft is ever kept
+    assert graph.speculative_goal_mismatches > 0 and graph.speculative_hits == 0
+    assert _lines(dialogue) == _lines(baseline)
+    summary = graph.metrics.summary()["speculative_drafts"]
+    assert summary == {k: v for k, v in {"miss": graph.speculative_misses,
+                                          "goal_mismatch": graph.speculative_goal_mismatches}.items() if v}
+    _assert_discard_accounting(graph, fanout=2)
+
+
+def test_accepted_hits_keep_the_directors_goal_and_stream_their_dialogue():
+    graph, dialogue, deltas = _run(speculative_generation=True, speculative_budget=1000,
+                                   speculative_accept_goal_mismatch=True)
+
+    assert graph.speculative_hits > 0 and graph.speculative_misses > 0
+    assert graph.speculative_goal_mismatches == 0
+    _assert_discard_accounting(graph, fanout=2)
+    # Every turn, drafted or not, streamed exactly the line that was committed
+    for event in dialogue:
+        assert deltas[event["turn"]] == event["content"]
+    assert all(event["speaker_goal"] for event in dialogue)
+
+
+def test_budget_caps_discarded_drafts():
+    graph, _, _ = _run(speculative_generation=True, speculative_fanout=2, speculative_budget=5,
+                       speculative_accept_goal_mismatch=True)
+    assert 0 < graph.speculative_discarded <= 5
+    _assert_discard_accounting(graph, fanout=2)
@@ -0,0 +1,66 @@
+import json
+import random
+
+import pytest
+
+from src.llm.streaming import JsonFieldStreamer
+
+TRICKY = [
+    'plain line',
+    'quote " and backslash \\ and slash /',
+    'tabs\tnew\nlines\rand \b\f controls',
+    'unicode é ß 中文',
+    'emoji 😀 and 🇵🇰',
+    '"dialogue": "not a key"',
+    '{nested} [brackets], commas: colons',
+    '',
+]
+
+
+def _stream(text, sizes):
+    """Feed `text` in chunks of the given sizes (cycled), joining what the streamer emits."""
+    streamer, out, i, k = JsonFieldStreamer("dialogue"), [], 0, 0
+    while i < len(text):
+        size = sizes[k % len(sizes)]
+        out.append(streamer.feed(text[i:i + size]))
+        i, k = i + size, k + 1
+    return "".join(out), streamer
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("dialogue", TRICKY)
+def test_every_chunking_decodes_like_json_loads(dialogue, ensure_ascii):
+    text = json.dumps({"thought": "the \"dialogue\": trap", "dialogue": dialogue,
+                       "action_decision": "none"}, ensure_ascii=ensure_ascii)
+    for sizes in ([1], [2], [3], [5], [1, 7, 2], [len(text)]):
+        streamed, streamer = _stream(text, sizes)
+        assert streamed == json.loads(text)["dialogue"], sizes
+        assert streamer.done
+
+
+def test_escape_split_at_every_position():
+    text = '{"dialogue": "a\\u00e9b\\"c\\\\d\\ud83d\\ude00e\\n"}'
+    expected = json.loads(text)["dialogue"]
+    for cut in range(1, len(text)):
+        streamer = JsonFieldStreamer("dialogue")
+        assert streamer.feed(text[:cut]) + streamer.feed(text[cut:]) == expected, cut
+
+
+def test_random_chunking_of_character_responses():
+    rng = random.Random(5)
+    for _ in range(200):
+        dialogue = "".join(rng.choice('ab "\\\n/é😀{}:,') for _ in range(rng.randint(0, 30)))
+        text = "```json\n" + json.dumps({"thought": dialogue[::-1], "dialogue": dialogue,
+                                          "action_decision": "none"}, ensure_ascii=rng.random() < 0.5) + "\n```"
+        sizes = [rng.randint(1, 9) for _ in range(5)]
+        assert _stream(text, sizes)[0] == dialogue
+
+
+def test_only_the_top_level_field_is_streamed():
+    text = json.dumps({"meta": {"dialogue": "nested"}, "other": "dialogue", "dialogue": "top", "after": "x"})
+    assert _stream(text, [1])[0] == "top"
+
+
+def test_missing_field_streams_nothing():
+    streamed, streamer = _stream(json.dumps({"thought": "hmm", "action_decision": "none"}), [4])
+    assert streamed == "" and not streamer.done
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from src.volatility_log import VolatilityLog
+
+NAMES = ["Saleem", "Ahmed Malik", "Constable Raza", "Uncle Jameel"]
+EMOTIONS = ["neutral", "angry", "nervous", "desperate"]
+
+
+class _Memory:
+    """Character memory mutated through the log, the way StoryStateManager._set_memory does."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.values = {
+            name: {"trust": {o: 0.5 for o in NAMES if o != name},
+                   "suspicion": {o: 0.3 for o in NAMES if o != name},
+                   "emotional_state": "neutral"}
+            for name in NAMES
+        }
+
+    def snapshot(self):
+        # Full per-turn snapshot, as the log stored before it kept deltas
+        return {
+            name: {"trust": {o: round(v, 3) for o, v in c["trust"].items()},
+                   "suspicion": {o: round(v, 3) for o, v in c["suspicion"].items()},
+                   "emotional_state": c["emotional_state"]}
+            for name, c in self.values.items()
+        }
+
+    def play_turn(self, log: VolatilityLog, turn: int) -> None:
+        log.begin_turn(turn, self.rng.choice(NAMES), {})
+        for _ in range(self.rng.randint(0, 6)):
+            observer = self.rng.choice(NAMES)
+            if self.rng.random() < 0.2:
+                old, new = self.values[observer]["emotional_state"], self.rng.choice(EMOTIONS)
+                self.values[observer]["emotional_state"] = new
+                log.record(observer, "emotional_state", None, old, new)
+                continue
+            field = self.rng.choice(["trust", "suspicion"])
+            target = self.rng.choice([n for n in NAMES if n != observer])
+            old = self.values[observer][field][target]
+            new = min(1.0, max(0.0, old + self.rng.choice([-0.15, -0.1, 0.0001, 0.05, 0.08, 0.2])))
+            self.values[observer][field][target] = new
+            log.record(observer, field, target, old, new)
+
+
+@pytest.mark.parametrize("interval", [1, 3, 5])
+def test_snapshot_at_matches_full_snapshots_across_keyframes(interval):
+    memory = _Memory(seed=interval)
+    log = VolatilityLog(memory.snapshot, keyframe_interval=interval)
+    expected = {0: memory.snapshot()}
+    for turn in range(1, 31):
+        memory.play_turn(log, turn)
+        expected[turn] = memory.snapshot()
+
+    assert len(log.keyframes) == 1 + 30 // interval
+    for turn, snapshot in expected.items():
+        assert log.snapshot_at(turn) == snapshot, turn
+    assert log.snapshot_at(99) == expected[30]
+
+
+def test_changes_lost_to_rounding_are_not_recorded():
+    log = VolatilityLog(lambda: {}, keyframe_interval=5)
+    log.begin_turn(1, "Saleem", {})
+    log.record("Saleem", "trust", "Ahmed Malik", 0.5, 0.5001)
+    log.record("Saleem", "emotional_state", None, "neutral", "neutral")
+    log.record("Saleem", "suspicion", "Ahmed Malik", 0.3, 0.45)
+    assert [(c.field, c.old, c.new) for c in log.changes_at(1)] == [("suspicion", 0.3, 0.45)]
+
+
+def test_trimmed_log_still_rebuilds_the_turns_it_keeps():
+    memory = _Memory(seed=9)
+    log = VolatilityLog(memory.snapshot, keyframe_interval=4, max_turns=6)
+    expected = {}
+    for turn in range(1, 41):
+        memory.play_turn(log, turn)
+        expected[turn] = memory.snapshot()
+
+    assert 6 <= len(log) < 6 + 4
+    assert log.keyframes[0][0] <= log.turns[-6]["turn"]
+    for turn in range(log.turns[0]["turn"], 41):
+        assert log.snapshot_at(turn) == expected[turn], turn
@@ -6,47 +6,82 @@ import ControlPanel from '@/components/ControlPanel';
 
 export default function Home() {
   const [events, setEvents] = useState([]);
+  // Dialogue still being generated, shown until its committed event arrives
+  const [liveLine, setLiveLine] = useState(null);
+  // Set when the server asks for typewriter pacing (characters per second)
+  const [typewriterCps, setTypewriterCps] = useState(null);
   const [worldState, setWorldState] = useState({ items: {} });
   const [status, setStatus] = useState("Idle");
   
-  // THE GATEKEEPER: Persistent storage for unique event fingerprints
-  const processedKeys = useRef(new Set());
+  // Highest sequence number applied; anything at or below it is a repeat
+  const lastSeq = useRef(0);
+  // Whether the current dialogue line has already been shown live
+  const liveOpen = useRef(false);
 
   const startSimulation = () => {
     setEvents([]);
+    setLiveLine(null);
     setWorldState({ items: {} });
-    processedKeys.current.clear(); 
+    lastSeq.current = 0;
+    liveOpen.current = false;
     setStatus("Running...");
     
     const eventSource = new EventSource("http://localhost:8000/stream-story");
 
     eventSource.onmessage = (event) => {
       const data = JSON.parse(event.data);
-      
-      if (data.type === "end") {
+      if (data.type === "rewind") {
+        // A restarted worker regenerated everything after the checkpoint
+        lastSeq.current = data.seq;
+        liveOpen.current = false;
+        setLiveLine(null);
+        setEvents((prev) => prev.filter((e) => e.seq <= data.after_seq));
+        setWorldState({ items: data.items });
+        return;
+      }
+      if (data.seq <= lastSeq.current) return;
+      lastSeq.current = data.seq;
+
+      if (data.type === "stream_config") {
+        setTypewriterCps(data.chars_per_second);
+      } else if (data.type === "dialogue_delta") {
+        liveOpen.current = true;
+        setLiveLine((prev) =>
+          prev && prev.turn === data.turn && prev.speaker === data.speaker
+            ? { ...prev, content: prev.content + data.delta }
+            : { type: "dialogue", turn: data.turn, speaker: data.speaker, content: data.delta }
+        );
+      } else if (data.type === "entity_update") {
+        // Registry diff: merge changed items, drop removed ones
+        setWorldState((prev) => {
+          const items = { ...prev.items, ...data.changed };
+          data.removed.forEach((name) => delete items[name]);
+          return { items };
+        });
+      } else if (data.type === "end") {
+        setLiveLine(null);
         setStatus("Complete");
         eventSource.close();
+      } else if (data.type === "error") {
+        setLiveLine(null);
+        setStatus("Error");
+        eventSource.close();
+        setEvents((prev) => [...prev, { ...data, content: data.message }]);
       } else {
-        // Fingerprint: Turn + Type + first 30 chars of content
-        const contentSnippet = (data.content || data.action || "").substring(0, 30);
-        const fingerprint = `${data.turn}-${data.type}-${contentSnippet}`;
-
-        if (!processedKeys.current.has(fingerprint)) {
-          processedKeys.current.add(fingerprint);
-          
-          setEvents((prev) => [...prev, data]);
-
-          // Update sidebar with Entity Registry snapshots
-          if (data.entity_updates) {
-            setWorldState({ items: data.entity_updates.items });
-          }
+        if (data.type === "dialogue" && liveOpen.current) {
+          // Already typed out live, so don't reveal it a second time
+          data.revealed = true;
+          liveOpen.current = false;
+          setLiveLine(null);
         }
+        setEvents((prev) => [...prev, data]);
       }
     };
 
+    // The browser reconnects on its own and the server resumes from Last-Event-ID
+    eventSource.onopen = () => setStatus("Running...");
     eventSource.onerror = () => {
-      setStatus("Disconnected");
-      eventSource.close();
+      setStatus(eventSource.readyState === EventSource.CLOSED ? "Disconnected" : "Reconnecting...");
     };
   };
 
@@ -55,7 +90,7 @@ export default function Home() {
       <WorldSidebar items={worldState.items} />
       <main className="flex-1 flex flex-col h-full overflow-hidden">
         <ControlPanel status={status} onStart={startSimulation} />
-        <EventFeed events={events} />
+        <EventFeed events={events} liveLine={liveLine} typewriterCps={typewriterCps} />
       </main>
     </div>
   );
@@ -1,5 +1,5 @@
 export default function ControlPanel({ status, onStart }) {
-  const isRunning = status === "Running...";
+  const isRunning = status === "Running..." || status === "Reconnecting...";
 
   return (
     <header className="bg-white border-b p-4 md:px-8 flex flex-col sm:flex-row justify-between items-center gap-4 shadow-sm z-10">
@@ -1,9 +1,32 @@
 "use client";
+import { useEffect, useState } from "react";
 import { motion } from "framer-motion";
 import { MessageSquare, Zap, Search, Info, Brain } from "lucide-react";
 
-export default function EventItem({ event }) {
+// Reveal `text` a character at a time; shows it all at once when cps is unset
+function useTypewriter(text, cps) {
+  const [shown, setShown] = useState(cps ? 0 : text.length);
+
+  useEffect(() => {
+    if (!cps) {
+      setShown(text.length);
+      return;
+    }
+    const timer = setInterval(() => {
+      setShown((n) => {
+        if (n >= text.length) clearInterval(timer);
+        return Math.min(n + 1, text.length);
+      });
+    }, 1000 / cps);
+    return () => clearInterval(timer);
+  }, [text, cps]);
+
+  return text.slice(0, shown);
+}
+
+export default function EventItem({ event, typewriterCps }) {
   const { type, speaker, character, content, action, agentic_reasoning } = event;
+  const text = useTypewriter(content || action || "", event.revealed ? null : typewriterCps);
 
   // Logic: Actions use 'character', Dialogue uses 'speaker'
   const performer = speaker || character || (type === 'director_note' ? 'Director' : type);
@@ -33,7 +56,7 @@ export default function EventItem({ event }) {
       </div>
       
       <p className="text-lg leading-relaxed font-medium italic">
-        {content || action}
+        {text}
       </p>
 
       {agentic_reasoning?.thought && (